@@ -27,6 +27,9 @@ const parseAllowedModules = (value: string) =>
     .map((s) => s.trim())
     .filter(Boolean);
 
+const parsePreloadModules = (value: string) =>
+  value.trim().toLowerCase() === 'none' ? [] : parseAllowedModules(value);
+
 export const RUNTIME_MEMORY_OVERHEAD_MB = 50;
 
 export const env = createEnv({
@@ -52,7 +55,11 @@ export const env = createEnv({
 
     // ===== 资源限制 =====
     SANDBOX_API_MAX_BODY_MB: IntSchema.min(1).max(100).default(8),
+    /** multipart 请求中 inputFiles 文件字段的总大小上限（MB），在 SANDBOX_API_MAX_BODY_MB 之外单独计算 */
+    SANDBOX_PYTHON_INPUT_FILES_MAX_MB: IntSchema.min(1).max(2048).default(256),
     SANDBOX_MAX_TIMEOUT: IntSchema.min(1000).max(600000).default(60000),
+    /** Python 超时后用户代码吞掉 TimeoutError 时，强制退出前的宽限期（ms） */
+    SANDBOX_PYTHON_TIMEOUT_GRACE_MS: IntSchema.min(10).max(10000).default(500),
     SANDBOX_MAX_MEMORY_MB: IntSchema.min(32).max(4096).default(256),
     SANDBOX_MAX_TMP_MB: IntSchema.min(1).max(1024).default(16),
     SANDBOX_MAX_OUTPUT_MB: IntSchema.min(1).max(100).default(10),
@@ -63,6 +70,22 @@ export const env = createEnv({
     SANDBOX_REQUEST_TIMEOUT: IntSchema.min(1000).max(300000).default(60000),
     SANDBOX_REQUEST_MAX_RESPONSE_MB: IntSchema.min(1).max(100).default(10),
     SANDBOX_REQUEST_MAX_BODY_MB: IntSchema.min(1).max(100).default(5),
+    /** 单次执行内同时在途的 HTTP 请求数（http_request_many / http_request_async） */
+    SANDBOX_REQUEST_MAX_CONCURRENCY: IntSchema.min(1).max(100).default(10),
+    /** 代理层 GET 响应缓存条目数，跨执行共享；0 表示关闭 */
+    SANDBOX_REQUEST_CACHE_SIZE: IntSchema.min(0).max(10000).default(0),
+    /** 缓存有效期上限（ms），响应 Cache-Control 的 max-age 更短时以其为准 */
+    SANDBOX_REQUEST_CACHE_TTL_MS: IntSchema.min(0).max(3600000).default(30000),
+    /** 单条缓存响应体大小上限（KB），更大的响应不缓存 */
+    SANDBOX_REQUEST_CACHE_MAX_ENTRY_KB: IntSchema.min(1).max(10240).default(256),
+    /** 空闲连接保留时长（ms），0 表示每个请求新建连接 */
+    SANDBOX_REQUEST_KEEPALIVE_MS: IntSchema.min(0).max(600000).default(4000),
+    /** 单个 origin 的连接数上限 */
+    SANDBOX_REQUEST_MAX_SOCKETS_PER_ORIGIN: IntSchema.min(1).max(1000).default(16),
+    /** 保留连接池的 origin 数上限，同时也是 DNS 缓存条目上限 */
+    SANDBOX_REQUEST_MAX_ORIGINS: IntSchema.min(1).max(10000).default(128),
+    /** DNS 解析结果缓存时长（ms），0 表示不缓存；每次使用缓存结果仍复检内网 IP */
+    SANDBOX_REQUEST_DNS_TTL_MS: IntSchema.min(0).max(3600000).default(30000),
 
     // ===== 模块控制 =====
     /** JS 可用模块白名单，逗号分隔 */
@@ -85,7 +108,33 @@ export const env = createEnv({
           'pprint,weakref,' +
           'numpy,pandas,matplotlib'
       )
-      .transform(parseAllowedModules)
+      .transform(parseAllowedModules),
+    /**
+     * Python 预热进程在空闲时提前 import 的模块，逗号分隔，可写子模块（如 matplotlib.pyplot）。
+     * 仅预导入顶层模块在白名单内的条目；设置为 none 关闭预导入。
+     */
+    SANDBOX_PYTHON_PRELOAD_MODULES: z
+      .string()
+      .default('numpy,pandas,matplotlib')
+      .transform(parsePreloadModules),
+    /**
+     * 启用 Python zygote（fork-server）模式：常驻进程完成预导入后为每个任务 fork 子进程，
+     * 子进程在 fork 后才进入 seccomp/chroot，仍然一任务一进程。
+     */
+    SANDBOX_PYTHON_ZYGOTE: BoolSchema.default(false),
+    /** Python 编译缓存条目数（按代码 SHA-256 缓存校验通过的 code object），0 表示关闭，上限 10000 */
+    SANDBOX_PYTHON_COMPILE_CACHE_SIZE: IntSchema.min(0).max(10000).default(256),
+    /**
+     * runner 与 Python 子进程之间的消息协议：frame 为长度前缀帧（大结果、HTTP 响应体、
+     * 编译结果以原始字节传输），line 为逐行 JSON。
+     */
+    SANDBOX_PYTHON_IPC_PROTOCOL: z.enum(['line', 'frame']).default('frame'),
+    /** Python 批量执行单次请求的最大项数 */
+    SANDBOX_PYTHON_BATCH_MAX_ITEMS: IntSchema.min(1).max(10000).default(1000),
+    /** Python 批量执行中单项返回值加日志的输出上限（KB），超出时该项失败 */
+    SANDBOX_PYTHON_BATCH_ITEM_MAX_OUTPUT_KB: IntSchema.min(1).max(100 * 1024).default(1024),
+    /** Python 返回值默认编码方式，可被请求中的 resultEncoder 覆盖 */
+    SANDBOX_PYTHON_RESULT_ENCODER: z.enum(['str', 'native']).default('str')
   }
 });
 
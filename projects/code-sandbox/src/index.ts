@@ -5,7 +5,7 @@ import { serve } from '@hono/node-server';
 import { z } from 'zod';
 import { ProcessPool } from './pool/process-pool';
 import { PythonIsolatedRunner } from './isolated/python-isolated-runner';
-import type { ExecuteOptions } from './types';
+import type { ExecuteBatchOptions, ExecuteFile, ExecuteOptions } from './types';
 import { getErrText } from './utils';
 import { configureLogger, getLogger, LogCategories } from './utils/logger';
 import { QueueIdLimiter } from './utils/queue-id-limiter';
@@ -15,6 +15,8 @@ await configureLogger();
 const serverLogger = getLogger(LogCategories.MODULE.SANDBOX.SERVER);
 const apiLogger = getLogger(LogCategories.MODULE.SANDBOX.API);
 const maxApiBodyBytes = env.SANDBOX_API_MAX_BODY_MB * 1024 * 1024;
+const maxInputFilesBytes = env.SANDBOX_PYTHON_INPUT_FILES_MAX_MB * 1024 * 1024;
+const INPUT_FILE_FIELD_PREFIX = 'inputFiles.';
 
 class ApiBodyError extends Error {
   constructor(
@@ -71,6 +73,111 @@ async function readLimitedJsonBody(c: Context): Promise<unknown> {
   }
 }
 
+function isMultipartRequest(c: Context) {
+  return (c.req.header('content-type') || '').toLowerCase().startsWith('multipart/form-data');
+}
+
+/**
+ * 流式读取并限制 multipart/form-data body 总大小后解析。
+ *
+ * 与 readLimitedJsonBody 相同，按实际读到的字节数截断，不信任 content-length。
+ */
+async function readLimitedFormData(c: Context, maxBytes: number): Promise<FormData> {
+  const tooLarge = () =>
+    new ApiBodyError(`Request body too large, max ${Math.floor(maxBytes / 1024 / 1024)}MB`, 413);
+  const contentLength = Number(c.req.header('content-length') || 0);
+  if (Number.isFinite(contentLength) && contentLength > maxBytes) {
+    throw tooLarge();
+  }
+
+  const body = c.req.raw.body;
+  if (!body) {
+    throw new ApiBodyError('Request body is empty', 400);
+  }
+
+  let size = 0;
+  const limited = body.pipeThrough(
+    new TransformStream<Uint8Array, Uint8Array>({
+      transform(chunk, controller) {
+        size += chunk.byteLength;
+        if (size > maxBytes) {
+          controller.error(tooLarge());
+          return;
+        }
+        controller.enqueue(chunk);
+      }
+    })
+  );
+
+  try {
+    return await new Response(limited, {
+      headers: { 'content-type': c.req.header('content-type')! }
+    }).formData();
+  } catch (err) {
+    if (size > maxBytes) throw tooLarge();
+    throw new ApiBodyError(`Invalid multipart body: ${getErrText(err)}`, 400);
+  }
+}
+
+/**
+ * 读取 multipart/form-data 形式的 Python 执行请求，用于传入超过 JSON body 上限的大输入文件。
+ *
+ * - `payload` 字段：与 JSON 请求相同的参数，大小仍受 SANDBOX_API_MAX_BODY_MB 限制；
+ *   其中 `inputFiles.<name>` 可只给出 `format`。
+ * - `inputFiles.<name>` 文件字段：对应输入文件的原始字节，不经过 JSON 字符串和 base64。
+ *
+ * 整个 body 的上限为 SANDBOX_API_MAX_BODY_MB + SANDBOX_PYTHON_INPUT_FILES_MAX_MB。
+ */
+async function readPythonMultipartBody(c: Context): Promise<unknown> {
+  const form = await readLimitedFormData(c, maxApiBodyBytes + maxInputFilesBytes);
+
+  const payload = form.get('payload');
+  if (typeof payload !== 'string') {
+    throw new ApiBodyError('Missing payload field', 400);
+  }
+  if (Buffer.byteLength(payload, 'utf8') > maxApiBodyBytes) {
+    throw new ApiBodyError(`Request payload too large, max ${env.SANDBOX_API_MAX_BODY_MB}MB`, 413);
+  }
+  let body: any;
+  try {
+    body = JSON.parse(payload);
+  } catch (err) {
+    throw new ApiBodyError(`Invalid JSON payload: ${getErrText(err)}`, 400);
+  }
+
+  const inputFiles: Record<string, any> = { ...(body?.inputFiles ?? {}) };
+  let inputBytes = 0;
+  for (const [field, value] of form.entries()) {
+    if (!field.startsWith(INPUT_FILE_FIELD_PREFIX)) continue;
+    if (typeof value === 'string') {
+      throw new ApiBodyError(`Field ${field} must be a file`, 400);
+    }
+    inputBytes += value.size;
+    if (inputBytes > maxInputFilesBytes) {
+      throw new ApiBodyError(
+        `Input files too large, max ${env.SANDBOX_PYTHON_INPUT_FILES_MAX_MB}MB`,
+        413
+      );
+    }
+    const name = field.slice(INPUT_FILE_FIELD_PREFIX.length);
+    inputFiles[name] = { ...inputFiles[name], data: Buffer.from(await value.arrayBuffer()) };
+  }
+
+  return {
+    ...body,
+    inputFiles: Object.keys(inputFiles).length > 0 ? inputFiles : undefined
+  };
+}
+
+/** JSON 响应中 emit_file 附件的内容以 base64 返回 */
+function encodeResultFiles<T extends { files?: ExecuteFile[] }>(result: T) {
+  if (!result.files) return result;
+  return {
+    ...result,
+    files: result.files.map(({ data, ...file }) => ({ ...file, data: data.toString('base64') }))
+  };
+}
+
 /** 请求体校验 schema */
 const queueIdSchema = z.preprocess((value) => {
   if (typeof value !== 'string') return value;
@@ -87,6 +194,33 @@ const executeSchema = z.object({
   queueId: queueIdSchema
 });
 
+const pythonExecuteSchema = executeSchema.extend({
+  timeoutMs: z.number().int().positive().optional(),
+  resultEncoder: z.enum(['str', 'native']).optional(),
+  dataFrameOrient: z.enum(['records', 'columns']).optional(),
+  profile: z.boolean().optional(),
+  traceMemory: z.boolean().optional(),
+  metrics: z.boolean().optional(),
+  inputFiles: z
+    .record(
+      z.string().regex(/^[A-Za-z_][A-Za-z0-9_]*$/),
+      z.object({
+        // multipart 请求中为文件字段的原始字节
+        data: z.union([z.string(), z.instanceof(Buffer)]),
+        encoding: z.enum(['utf8', 'base64']).optional(),
+        format: z.enum(['bytes', 'text', 'json', 'csv']).optional()
+      })
+    )
+    .optional()
+});
+
+const pythonBatchSchema = pythonExecuteSchema.omit({ variables: true, inputFiles: true }).extend({
+  variablesList: z
+    .array(z.record(z.string(), z.any()))
+    .min(1)
+    .max(env.SANDBOX_PYTHON_BATCH_MAX_ITEMS)
+});
+
 const app = new Hono();
 
 /** 进程池 */
@@ -214,8 +348,10 @@ app.post('/sandbox/js', async (c) => {
 /** Python 执行 */
 app.post('/sandbox/python', async (c) => {
   try {
-    const raw = await readLimitedJsonBody(c);
-    const parsed = executeSchema.safeParse(raw);
+    const raw = isMultipartRequest(c)
+      ? await readPythonMultipartBody(c)
+      : await readLimitedJsonBody(c);
+    const parsed = pythonExecuteSchema.safeParse(raw);
     if (!parsed.success) {
       return c.json(
         {
@@ -228,7 +364,37 @@ app.post('/sandbox/python', async (c) => {
     const result = await queueIdLimiter.run(parsed.data.queueId, () =>
       pythonRunner.execute(parsed.data as ExecuteOptions)
     );
-    return c.json(result);
+    return c.json(encodeResultFiles(result));
+  } catch (err: any) {
+    const status = err instanceof ApiBodyError ? err.status : 200;
+    return c.json(
+      {
+        success: false,
+        message: getErrText(err)
+      },
+      status
+    );
+  }
+});
+
+/** Python 批量执行：同一段代码对 variablesList 逐项调用 main */
+app.post('/sandbox/python/batch', async (c) => {
+  try {
+    const raw = await readLimitedJsonBody(c);
+    const parsed = pythonBatchSchema.safeParse(raw);
+    if (!parsed.success) {
+      return c.json(
+        {
+          success: false,
+          message: `Invalid request: ${parsed.error.issues[0]?.message || 'validation failed'}`
+        },
+        400
+      );
+    }
+    const result = await queueIdLimiter.run(parsed.data.queueId, () =>
+      pythonRunner.executeBatch(parsed.data as ExecuteBatchOptions)
+    );
+    return c.json(encodeResultFiles(result));
   } catch (err: any) {
     const status = err instanceof ApiBodyError ? err.status : 200;
     return c.json(
@@ -7,18 +7,31 @@ import base64 as _base64
 import builtins as _builtins
 import ctypes as _ctypes
 import copy as _copy
+import csv as _csv
+import datetime as _datetime
+import decimal as _decimal
+import errno as _errno
+import functools as _functools
+import gc as _gc
 import hashlib as _hashlib
 import hmac as _hmac
+import io as _io
 import inspect as _inspect_mod
 import ipaddress as _ipaddress
 import json
+import marshal as _marshal
 import math as _math
 import os as _os
+import re as _re
+import resource as _resource
+import secrets as _secrets
 import signal
+import socket as _socket
+import struct as _struct
 import sys
 import sysconfig as _sysconfig
 import time as _time
-import traceback as _tb
+import tracemalloc as _tracemalloc
 import types as _types
 import urllib.parse as _urllib_parse
 import encodings.idna as _encodings_idna  # noqa: F401
@@ -43,6 +56,7 @@ _REQUEST_LIMITS = {
     'max_response_size': 10 * 1024 * 1024,
     'max_request_body_size': 5 * 1024 * 1024,
     'max_output_size': 10 * 1024 * 1024,
+    'max_concurrency': 10,
     'allowed_protocols': ['http:', 'https:']
 }
 
@@ -50,20 +64,86 @@ _request_count = 0
 _allowed_modules = set()
 _original_import = _builtins.__import__
 _original_json_dumps = json.dumps
+_original_json_loads = json.loads
 _builtins_proxy = None
-_import_guard = False
 _original_open = open
 _original_os_functions = {}
-_open_guard = False
 _path_guard = False
 _logs = []
 _log_size = 0
+_log_truncated = False
 _MAX_LOG_SIZE = 1024 * 1024
+# 流式日志：print 的内容攒到一定字节数或间隔后以 {type: 'log'} 消息推送给 runner，不再留在内存里。
+_log_stream = False
+_log_pending = []
+_log_pending_size = 0
+_log_flushed_at = 0.0
+_LOG_FLUSH_BYTES = 16 * 1024
+_LOG_FLUSH_INTERVAL = 0.2
+_MAX_COMPILED_SIZE = 1024 * 1024
+# 流式结果：main 为生成器或返回迭代器且 runner 请求 streamResult 时，每个值以 {type: 'chunk'}
+# 推送。runner 在消费方处理完一个 chunk 后回 chunk_ack，未确认的 chunk 达到窗口大小时暂停迭代。
+_result_stream = False
+_chunk_credit = 0
+_CHUNK_WINDOW = 16
+# 当前任务各阶段耗时（毫秒），随结果一并返回；预热阶段的耗时记录在 _warm_metrics。
+_metrics = {}
+_warm_metrics = {}
+_phase_started_at = 0.0
+# profile: true 时的采样器，任务结束时停止并把折叠栈写入结果。
+_profiler = None
+_PROFILE_INTERVAL = 0.005
+_MAX_PROFILE_DEPTH = 128
+# None 表示沿用 json.dumps(default=str)；'records'/'columns' 表示使用 _ResultEncoder 及其 DataFrame 朝向
+_result_orient = None
 _timeout_stage = 0
+# 超时截止时间（time.monotonic()），以及首次超时后强制退出前的宽限期（秒）
+_timeout_deadline = None
+_timeout_grace = 0.5
 _audit_hook_installed = False
 _native_isolation_ready = False
+# RLIMIT_DATA 上限（MB），只能在进入 seccomp 前设置；None 表示未设置
+_memory_limit_mb = None
+_memory_limit_applied = False
+# 进入 chroot 前打开的 /proc/self/status，用于读取 VmHWM（峰值 RSS）
+_proc_status_fd = None
+# 任务临时目录配额（字节，0 表示不限制）；只统计写打开过的文件：realpath -> 上次 stat 的大小
+_tmp_quota = 0
+_tmp_files = {}
+# _tmp_files 中大小之和，以及最近一次写打开的文件（下次写打开时只需重新 stat 它）
+_tmp_total = 0
+_tmp_last_written = None
+# 已通知 runner 的用量档位，跨过更高档位时才推送一次 tmp_usage
+_tmp_reported_step = 0
+_TMP_USAGE_STEPS = (0.5, 0.75, 0.9)
 _task_tmpdir = None
+# emit_file 登记的附件，随结果上报路径，由 runner 在宿主机侧直接读取文件内容
+_emitted_files = []
+_MAX_EMITTED_FILES = 16
+_EMIT_MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml',
+    '.pdf': 'application/pdf',
+    '.csv': 'text/csv',
+    '.json': 'application/json',
+    '.txt': 'text/plain',
+    '.md': 'text/markdown',
+    '.html': 'text/html',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.zip': 'application/zip',
+}
+_task_tmp_root = None
+_task_tmp_prefix = None
 _matplotlib_tmpdir = None
+# 路径是否位于任务临时目录的判定缓存。chdir 以及任何可能改变路径解析结果的写操作
+# （rename/symlink/unlink 等）都会清空缓存，避免符号链接替换后沿用旧结论。
+_path_verdicts = {}
+_MAX_PATH_VERDICTS = 1024
 
 _FORBIDDEN_ATTRS = frozenset({
     '__class__', '__base__', '__bases__', '__mro__', '__subclasses__',
@@ -80,10 +160,298 @@ _PROTECTED_BUILTINS = _FORBIDDEN_BUILTINS | frozenset({
     '__import__', 'open', 'getattr', 'setattr', 'delattr',
 })
 
+# 预热阶段随顶层模块一起导入的常用子模块，避免首次使用时再触发磁盘加载。
+_PRELOAD_SUBMODULES = {
+    'numpy': ('numpy.linalg', 'numpy.random', 'numpy.fft'),
+    'pandas': ('pandas.io.parsers', 'pandas.io.json'),
+    'matplotlib': ('matplotlib.pyplot', 'matplotlib.backends.backend_agg'),
+}
+
+# matplotlib 在 import 时就会解析并缓存 config/cache 目录，zygote 中预导入会让所有 fork
+# 出的子进程共用 zygote 的目录，因此只能在子进程拿到自己的任务临时目录后再导入。
+_ZYGOTE_SKIP_PRELOAD = frozenset({'matplotlib'})
+
+
+def _write_message_atomically(write, *parts):
+    """整条消息写完前屏蔽 SIGALRM。
+
+    超时处理函数会抛出 TimeoutError；若在消息中途抛出，管道上会留下半条消息，随后写出的错误
+    结果会让 runner 的解析错位。屏蔽期间到达的信号在恢复掩码时才处理，即只在消息边界抛出。
+    """
+    previous = signal.pthread_sigmask(signal.SIG_BLOCK, (signal.SIGALRM,))
+    try:
+        for part in parts:
+            write(part)
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, previous)
+
+
+class _LineChannel:
+    """默认协议：每条消息一行 JSON。不支持 blob，二进制内容由调用方内联到 JSON。"""
+    supports_blob = False
+
+    def read(self):
+        line = sys.stdin.readline()
+        if not line:
+            return None, None
+        return _original_json_loads(line), None
+
+    def write(self, payload, blob=None):
+        self.write_text(_encode_message(payload), blob)
+
+    def write_text(self, text, blob=None):
+        _write_message_atomically(self._write_line, text)
+
+    @staticmethod
+    def _write_line(text):
+        sys.stdout.write(text + '\n')
+        sys.stdout.flush()
+
+
+class _FrameChannel:
+    """帧协议：8 字节头（JSON 长度、blob 长度，均为大端 u32）+ JSON + 原始字节 blob。
+
+    读取复用预分配缓冲区，read 返回的 blob 是缓冲区上的 memoryview，只在下一次 read 前有效。
+    """
+    supports_blob = True
+    _HEADER = _struct.Struct('>II')
+
+    def __init__(self):
+        self._in = _io.FileIO(0, 'rb', closefd=False)
+        self._out = _io.FileIO(1, 'wb', closefd=False)
+        self._header = bytearray(self._HEADER.size)
+        self._buf = bytearray(64 * 1024)
+        self._frame = None
+        self._filled = 0
+
+    def _read_exact(self, view):
+        # 进度保存在实例上：读取被超时信号打断时，下一次 read 从断点继续，帧边界不会错位
+        while self._filled < len(view):
+            n = self._in.readinto(view[self._filled:])
+            if not n:
+                return False
+            self._filled += n
+        self._filled = 0
+        return True
+
+    def read(self):
+        if self._frame is None:
+            if not self._read_exact(memoryview(self._header)):
+                return None, None
+            json_len, blob_len = self._HEADER.unpack(self._header)
+            if json_len + blob_len > len(self._buf):
+                self._buf = bytearray(json_len + blob_len)
+            self._frame = (json_len, blob_len)
+        json_len, blob_len = self._frame
+        view = memoryview(self._buf)[:json_len + blob_len]
+        if not self._read_exact(view):
+            return None, None
+        self._frame = None
+        msg = _original_json_loads(str(view[:json_len], 'utf-8'))
+        return msg, (view[json_len:] if blob_len else None)
+
+    def _write_all(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[self._out.write(view):]
+
+    def write(self, payload, blob=None):
+        self.write_text(_encode_message(payload), blob)
+
+    def write_text(self, text, blob=None):
+        data = text.encode('utf-8')
+        blob_len = len(blob) if blob is not None else 0
+        # 头和 JSON 合并写出；blob 可能很大，单独写出避免再复制一份
+        parts = (self._HEADER.pack(len(data), blob_len) + data,) + ((blob,) if blob_len else ())
+        _write_message_atomically(self._write_all, *parts)
+
+
+_channel = _LineChannel()
+
+
+class _ResultEncoder(json.JSONEncoder):
+    """codeReturn 的原生编码：numpy/pandas 结果按类型做向量化转换，而不是退化成 repr 字符串。
+
+    DataFrame/Series 由 pandas 的 C 实现 to_json 直接生成 JSON 片段：default 先返回带随机
+    token 的占位字符串，encode 结束后再把占位符替换成片段，避免 to_dict 的逐行 Python 对象开销。
+    浮点数最多保留 15 位有效数字（pandas to_json 的上限），NaN/NaT 输出为 null。
+    """
+
+    def __init__(self, *, orient='records', **kwargs):
+        super().__init__(**kwargs)
+        self._orient = orient
+        self._token = _secrets.token_hex(16)
+        self._fragments = []
+
+    def encode(self, o):
+        text = super().encode(o)
+        if not self._fragments:
+            return text
+        fragments = self._fragments
+        return _re.sub(f'"{self._token}:(\\d+)"', lambda m: fragments[int(m.group(1))], text)
+
+    def _fragment(self, raw):
+        self._fragments.append(raw)
+        return f'{self._token}:{len(self._fragments) - 1}'
+
+    def _pandas_json(self, obj, orient):
+        return obj.to_json(
+            orient=orient, date_format='iso', double_precision=15,
+            force_ascii=False, default_handler=str,
+        )
+
+    def default(self, o):
+        # 只在用户代码已经导入时才处理，编码本身不触发 numpy/pandas 导入
+        pd = sys.modules.get('pandas')
+        if pd is not None:
+            if isinstance(o, pd.DataFrame):
+                if self._orient == 'columns':
+                    # {列名: [值...]}，与 DataFrame.to_dict('list') 一致
+                    return self._fragment('{' + ','.join(
+                        _original_json_dumps(str(col), ensure_ascii=False) + ':'
+                        + self._pandas_json(o[col], 'values')
+                        for col in o.columns
+                    ) + '}')
+                # [{列名: 值}...]，与 DataFrame.to_dict('records') 一致
+                return self._fragment(self._pandas_json(o, 'records'))
+            if isinstance(o, pd.Series):
+                # {索引: 值}，与 Series.to_dict() 一致；索引重复时退化为值列表
+                if o.index.is_unique:
+                    return self._fragment(self._pandas_json(o, 'index'))
+                return self._fragment(self._pandas_json(o, 'values'))
+            if isinstance(o, pd.Index):
+                return self._fragment(self._pandas_json(o.to_series(), 'values'))
+            # NaT 是 datetime 的子类，需要在通用 datetime 分支之前处理
+            if o is pd.NaT or o is pd.NA:
+                return None
+
+        np = sys.modules.get('numpy')
+        if np is not None:
+            if isinstance(o, np.ndarray):
+                kind = o.dtype.kind
+                if kind == 'f':
+                    finite = np.isfinite(o)
+                    if finite.all():
+                        return o.tolist()
+                    values = o.astype(object)
+                    values[~finite] = None
+                    return values.tolist()
+                if kind == 'M':
+                    values = np.datetime_as_string(o).astype(object)
+                    values[np.isnat(o)] = None
+                    return values.tolist()
+                if kind in 'biuUSO':
+                    return o.tolist()
+                return o.astype(str).tolist()
+            if isinstance(o, np.datetime64):
+                return None if np.isnat(o) else str(np.datetime_as_string(o))
+            if isinstance(o, np.floating):
+                return float(o) if np.isfinite(o) else None
+            if isinstance(o, np.generic):
+                return o.item()
+
+        if isinstance(o, (_datetime.datetime, _datetime.date, _datetime.time)):
+            return o.isoformat()
+        if isinstance(o, _decimal.Decimal):
+            return str(o)
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+        if isinstance(o, (bytes, bytearray, memoryview)):
+            return _base64.b64encode(o).decode('ascii')
+        return str(o)
+
+
+def _replace_non_finite(value):
+    if isinstance(value, float):
+        return value if _math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _replace_non_finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(v) for v in value]
+    return value
+
+
+def _encode_message(payload):
+    if _result_orient is None:
+        return _original_json_dumps(payload, ensure_ascii=False, default=str)
+    try:
+        return _original_json_dumps(
+            payload, ensure_ascii=False, allow_nan=False, cls=_ResultEncoder, orient=_result_orient
+        )
+    except ValueError:
+        # float 子类（含 numpy.float64）由 C 编码器直接输出，不经过 default；出现 NaN/Infinity
+        # 时才走一遍 Python 级替换，常规结果不付出遍历成本。
+        return _original_json_dumps(
+            _replace_non_finite(payload), ensure_ascii=False, allow_nan=False,
+            cls=_ResultEncoder, orient=_result_orient,
+        )
+
+
+def _mark_phase(name):
+    """记录自上一个标记以来的耗时到当前任务的 metrics。"""
+    global _phase_started_at
+    now = _time.perf_counter()
+    _metrics[name] = round((now - _phase_started_at) * 1000, 3)
+    _phase_started_at = now
+
 
 def _write_result(payload):
-    sys.stdout.write(_original_json_dumps({'type': 'result', **payload}, ensure_ascii=False, default=str) + '\n')
-    sys.stdout.flush()
+    start = _time.perf_counter()
+    _write_result_text(_encode_message({'type': 'result', **payload}), start)
+
+
+def _write_batch_result(item_texts, log):
+    """各项已在执行时单独编码（用于逐项检查输出上限），这里只拼接外层结构。"""
+    start = _time.perf_counter()
+    text = (
+        '{"type": "result", "success": true, "data": {"results": ['
+        + ', '.join(item_texts)
+        + '], "log": ' + _original_json_dumps(log, ensure_ascii=False) + '}}'
+    )
+    if _emitted_files:
+        text = text[:-1] + ', "files": ' + _original_json_dumps(_emitted_files, ensure_ascii=False) + '}'
+    _write_result_text(text, start)
+
+
+def _write_result_text(text, start):
+    if _metrics or _warm_metrics:
+        # metrics 需要包含结果本身的序列化耗时，因此在编码完成后拼接到 JSON 对象末尾
+        metrics = dict(_metrics)
+        metrics['serialize'] = round((_time.perf_counter() - start) * 1000, 3)
+        if _warm_metrics:
+            metrics['warmup'] = _warm_metrics
+        text = text[:-1] + ', "metrics": ' + _original_json_dumps(metrics) + '}'
+    if _profiler is not None:
+        # 折叠栈只使用结果之外剩余的输出额度，超出时丢弃采样数最少的栈
+        budget = _REQUEST_LIMITS['max_output_size'] - len(text.encode('utf-8')) - 256
+        profile = _profiler.report(budget)
+        text = text[:-1] + ', "profile": ' + _original_json_dumps(profile, ensure_ascii=False) + '}'
+    _channel.write_text(text)
+
+
+def _write_compiled(code_obj):
+    data = _marshal.dumps(code_obj)
+    if len(data) > _MAX_COMPILED_SIZE:
+        return
+    if _channel.supports_blob:
+        _channel.write({'type': 'compiled'}, data)
+    else:
+        _channel.write({'type': 'compiled', 'code': _base64.b64encode(data).decode('ascii')})
+
+
+def _load_user_code(msg, code, blob=None):
+    """返回用户代码的 code object；runner 缓存命中时直接反序列化，跳过 AST 校验和编译。"""
+    if blob is not None:
+        return _marshal.loads(blob)
+    compiled = msg.get('compiledCode')
+    if compiled:
+        return _marshal.loads(_base64.b64decode(compiled))
+    _validate_user_code(code)
+    code_obj = compile(code, '<string>', 'exec')
+    # 必须在执行任何用户代码之前上报，runner 只接受任务的第一条消息作为编译结果。
+    if msg.get('emitCompiled'):
+        _write_compiled(code_obj)
+    return code_obj
 
 
 def _init_request_limits(limits):
@@ -99,6 +467,45 @@ def _init_request_limits(limits):
         _REQUEST_LIMITS['max_request_body_size'] = limits['maxRequestBodySize']
     if 'maxOutputSize' in limits:
         _REQUEST_LIMITS['max_output_size'] = limits['maxOutputSize']
+    if 'maxConcurrency' in limits:
+        _REQUEST_LIMITS['max_concurrency'] = max(1, limits['maxConcurrency'])
+
+
+def _build_http_payload(url, method='GET', headers=None, body=None, timeout=None, timeout_ms=None):
+    if headers is None:
+        headers = {}
+    if body is not None:
+        body_text = body if isinstance(body, str) else _original_json_dumps(body, ensure_ascii=False)
+        if len(body_text.encode('utf-8')) > _REQUEST_LIMITS['max_request_body_size']:
+            raise RuntimeError("Request body too large")
+
+    return {
+        'url': url,
+        'method': method,
+        'headers': headers,
+        'body': body,
+        'timeout': timeout,
+        'timeoutMs': timeout_ms
+    }
+
+
+class _HttpFuture:
+    """http_request_async 返回的句柄，result() 阻塞到对应响应到达。"""
+    __slots__ = ('_id', '_response')
+
+    def __init__(self, req_id):
+        self._id = req_id
+        self._response = None
+
+    def done(self):
+        return self._response is not None or self._id in _http_responses
+
+    def result(self):
+        if self._response is None:
+            self._response = _wait_http_response(self._id)
+        if self._response.get('success'):
+            return self._response.get('payload')
+        raise RuntimeError(self._response.get('message') or 'HTTP request failed')
 
 
 class _SystemHelper:
@@ -106,28 +513,40 @@ class _SystemHelper:
 
     @staticmethod
     def http_request(url, method='GET', headers=None, body=None, timeout=None, timeout_ms=None):
-        if headers is None:
-            headers = {}
-        if body is not None:
-            body_text = body if isinstance(body, str) else _original_json_dumps(body, ensure_ascii=False)
-            if len(body_text.encode('utf-8')) > _REQUEST_LIMITS['max_request_body_size']:
-                raise RuntimeError("Request body too large")
-        else:
-            body_text = None
+        return _call_parent_http_proxy(_build_http_payload(url, method, headers, body, timeout, timeout_ms))
 
-        if body_text is not None and len(body_text.encode('utf-8')) > _REQUEST_LIMITS['max_request_body_size']:
-            raise RuntimeError("Request body too large")
+    @staticmethod
+    def http_request_async(url, method='GET', headers=None, body=None, timeout=None, timeout_ms=None):
+        payload = _build_http_payload(url, method, headers, body, timeout, timeout_ms)
+        return _HttpFuture(_send_http_request(payload))
 
-        return _call_parent_http_proxy({
-            'url': url,
-            'method': method,
-            'headers': headers,
-            'body': body if body_text is None or isinstance(body, str) else body,
-            'timeout': timeout,
-            'timeoutMs': timeout_ms
-        })
+    @staticmethod
+    def http_request_many(requests, return_exceptions=False):
+        """并发发起多个请求，按输入顺序返回结果；每项为 url 字符串或 http_request 的参数 dict。"""
+        futures = []
+        for item in requests:
+            if isinstance(item, str):
+                futures.append(_SystemHelper.http_request_async(item))
+            elif isinstance(item, dict):
+                futures.append(_SystemHelper.http_request_async(**item))
+            else:
+                raise TypeError("http_request_many items must be url strings or dicts")
+        results = []
+        error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    error = error or e
+                results.append(e)
+        if error is not None:
+            raise error
+        return results
 
     httpRequest = http_request
+    httpRequestAsync = http_request_async
+    httpRequestMany = http_request_many
 
 
 system_helper = _SystemHelper()
@@ -156,37 +575,269 @@ def create_hmac(algorithm, secret):
 def delay(ms):
     if ms > 10000:
         raise ValueError("Delay must be <= 10000ms")
+    _flush_logs()
+    _check_tmp_usage()
+    # 睡眠会越过截止时间时直接按超时处理，不再占着进程空等定时器
+    if _timeout_deadline is not None and _time.monotonic() + ms / 1000 >= _timeout_deadline:
+        raise TimeoutError("Script execution timed out")
     _time.sleep(ms / 1000)
     return None
 
 
+def emit_file(path, mime=None, name=None):
+    """把任务临时目录中的文件作为附件返回，内容不经过 base64 和结果 JSON。
+
+    这里只登记路径，任务结束后由 runner 从宿主机侧的临时目录直接读取；登记后到任务结束前
+    对文件的修改会体现在返回的内容里。
+    """
+    if len(_emitted_files) >= _MAX_EMITTED_FILES:
+        raise RuntimeError(f"Too many emitted files (limit: {_MAX_EMITTED_FILES})")
+    if not _is_path_under_task_tmp(path):
+        raise PermissionError("emit_file only accepts files in the task temporary directory")
+    real = _os.path.realpath(_os.fspath(path))
+    if not _os.path.isfile(real):
+        raise FileNotFoundError(f"No such file: {path}")
+    if mime is None:
+        mime = _EMIT_MIME_TYPES.get(_os.path.splitext(real)[1].lower(), 'application/octet-stream')
+    _emitted_files.append({
+        'path': real,
+        'name': str(name) if name else _os.path.basename(real),
+        'mime': str(mime),
+    })
+    return None
+
+
 _rpc_seq = 0
+# 已发出但尚未读到响应的请求 id，以及先于调用方到达的响应（按 id 暂存）。
+_http_inflight = {}
+_http_responses = {}
 
 
-def _call_parent_http_proxy(payload):
+def _read_runner_message():
+    """读取一条 runner 消息：HTTP 响应按 id 暂存，chunk_ack 归还流式结果的发送额度。
+
+    等待 HTTP 响应与等待 chunk 额度都经由这里读取，两类消息交错到达时都不会丢失。
+    """
+    global _chunk_credit
+    # 只忽略整条消息已读完但无法解码的情况；超时信号抛出的 TimeoutError/SystemExit 与读取中途的
+    # I/O 错误必须向上传播，否则阻塞在这里的任务要等到宽限期强制退出。
+    try:
+        msg, blob = _channel.read()
+    except ValueError:
+        return
+    if msg is None:
+        raise RuntimeError('Runner message channel closed')
+    msg_type = msg.get('type')
+    if msg_type == 'chunk_ack':
+        _chunk_credit += 1
+        return
+    req_id = msg.get('id')
+    if msg_type != 'http_response' or req_id not in _http_inflight:
+        return
+    # 帧协议下响应体以 blob 传输（空响应体不带 blob），缓冲区会被下一次读取复用，这里立即解码。
+    payload = msg.get('payload')
+    if _channel.supports_blob and isinstance(payload, dict) and 'data' not in payload:
+        payload['data'] = str(blob, 'utf-8', 'replace') if blob is not None else ''
+    sent_at = _http_inflight.pop(req_id)
+    _metrics.setdefault('http', []).append(round((_time.perf_counter() - sent_at) * 1000, 3))
+    _http_responses[req_id] = msg
+
+
+def _send_http_request(payload):
     global _rpc_seq
+    # 客户端侧同样限制在途请求数，超出时先收取一条响应再发送。
+    while len(_http_inflight) >= _REQUEST_LIMITS['max_concurrency']:
+        _read_runner_message()
     _rpc_seq += 1
     req_id = f'http-{_rpc_seq}'
-    sys.stdout.write(_original_json_dumps({
-        'type': 'http_request',
-        'id': req_id,
-        'payload': payload
-    }, ensure_ascii=False, default=str) + '\n')
-    sys.stdout.flush()
+    _channel.write({'type': 'http_request', 'id': req_id, 'payload': payload})
+    _http_inflight[req_id] = _time.perf_counter()
+    return req_id
 
-    while True:
-        line = sys.stdin.readline()
-        if not line:
-            raise RuntimeError('HTTP proxy response channel closed')
+
+def _wait_http_response(req_id):
+    # 阻塞等待前先推送已缓冲的日志，长耗时请求期间调用方也能看到进度
+    _flush_logs()
+    _check_tmp_usage()
+    while req_id not in _http_responses:
+        if req_id not in _http_inflight:
+            raise RuntimeError('HTTP request result was already consumed')
+        _read_runner_message()
+    return _http_responses.pop(req_id)
+
+
+def _call_parent_http_proxy(payload):
+    msg = _wait_http_response(_send_http_request(payload))
+    if msg.get('success'):
+        return msg.get('payload')
+    raise RuntimeError(msg.get('message') or 'HTTP request failed')
+
+
+def _apply_resource_limits(msg):
+    """在进入 seccomp/chroot 之前设置 rlimit，并保留 /proc/self/status 的 fd。
+
+    RLIMIT_DATA 统计堆和私有可写映射（numpy/pandas 的大块内存走 mmap 也计入），不含共享库
+    代码段。超限时分配直接失败，Python 抛出 MemoryError，任务可以正常返回
+    Memory limit exceeded，不必等 runner 轮询 RSS 后再 kill。
+    上限在当前 VmData（解释器与 zygote 中已导入的模块）之上再加 memoryLimitMB，预热进程还要
+    加上随后预导入模块的预留 preloadReserveMB，这些开销不占用户可用的内存额度。
+    RLIMIT_FSIZE 把单个文件限制在临时目录配额内，忽略 SIGXFSZ 后超限的 write 返回 EFBIG。
+    prlimit64 不在 seccomp 白名单内，因此只能在隔离前调用一次。
+    """
+    global _memory_limit_mb, _memory_limit_applied, _proc_status_fd
+    if _memory_limit_applied or _native_isolation_ready:
+        return
+    _memory_limit_applied = True
+    try:
+        _proc_status_fd = _os.open('/proc/self/status', _os.O_RDONLY)
+    except OSError:
+        _proc_status_fd = None
+    limit_mb = msg.get('memoryLimitMB')
+    if limit_mb:
+        base_mb = (_read_status_mb(b'VmData:') or 0) + int(msg.get('preloadReserveMB') or 0)
+        limit = int((int(limit_mb) + base_mb) * 1024 * 1024)
+        _resource.setrlimit(_resource.RLIMIT_DATA, (limit, limit))
+        _memory_limit_mb = int(limit_mb)
+    max_tmp_bytes = msg.get('maxTmpBytes')
+    if max_tmp_bytes:
+        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+        _resource.setrlimit(_resource.RLIMIT_FSIZE, (int(max_tmp_bytes), int(max_tmp_bytes)))
+
+
+def _read_status_mb(key):
+    if _proc_status_fd is None:
+        return None
+    try:
+        status = _os.pread(_proc_status_fd, 8192, 0)
+    except OSError:
+        return None
+    for line in status.split(b'\n'):
+        if line.startswith(key):
+            return round(int(line.split()[1]) / 1024, 3)
+    return None
+
+
+def _read_peak_rss_mb():
+    return _read_status_mb(b'VmHWM:')
+
+
+def _record_memory_metrics():
+    peak_rss = _read_peak_rss_mb()
+    if peak_rss is not None:
+        _metrics['peakRssMB'] = peak_rss
+    if _tracemalloc.is_tracing():
+        _metrics['tracedPeakMB'] = round(_tracemalloc.get_traced_memory()[1] / 1024 / 1024, 3)
+        _tracemalloc.stop()
+
+
+def _task_error_message(e):
+    if isinstance(e, MemoryError):
+        if _memory_limit_mb:
+            return f'Memory limit exceeded (limit: {_memory_limit_mb}MB)'
+        return 'Memory limit exceeded'
+    if isinstance(e, OSError) and e.errno == _errno.EFBIG and _tmp_quota:
+        return f'Temporary file limit exceeded (limit: {_tmp_quota // 1024 // 1024}MB)'
+    return str(e)
+
+
+def _track_tmp_file(path):
+    """登记一次对任务临时目录的写打开，并按累计用量检查配额。
+
+    只重新 stat 上一个写打开的文件和本次打开的文件并增量更新总量，写打开次数多时不必每次
+    stat 全部已登记文件；其余文件的变化在 _check_tmp_usage 的完整统计中补上。
+    """
+    global _tmp_last_written
+    if not _tmp_quota or not isinstance(path, (str, bytes)):
+        return
+    try:
+        real = _os.path.realpath(_os.fsdecode(path))
+    except Exception:
+        return
+    if _tmp_last_written is not None and _tmp_last_written != real:
+        _update_tmp_file_size(_tmp_last_written)
+    # 打开时文件可能尚未创建，stat 失败会移除登记，因此更新后再补登记
+    _update_tmp_file_size(real)
+    _tmp_files.setdefault(real, 0)
+    _tmp_last_written = real
+    _report_tmp_usage()
+
+
+def _update_tmp_file_size(path):
+    """重新 stat 一个已登记文件并更新总量；文件已不存在时移除登记。"""
+    global _tmp_total
+    if path not in _tmp_files:
+        return
+    stat = _original_os_functions.get('stat', _os.stat)
+    try:
+        size = stat(path).st_size
+    except OSError:
+        _tmp_total -= _tmp_files.pop(path)
+        return
+    _tmp_total += size - _tmp_files[path]
+    _tmp_files[path] = size
+
+
+def _move_tmp_file(src, dst):
+    global _tmp_last_written, _tmp_total
+    try:
+        src_real = _os.path.realpath(_os.fsdecode(src))
+    except Exception:
+        return
+    if src_real not in _tmp_files:
+        return
+    try:
+        dst_real = _os.path.realpath(_os.fsdecode(dst))
+    except Exception:
+        return
+    # 覆盖已登记的目标文件时，其原有大小不再占用配额
+    _tmp_total -= _tmp_files.pop(dst_real, 0)
+    _tmp_files[dst_real] = _tmp_files.pop(src_real)
+    if _tmp_last_written in (src_real, dst_real):
+        _tmp_last_written = dst_real
+
+
+def _check_tmp_usage():
+    """重新 stat 全部已登记的文件得到当前用量，不遍历目录。
+
+    在 delay、等待 HTTP 响应和 main 返回等检查点调用，补上 _track_tmp_file 增量统计之外的变化。
+    """
+    global _tmp_total
+    if not _tmp_quota or not _tmp_files:
+        return
+    stat = _original_os_functions.get('stat', _os.stat)
+    total = 0
+    for path in list(_tmp_files):
         try:
-            msg = json.loads(line)
-        except Exception:
-            continue
-        if msg.get('type') != 'http_response' or msg.get('id') != req_id:
+            size = stat(path).st_size
+        except OSError:
+            _tmp_files.pop(path, None)
             continue
-        if msg.get('success'):
-            return msg.get('payload')
-        raise RuntimeError(msg.get('message') or 'HTTP request failed')
+        _tmp_files[path] = size
+        total += size
+    _tmp_total = total
+    _report_tmp_usage()
+
+
+def _report_tmp_usage():
+    """按当前累计用量推送档位变化并检查配额。
+
+    用量跨过新的档位时推送一条 tmp_usage 给 runner；超出配额时抛错，runner 收到超限的
+    tmp_usage 后也会直接结束任务，用户代码吞掉异常也无法继续写入。
+    """
+    global _tmp_reported_step
+    total = _tmp_total
+    exceeded = total > _tmp_quota
+    step = len(_TMP_USAGE_STEPS) + 1 if exceeded else sum(
+        1 for ratio in _TMP_USAGE_STEPS if total >= _tmp_quota * ratio
+    )
+    if step > _tmp_reported_step:
+        _tmp_reported_step = step
+        _channel.write({'type': 'tmp_usage', 'bytes': total})
+    if exceeded:
+        raise OSError(
+            f'Temporary file limit exceeded (size: {-(-total // 1024 // 1024)}MB, '
+            f'limit: {_tmp_quota // 1024 // 1024}MB)'
+        )
 
 
 def _init_native_isolation(isolation):
@@ -227,19 +878,81 @@ def _init_native_isolation(isolation):
     raise RuntimeError(err_text or f"Native python sandbox init failed: {ret}")
 
 
-def _is_stdlib_frame(filename: str):
-    if not filename:
-        return False
+def _path_prefixes(*keys):
     try:
-        stdlib = _sysconfig.get_paths().get('stdlib') or ''
-        platstdlib = _sysconfig.get_paths().get('platstdlib') or ''
-        return (stdlib and filename.startswith(stdlib)) or (platstdlib and filename.startswith(platstdlib))
+        paths = _sysconfig.get_paths()
     except Exception:
-        return False
+        return ()
+    prefixes = []
+    for key in keys:
+        value = paths.get(key)
+        if value:
+            prefix = value.rstrip(_os.sep) + _os.sep
+            if prefix not in prefixes:
+                prefixes.append(prefix)
+    return tuple(prefixes)
+
+
+# 帧来源分类。解释器路径在进程生命周期内不变，只在 bootstrap 导入时解析一次。
+_ORIGIN_USER = 1
+_ORIGIN_BOOTSTRAP = 2
+_ORIGIN_STDLIB = 4
+_ORIGIN_SITE = 8
+_ORIGIN_MATPLOTLIB = 16
+_ORIGIN_MPL_FONT_MANAGER = 32
+_USER_CODE_FILENAMES = frozenset({'<string>', '<test>', '<module>'})
+_STDLIB_PREFIXES = _path_prefixes('stdlib', 'platstdlib')
+_SITE_PREFIXES = _path_prefixes('purelib', 'platlib')
+
+
+@_functools.lru_cache(maxsize=2048)
+def _classify_filename(filename):
+    if not filename:
+        return 0
+    if filename in _USER_CODE_FILENAMES:
+        return _ORIGIN_USER
+    if filename == __file__:
+        return _ORIGIN_BOOTSTRAP
+    origin = 0
+    if filename.startswith(_STDLIB_PREFIXES):
+        origin |= _ORIGIN_STDLIB
+    if (
+        filename.startswith(_SITE_PREFIXES)
+        or 'site-packages' in filename
+        or 'dist-packages' in filename
+    ):
+        origin |= _ORIGIN_SITE
+    normalized = filename.replace('\\', '/')
+    if '/matplotlib/' in normalized:
+        origin |= _ORIGIN_MATPLOTLIB
+        if normalized.endswith('/matplotlib/font_manager.py'):
+            origin |= _ORIGIN_MPL_FONT_MANAGER
+    return origin
+
+
+# 按代码对象身份缓存来源分类，热路径上只做一次 id 查表。缓存持有代码对象的强引用，
+# 保证 id 在缓存存活期间不会被复用。
+_code_origins = {}
+_MAX_CODE_ORIGINS = 4096
+
+
+def _code_origin(code):
+    entry = _code_origins.get(id(code))
+    if entry is not None and entry[0] is code:
+        return entry[1]
+    origin = _classify_filename(code.co_filename)
+    if len(_code_origins) >= _MAX_CODE_ORIGINS:
+        _code_origins.clear()
+    _code_origins[id(code)] = (code, origin)
+    return origin
+
+
+def _is_stdlib_frame(filename: str):
+    return bool(_classify_filename(filename) & _ORIGIN_STDLIB)
 
 
 def _is_site_packages_frame(filename: str):
-    return 'site-packages' in filename or 'dist-packages' in filename
+    return bool(_classify_filename(filename) & _ORIGIN_SITE)
 
 
 class _BuiltinsProxy(_types.ModuleType):
@@ -286,25 +999,22 @@ def _safe_delattr(obj, name):
 
 
 def _is_direct_user_import_call():
-    global _import_guard
-    _import_guard = True
     try:
-        stack = _tb.extract_stack()
-    finally:
-        _import_guard = False
-
-    if len(stack) < 3:
+        caller = sys._getframe(2).f_code
+    except ValueError:
         return False
-    caller_fn = stack[-3].filename or ''
-    return caller_fn in ('<string>', '<test>', '<module>')
+    return _code_origin(caller) == _ORIGIN_USER
 
 
 def _safe_import(name, *args, **kwargs):
-    if _import_guard:
-        return _original_import(name, *args, **kwargs)
     top_level = name.split('.')[0]
     if top_level == 'builtins' and _builtins_proxy is not None:
         return _builtins_proxy
+    shim = _user_module_shims.get(top_level)
+    if shim is not None and _code_origin(sys._getframe(1).f_code) == _ORIGIN_USER:
+        # 先按原逻辑导入（处理子模块与 fromlist），返回的是顶层模块时换成本任务的副本
+        module = _original_import(name, *args, **kwargs)
+        return shim if module.__name__ == top_level else module
     if top_level in _STDLIB_MODULES and top_level not in _DANGEROUS_STDLIB:
         return _original_import(name, *args, **kwargs)
     if top_level in _allowed_modules:
@@ -341,36 +1051,19 @@ def _validate_user_code(code: str):
 
 
 def _restricted_open(*args, **kwargs):
-    global _open_guard
     path = args[0] if args else None
     mode = kwargs.get('mode', args[1] if len(args) > 1 else 'r')
-    if _open_guard:
-        return _original_open(*args, **kwargs)
-    _open_guard = True
-    try:
-        stack = _tb.extract_stack()
-    finally:
-        _open_guard = False
-    if len(stack) >= 2:
-        caller_fn = stack[-2].filename or ''
-        if _is_user_code_filename(caller_fn) and not _is_path_under_task_tmp(path):
-            raise PermissionError("File system access is not allowed in sandbox")
-        if (
-            not _is_stdlib_frame(caller_fn)
-            and not _is_site_packages_frame(caller_fn)
-            and caller_fn != __file__
-            and not _is_path_under_task_tmp(path)
-        ):
-            raise PermissionError("File system access is not allowed in sandbox")
+    origin = _code_origin(sys._getframe(1).f_code)
+    if (
+        not origin & (_ORIGIN_BOOTSTRAP | _ORIGIN_STDLIB | _ORIGIN_SITE)
+        and not _is_path_under_task_tmp(path)
+    ):
+        raise PermissionError("File system access is not allowed in sandbox")
     if _is_write_mode(mode) and not _is_path_under_task_tmp(path):
         raise PermissionError("File writes are only allowed in the task temporary directory")
     return _original_open(*args, **kwargs)
 
 
-def _is_user_code_filename(filename):
-    return filename in ('<string>', '<test>', '<module>')
-
-
 def _is_write_mode(mode):
     mode_text = str(mode or 'r')
     return any(flag in mode_text for flag in ('w', 'a', 'x', '+'))
@@ -403,46 +1096,64 @@ def _is_path_under_task_tmp(path):
         return False
     if not isinstance(path_text, str):
         return False
+    verdict = _path_verdicts.get(path_text)
+    if verdict is not None:
+        return verdict
     try:
         _path_guard = True
-        root = _os.path.realpath(_task_tmpdir)
+        root = _task_tmp_root or _os.path.realpath(_task_tmpdir)
+        prefix = _task_tmp_prefix or root.rstrip(_os.sep) + _os.sep
         candidate = _os.path.realpath(path_text if _os.path.isabs(path_text) else _os.path.join(_os.getcwd(), path_text))
-        return candidate == root or candidate.startswith(root.rstrip(_os.sep) + _os.sep)
+        verdict = candidate == root or candidate.startswith(prefix)
     except Exception:
         return False
     finally:
         _path_guard = False
+    if len(_path_verdicts) >= _MAX_PATH_VERDICTS:
+        _path_verdicts.pop(next(iter(_path_verdicts)))
+    _path_verdicts[path_text] = verdict
+    return verdict
 
 
-def _is_called_from_matplotlib():
+def _invalidate_path_verdicts():
+    _path_verdicts.clear()
+
+
+def _find_caller_origin(flag, depth):
+    """从调用栈向外查找带 flag 的帧，遇到用户代码帧即停止：其外层不可能再是库的调用方。"""
     try:
-        frame = sys._getframe(1)
-        while frame:
-            filename = frame.f_code.co_filename or ''
-            normalized = filename.replace('\\', '/')
-            if '/matplotlib/' in normalized:
-                return True
-            frame = frame.f_back
-    except Exception:
+        frame = sys._getframe(depth + 1)
+    except ValueError:
         return False
+    while frame is not None:
+        origin = _code_origin(frame.f_code)
+        if origin & flag:
+            return True
+        if origin == _ORIGIN_USER:
+            return False
+        frame = frame.f_back
     return False
 
 
-def _first_external_caller_filename():
+def _is_called_from_matplotlib():
+    return _find_caller_origin(_ORIGIN_MATPLOTLIB, 1)
+
+
+def _first_external_caller_origin():
     try:
         frame = sys._getframe(1)
         while frame:
-            filename = frame.f_code.co_filename or ''
-            if filename != __file__:
-                return filename
+            origin = _code_origin(frame.f_code)
+            if origin != _ORIGIN_BOOTSTRAP:
+                return origin
             frame = frame.f_back
     except Exception:
-        return ''
-    return ''
+        return 0
+    return 0
 
 
 def _is_direct_user_fs_access():
-    return _is_user_code_filename(_first_external_caller_filename())
+    return _first_external_caller_origin() == _ORIGIN_USER
 
 
 def _guard_fs_read_path(path):
@@ -557,10 +1268,13 @@ def _install_matplotlib_tmpdir_patch():
 
 
 def _init_task_tmpdir(path):
-    global _task_tmpdir, _matplotlib_tmpdir
+    global _task_tmpdir, _task_tmp_root, _task_tmp_prefix, _matplotlib_tmpdir
     _task_tmpdir = path or _os.environ.get('FASTGPT_TASK_TMPDIR') or '/tmp'
+    _invalidate_path_verdicts()
     try:
         _os.makedirs(_task_tmpdir, mode=0o700, exist_ok=True)
+        _task_tmp_root = _os.path.realpath(_task_tmpdir)
+        _task_tmp_prefix = _task_tmp_root.rstrip(_os.sep) + _os.sep
         _os.environ['HOME'] = _task_tmpdir
         _os.environ['TMPDIR'] = _task_tmpdir
         mpl_config_dir = _os.path.join(_task_tmpdir, 'matplotlib')
@@ -581,11 +1295,45 @@ def _init_task_tmpdir(path):
 
 
 def _safe_print(*args, **kwargs):
-    global _log_size
+    global _log_size, _log_truncated, _log_pending_size
+    if _log_truncated:
+        return
     line = ' '.join(str(a) for a in args)
-    if _log_size + len(line) <= _MAX_LOG_SIZE:
+    # 按 UTF-8 字节计数（含 join 时的换行符），与 runner 的输出上限口径一致
+    size = len(line.encode('utf-8', 'surrogatepass')) + 1
+    if _log_size + size > _MAX_LOG_SIZE:
+        _log_truncated = True
+        line = f'[log truncated: exceeded {_MAX_LOG_SIZE} bytes]'
+    else:
+        _log_size += size
+
+    if not _log_stream:
         _logs.append(line)
-        _log_size += len(line)
+        return
+    _log_pending.append(line)
+    _log_pending_size += size
+    if (
+        _log_truncated
+        or _log_pending_size >= _LOG_FLUSH_BYTES
+        or _time.monotonic() - _log_flushed_at >= _LOG_FLUSH_INTERVAL
+    ):
+        _flush_logs()
+
+
+def _flush_logs():
+    global _log_pending, _log_pending_size, _log_flushed_at
+    _log_flushed_at = _time.monotonic()
+    if not _log_pending:
+        return
+    chunk = '\n'.join(_log_pending)
+    _log_pending = []
+    _log_pending_size = 0
+    _channel.write({'type': 'log', 'data': chunk})
+
+
+def _set_timeout_timer(seconds):
+    """以 ITIMER_REAL 计时，不再像 signal.alarm 那样向上取整到秒；0 表示取消。"""
+    signal.setitimer(signal.ITIMER_REAL, seconds)
 
 
 def _timeout_handler(signum, frame):
@@ -593,7 +1341,8 @@ def _timeout_handler(signum, frame):
     _timeout_stage += 1
     if _timeout_stage >= 2:
         raise SystemExit("Script execution timed out (forced)")
-    signal.alarm(1)
+    # 用户代码吞掉 TimeoutError 时，宽限期后再次触发并强制退出
+    _set_timeout_timer(_timeout_grace)
     raise TimeoutError("Script execution timed out")
 
 
@@ -608,8 +1357,10 @@ def _install_audit_hook():
             path = args[0] if len(args) > 0 else None
             mode = args[1] if len(args) > 1 else 'r'
             flags = args[2] if len(args) > 2 else 0
-            if not _is_path_under_task_tmp(path) and (_is_write_mode(mode) or _is_write_flags(flags)):
-                raise RuntimeError("File writes are only allowed in the task temporary directory")
+            if _is_write_mode(mode) or _is_write_flags(flags):
+                if not _is_path_under_task_tmp(path):
+                    raise RuntimeError("File writes are only allowed in the task temporary directory")
+                _track_tmp_file(path)
             if _is_direct_user_fs_access() and not _is_path_under_task_tmp(path):
                 raise RuntimeError("File system access is only allowed in the task temporary directory")
             return
@@ -624,6 +1375,8 @@ def _install_audit_hook():
             path = args[0] if len(args) > 0 else None
             if _is_direct_user_fs_access() and not _is_path_under_task_tmp(path):
                 raise RuntimeError("File system access is only allowed in the task temporary directory")
+            if event == 'os.chdir':
+                _invalidate_path_verdicts()
             return
         if event in (
             'os.mkdir',
@@ -645,6 +1398,9 @@ def _install_audit_hook():
             target = args[1] if event in ('os.rename', 'os.replace', 'os.symlink', 'os.link') and len(args) > 1 else None
             if not _is_path_under_task_tmp(path) or (target is not None and not _is_path_under_task_tmp(target)):
                 raise RuntimeError("File system writes are only allowed in the task temporary directory")
+            if event in ('os.rename', 'os.replace') and target is not None:
+                _move_tmp_file(path, target)
+            _invalidate_path_verdicts()
             return
         if (
             event == 'os.system'
@@ -687,48 +1443,207 @@ def _is_allowed_matplotlib_font_probe(event, args):
 
 
 def _is_called_from_matplotlib_font_manager():
-    try:
-        for frame in _inspect_mod.stack()[2:]:
-            filename = frame.filename or ''
-            normalized = filename.replace('\\', '/')
-            if normalized.endswith('/matplotlib/font_manager.py'):
-                return True
-    except Exception:
-        return False
-    return False
-
+    return _find_caller_origin(_ORIGIN_MPL_FONT_MANAGER, 2)
+
+
+# 用户代码拿到的是这些模块的副本：改写 json.dumps 等只影响副本，bootstrap 与第三方库仍使用
+# 原模块，任务结束后也无需对比、还原原模块。副本内容在进程启动时复制一次。
+_SHIMMED_MODULES = (json, _math, _time, _base64, _hashlib, _hmac, _copy)
+_module_shim_templates = tuple(
+    (mod.__name__, {k: v for k, v in vars(mod).items() if k != '__builtins__'})
+    for mod in _SHIMMED_MODULES
+)
+_user_module_shims = {}
+
+
+def _new_module_shims():
+    """为一次任务创建模块副本：普通 ModuleType 加一次字典拷贝，属性读取与原模块一样快。"""
+    shims = {}
+    for name, attrs in _module_shim_templates:
+        # 不设置模块级 __getattr__：它会让解释器放弃模块属性读取的特化，热循环里的
+        # math.sqrt 等明显变慢
+        shim = _types.ModuleType(name)
+        shim.__dict__.update(attrs)
+        shims[name] = shim
+    return shims
+
+
+class _Profiler:
+    """基于 setitimer(ITIMER_PROF) 的采样器。
+
+    内核按进程 CPU 时间周期性投递 SIGPROF，Python 在主线程的信号处理函数里回溯被打断的
+    调用栈，不需要额外线程，seccomp 下同样可用。bootstrap 自身的帧（守卫、_call_main 等）
+    不计入栈，只保留用户代码与标准库/第三方库的帧。阻塞在 delay、HTTP 代理等待上的时间
+    不消耗 CPU，不会被采样。
+    """
+
+    def __init__(self, interval=_PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._stacks = {}
+
+    def _sample(self, signum, frame):
+        self.samples += 1
+        stack = []
+        while frame is not None and len(stack) < _MAX_PROFILE_DEPTH:
+            code = frame.f_code
+            if not _code_origin(code) & _ORIGIN_BOOTSTRAP:
+                stack.append(code)
+            frame = frame.f_back
+        if stack:
+            key = tuple(reversed(stack))
+            self._stacks[key] = self._stacks.get(key, 0) + 1
 
-_PROTECTED_MODULES = [json, _math, _time, _base64, _hashlib, _hmac, _copy]
+    def start(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
 
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        # 定时器停止前可能已有 SIGPROF 在途，SIG_DFL 会直接终止进程，因此改为忽略
+        signal.signal(signal.SIGPROF, signal.SIG_IGN)
 
-def _snapshot_modules():
-    snapshots = []
-    for mod in _PROTECTED_MODULES:
-        attrs = {}
-        for name in dir(mod):
-            if not name.startswith('__'):
-                try:
-                    attrs[name] = getattr(mod, name)
-                except Exception:
-                    pass
-        snapshots.append((mod, attrs))
-    return snapshots
+    @staticmethod
+    def _label(code):
+        filename = code.co_filename
+        if _classify_filename(filename) & _ORIGIN_USER:
+            filename = '<user>'
+        else:
+            for prefix in _SITE_PREFIXES + _STDLIB_PREFIXES:
+                if filename.startswith(prefix):
+                    filename = filename[len(prefix):]
+                    break
+        # 折叠栈格式以 ';' 分隔帧、以最后一个空格分隔计数
+        return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+
+    def report(self, max_bytes):
+        """返回折叠栈（flamegraph.pl / speedscope 可直接读取），按采样数降序截断到 max_bytes。"""
+        labels = {}
+        lines = []
+        size = 0
+        truncated = False
+        for stack, count in sorted(self._stacks.items(), key=lambda item: item[1], reverse=True):
+            parts = []
+            for code in stack:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = self._label(code)
+                parts.append(label)
+            line = f'{";".join(parts)} {count}'
+            line_size = len(line.encode('utf-8')) + 1
+            if size + line_size > max_bytes:
+                truncated = True
+                break
+            lines.append(line)
+            size += line_size
+        return {
+            'intervalMs': self.interval * 1000,
+            'samples': self.samples,
+            'collapsed': '\n'.join(lines),
+            'truncated': truncated,
+        }
 
 
-def _restore_modules(snapshots):
-    for mod, attrs in snapshots:
-        current_names = set(n for n in dir(mod) if not n.startswith('__'))
-        original_names = set(attrs.keys())
-        for name in current_names - original_names:
-            try:
-                delattr(mod, name)
-            except Exception:
-                pass
-        for name, val in attrs.items():
-            try:
-                setattr(mod, name, val)
-            except Exception:
-                pass
+def _stop_profiler():
+    if _profiler is not None:
+        _profiler.stop()
+
+
+class _LazyInput:
+    """runner 写入任务临时目录的输入文件，首次访问时才加载。
+
+    bytes 的 len 取自文件大小，下标/切片在整体加载前按需读取对应区间，不把整个文件读入内存；
+    .value 等需要完整内容时才读取为 bytes。不向用户代码暴露 mmap 等文件映射对象（mmap 属于
+    禁用模块）。text/json/csv 在首次访问时读取并解析一次后缓存。其余操作委托给加载后的值。
+    """
+    __slots__ = ('name', 'path', 'format', 'size', '_value', '_loaded')
+
+    _FORMATS = ('bytes', 'text', 'json', 'csv')
+
+    def __init__(self, name, spec):
+        path = spec.get('path')
+        fmt = spec.get('format') or 'bytes'
+        if not isinstance(path, str) or not _is_path_under_task_tmp(path):
+            raise RuntimeError(f"Input file '{name}' must be in the task temporary directory")
+        if fmt not in self._FORMATS:
+            raise RuntimeError(f"Unsupported input file format: {fmt}")
+        self.name = name
+        self.path = path
+        self.format = fmt
+        self.size = int(spec.get('size') or 0)
+        self._value = None
+        self._loaded = False
+
+    @property
+    def value(self):
+        if not self._loaded:
+            self._value = self._load()
+            self._loaded = True
+        return self._value
+
+    def _load(self):
+        if self.format == 'csv':
+            with _original_open(self.path, 'r', encoding='utf-8', newline='') as f:
+                return list(_csv.DictReader(f))
+        if self.format == 'text':
+            with _original_open(self.path, 'r', encoding='utf-8') as f:
+                return f.read()
+        with _original_open(self.path, 'rb') as f:
+            data = f.read()
+        return data if self.format == 'bytes' else _original_json_loads(data)
+
+    def _read_range(self, key):
+        """整体加载前的 bytes 下标/切片：只读取需要的区间，语义与 bytes 相同。"""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                return self.value[key]
+            with _original_open(self.path, 'rb') as f:
+                f.seek(start)
+                return f.read(max(stop - start, 0))
+        if not isinstance(key, int):
+            return self.value[key]
+        index = key + self.size if key < 0 else key
+        if not 0 <= index < self.size:
+            raise IndexError('index out of range')
+        with _original_open(self.path, 'rb') as f:
+            f.seek(index)
+            return f.read(1)[0]
+
+    def __len__(self):
+        if self.format == 'bytes':
+            return self.size
+        return len(self.value)
+
+    def __getitem__(self, key):
+        if self.format == 'bytes' and not self._loaded:
+            return self._read_range(key)
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __bytes__(self):
+        return self.value if self.format == 'bytes' else str(self.value).encode('utf-8')
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return f'<input {self.name!r} format={self.format} size={self.size}>'
+
+
+def _load_input_files(variables, input_files):
+    """把 runner 写入的输入文件以 _LazyInput 放进 variables，同名的内联变量被覆盖。"""
+    if not input_files:
+        return variables
+    variables = dict(variables)
+    for name, spec in input_files.items():
+        variables[name] = _LazyInput(name, spec)
+    return variables
 
 
 def _call_main(user_main, variables):
@@ -750,119 +1665,467 @@ def _call_main(user_main, variables):
     return user_main(**call_kwargs)
 
 
-def _run_task(msg):
-    global _allowed_modules, _builtins_proxy, _request_count, _logs, _log_size, _timeout_stage
+def _is_result_stream(result):
+    # 只认迭代器（生成器、map/filter/zip 等），list/dict/DataFrame 等可迭代容器仍按整体返回
+    return hasattr(type(result), '__next__') and hasattr(type(result), '__iter__')
+
+
+def _stream_result(iterator):
+    """逐个推送迭代器产生的值。
+
+    max_output_size 按所有 chunk 累计计算；额度用完时阻塞等待 runner 的 chunk_ack，
+    迭代器在此期间不会继续产生新值，生成器持有的内存不会随下游变慢而堆积。
+    """
+    global _chunk_credit
+    limit = _REQUEST_LIMITS['max_output_size']
+    sent_bytes = 0
+    for value in iterator:
+        text = _encode_message({'type': 'chunk', 'data': value})
+        sent_bytes += len(text.encode('utf-8'))
+        if sent_bytes > limit:
+            raise RuntimeError(f'Output too large (limit: {limit} bytes)')
+        while _chunk_credit <= 0:
+            _read_runner_message()
+        _chunk_credit -= 1
+        # 先推送已缓冲的流式日志，保持日志与 chunk 的先后顺序
+        _flush_logs()
+        _channel.write_text(text)
+
+
+def _run_batch_items(user_main, exec_globals, batch):
+    """对 batch['items'] 逐项调用 main，返回每项编码后的 JSON 文本。
+
+    模块顶层只执行一次；每项之前替换 variables 及其注入的同名全局变量，并单独收集日志。
+    单项返回值加日志超过 itemMaxOutputSize 时该项失败；超时或累计输出超过
+    max_output_size 后，剩余项不再执行，直接标记失败。
+    """
+    global _logs, _log_size, _log_truncated
+    items = batch.get('items') or []
+    item_limit = int(batch.get('itemMaxOutputSize') or _REQUEST_LIMITS['max_output_size'])
+    # 为外层结构、顶层日志和 metrics 留出余量
+    budget = _REQUEST_LIMITS['max_output_size'] - _log_size - 4096
+    # 模块顶层与执行环境已定义的名字优先，与单任务先注入 variables 再执行模块顶层的结果一致；
+    # 未被模块顶层改写的可覆盖辅助函数与单任务一样让位于 variables，换项时恢复
+    defined = frozenset(
+        k for k, v in exec_globals.items()
+        if k not in _OVERRIDABLE_GLOBALS or v is not _exec_globals_template[k]
+    )
+    texts = []
+    injected = ()
+    for variables in items:
+        if _timeout_stage or budget <= 0:
+            break
+        for k in injected:
+            if k in _OVERRIDABLE_GLOBALS:
+                exec_globals[k] = _exec_globals_template[k]
+            else:
+                exec_globals.pop(k, None)
+        injected = [k for k in variables if k not in defined] if isinstance(variables, dict) else ()
+        for k in injected:
+            exec_globals[k] = variables[k]
+        exec_globals['variables'] = variables
+        _logs = []
+        _log_size = 0
+        _log_truncated = False
+        try:
+            if not isinstance(variables, dict):
+                raise TypeError('Batch item variables must be an object')
+            result = _call_main(user_main, variables)
+            if _is_result_stream(result):
+                result = list(result)
+            text = _encode_message({'success': True, 'data': {'codeReturn': result, 'log': '\n'.join(_logs)}})
+            if len(text.encode('utf-8')) > item_limit:
+                text = _encode_message({
+                    'success': False, 'message': f'Item output too large (limit: {item_limit} bytes)'
+                })
+        except (Exception, SystemExit) as e:
+            text = _encode_message({'success': False, 'message': _task_error_message(e)})
+        size = len(text.encode('utf-8'))
+        if size > budget:
+            break
+        budget -= size
+        texts.append(text)
+
+    if len(texts) < len(items):
+        if _timeout_stage:
+            message = 'Script execution timed out'
+        else:
+            message = f"Batch output too large (limit: {_REQUEST_LIMITS['max_output_size']} bytes)"
+        skipped = _encode_message({'success': False, 'message': message})
+        texts.extend([skipped] * (len(items) - len(texts)))
+    return texts
+
+
+class _SafeObject(object):
+    __subclasses__ = None
+
+
+# 任务执行环境中与请求无关的部分，只构造一次；每个任务浅拷贝后再填入 variables 等
+_safe_builtins_template = None
+_exec_globals_template = None
+# 每个任务单独填入的 globals（模块副本、变量、临时目录），同名的 variables 不会覆盖
+_SHIMMED_GLOBALS = ('json', 'math', 'time')
+# 后来新增的辅助函数：此前同名 variables 会注入为全局变量，为兼容仍让 variables 覆盖它们
+_OVERRIDABLE_GLOBALS = frozenset(('emit_file', 'http_request_async', 'http_request_many'))
+_RESERVED_GLOBALS = frozenset()
+
+
+def _prepare_task_templates():
+    """构造 safe builtins 与执行 globals 的模板。
+
+    预热进程在上报 ready 前调用，任务到达后只剩两次 dict 拷贝；一次性进程在首个任务中调用。
+    """
+    global _safe_builtins_template, _exec_globals_template, _RESERVED_GLOBALS, _builtins_proxy
+    if _safe_builtins_template is not None:
+        return
+
+    safe_builtins = {}
+    for name in dir(_builtins):
+        if name.startswith('_') and name not in ('__name__', '__doc__'):
+            continue
+        if name in _FORBIDDEN_BUILTINS:
+            continue
+        safe_builtins[name] = getattr(_builtins, name)
+    safe_builtins['__import__'] = _safe_import
+    safe_builtins['__build_class__'] = _builtins.__build_class__
+    safe_builtins['print'] = _safe_print
+    safe_builtins['open'] = _restricted_open
+    safe_builtins['getattr'] = _safe_getattr
+    safe_builtins['setattr'] = _safe_setattr
+    safe_builtins['delattr'] = _safe_delattr
+    safe_builtins['object'] = _SafeObject
+    _safe_builtins_template = _types.MappingProxyType(safe_builtins)
+
+    _exec_globals_template = _types.MappingProxyType({
+        'SystemHelper': system_helper,
+        'system_helper': system_helper,
+        'count_token': count_token,
+        'str_to_base64': str_to_base64,
+        'create_hmac': create_hmac,
+        'delay': delay,
+        'emit_file': emit_file,
+        'http_request': system_helper.http_request,
+        'http_request_async': system_helper.http_request_async,
+        'http_request_many': system_helper.http_request_many,
+        'print': _safe_print,
+    })
+    _RESERVED_GLOBALS = (frozenset(_exec_globals_template) - _OVERRIDABLE_GLOBALS) | frozenset(
+        ('__builtins__', 'variables', 'task_tmpdir') + _SHIMMED_GLOBALS
+    )
+    _builtins_proxy = _BuiltinsProxy(_builtins)
+    # matplotlib 临时目录补丁会导入 tempfile（连带 random/shutil），提前导入避免计入任务耗时
+    import tempfile  # noqa: F401
+
+
+def _run_task(msg, blob=None, received_at=None):
+    global _allowed_modules, _request_count, _timeout_stage
+    global _timeout_deadline, _timeout_grace
+    global _logs, _log_size, _log_truncated, _log_stream, _log_flushed_at, _result_orient
+    global _metrics, _phase_started_at, _profiler, _tmp_quota, _tmp_files, _tmp_reported_step
+    global _tmp_total, _tmp_last_written
+    global _user_module_shims, _result_stream, _chunk_credit, _emitted_files
     _allowed_modules = set(msg.get('allowedModules', []))
     _init_request_limits(msg.get('requestLimits'))
     _request_count = 0
     _logs = []
     _log_size = 0
+    _log_truncated = False
+    _log_stream = bool(msg.get('streamLogs'))
+    _result_stream = bool(msg.get('streamResult'))
+    _chunk_credit = _CHUNK_WINDOW
+    _result_orient = (
+        ('columns' if msg.get('dataFrameOrient') == 'columns' else 'records')
+        if msg.get('resultEncoder') == 'native' else None
+    )
+    _log_flushed_at = _time.monotonic()
     _timeout_stage = 0
+    _metrics = {}
+    _profiler = _Profiler() if msg.get('profile') else None
+    _tmp_quota = int(msg.get('maxTmpBytes') or 0)
+    _tmp_files = {}
+    _tmp_total = 0
+    _tmp_last_written = None
+    _tmp_reported_step = 0
+    _emitted_files = []
+    _user_module_shims = _new_module_shims()
 
     code = msg.get('code', '')
-    variables = msg.get('variables', {})
-    timeout_ms = msg.get('timeoutMs', 10000)
-    timeout_s = max(1, -(-timeout_ms // 1000))
+    batch = msg.get('batch')
+    # 批量任务的模块顶层只执行一次，看不到任何一项的 variables
+    variables = msg.get('variables', {}) if batch is None else {}
+    # 0 会让 setitimer 取消计时，跳过 schema 的内部调用也必须有正的超时
+    timeout_ms = max(msg.get('timeoutMs', 10000), 1)
+    _timeout_grace = max(msg.get('timeoutGraceMs', 500), 1) / 1000
 
     _builtins.__import__ = _safe_import
     _builtins.print = _safe_print
-    _builtins_proxy = _BuiltinsProxy(_builtins)
-
-    snapshots = _snapshot_modules()
 
     try:
+        _phase_started_at = _time.perf_counter()
+        _apply_resource_limits(msg)
         _init_native_isolation(msg.get('isolation') or {})
+        _mark_phase('isolationInit')
         _init_task_tmpdir(msg.get('taskTmpDir'))
+        variables = _load_input_files(variables, msg.get('inputFiles'))
+        _mark_phase('tmpdirInit')
         _install_os_guards()
         _install_matplotlib_tmpdir_patch()
+        _mark_phase('osGuards')
 
         signal.signal(signal.SIGALRM, _timeout_handler)
-        signal.alarm(timeout_s)
-
-        safe_builtins = {}
-        for name in dir(_builtins):
-            if name.startswith('_') and name not in (
-                '__name__', '__doc__', '__import__', '__build_class__',
-            ):
-                continue
-            if name in _FORBIDDEN_BUILTINS:
-                continue
-            safe_builtins[name] = getattr(_builtins, name)
-        safe_builtins['__import__'] = _safe_import
-        safe_builtins['__build_class__'] = _builtins.__build_class__
-        safe_builtins['open'] = _restricted_open
-        safe_builtins['getattr'] = _safe_getattr
-        safe_builtins['setattr'] = _safe_setattr
-        safe_builtins['delattr'] = _safe_delattr
-
-        class _SafeObject(object):
-            __subclasses__ = None
-        safe_builtins['object'] = _SafeObject
-
-        exec_globals = {
-            '__builtins__': safe_builtins,
-            'variables': variables,
-            'SystemHelper': system_helper,
-            'system_helper': system_helper,
-            'task_tmpdir': _task_tmpdir,
-            'count_token': count_token,
-            'str_to_base64': str_to_base64,
-            'create_hmac': create_hmac,
-            'delay': delay,
-            'http_request': system_helper.http_request,
-            'print': _safe_print,
-            'json': json,
-            'math': _math,
-            'time': _time,
-        }
-        reserved_keys = frozenset(exec_globals.keys())
+        _timeout_deadline = _time.monotonic() + timeout_ms / 1000
+        _set_timeout_timer(timeout_ms / 1000)
+
+        _prepare_task_templates()
+        exec_globals = dict(_exec_globals_template)
+        exec_globals['__builtins__'] = dict(_safe_builtins_template)
+        exec_globals['variables'] = variables
+        exec_globals['task_tmpdir'] = _task_tmpdir
+        for name in _SHIMMED_GLOBALS:
+            exec_globals[name] = _user_module_shims[name]
         for k, v in variables.items():
-            if k not in reserved_keys:
+            if k not in _RESERVED_GLOBALS:
                 exec_globals[k] = v
 
-        _validate_user_code(code)
+        _mark_phase('globals')
+
+        code_obj = _load_user_code(msg, code, blob)
+        _mark_phase('compile')
         _install_audit_hook()
-        exec(code, exec_globals)
+        if msg.get('traceMemory'):
+            _tracemalloc.start()
+        if _profiler is not None:
+            _profiler.start()
+        # 从收到任务消息到开始执行用户字节码，衡量每个任务固定的准备开销
+        received_at = received_at or _phase_started_at
+        _metrics['toUserCode'] = round((_time.perf_counter() - received_at) * 1000, 3)
+        exec(code_obj, exec_globals)
+        _mark_phase('exec')
 
         user_main = exec_globals.get('main')
         if user_main is None:
             raise RuntimeError("No 'main' function defined")
 
+        if batch is not None:
+            module_log = '\n'.join(_logs)
+            item_texts = _run_batch_items(user_main, exec_globals, batch)
+            _mark_phase('main')
+            _check_tmp_usage()
+            _stop_profiler()
+            _set_timeout_timer(0)
+            _record_memory_metrics()
+            _write_batch_result(item_texts, module_log)
+            return
+
         result = _call_main(user_main, variables)
-        signal.alarm(0)
-        _write_result({'success': True, 'data': {'codeReturn': result, 'log': '\n'.join(_logs)}})
+        if _is_result_stream(result):
+            if _result_stream:
+                _stream_result(result)
+                result = None
+            else:
+                # runner 未请求流式结果时整体返回，而不是生成器对象的 str()
+                result = list(result)
+        _mark_phase('main')
+        _check_tmp_usage()
+        _stop_profiler()
+        _set_timeout_timer(0)
+        _record_memory_metrics()
+        _flush_logs()
+        payload = {'success': True, 'data': {'codeReturn': result, 'log': '\n'.join(_logs)}}
+        if _emitted_files:
+            payload['files'] = _emitted_files
+        _write_result(payload)
     except (Exception, SystemExit) as e:
-        signal.alarm(0)
-        _write_result({'success': False, 'message': str(e)})
+        _stop_profiler()
+        _set_timeout_timer(0)
+        _record_memory_metrics()
+        _flush_logs()
+        _write_result({'success': False, 'message': _task_error_message(e)})
     finally:
-        _restore_modules(snapshots)
         _builtins.__import__ = _original_import
         _builtins.open = _original_open
 
 
+def _preload_modules(names, allowed_modules):
+    allowed = set(allowed_modules or [])
+    timings = {}
+    errors = {}
+    for name in names or []:
+        if not isinstance(name, str) or not name:
+            continue
+        if name.split('.')[0] not in allowed:
+            continue
+        for module_name in (name, *_PRELOAD_SUBMODULES.get(name, ())):
+            if module_name in timings or module_name in errors:
+                continue
+            start = _time.perf_counter()
+            try:
+                _original_import(module_name)
+            except (Exception, SystemExit) as e:
+                errors[module_name] = str(e) or e.__class__.__name__
+                break
+            timings[module_name] = round((_time.perf_counter() - start) * 1000, 3)
+    return timings, errors
+
+
 def _run_warm_worker(init_msg):
     try:
+        start = _time.perf_counter()
+        _apply_resource_limits(init_msg)
         _init_native_isolation(init_msg.get('isolation') or {})
-        sys.stdout.write(_original_json_dumps({'type': 'ready'}, ensure_ascii=False) + '\n')
-        sys.stdout.flush()
+        isolated_at = _time.perf_counter()
+        data_before = _read_status_mb(b'VmData:')
+        preload_ms, preload_errors = _preload_modules(
+            init_msg.get('preloadModules'),
+            init_msg.get('allowedModules')
+        )
+        preloaded_at = _time.perf_counter()
+        data_after = _read_status_mb(b'VmData:')
+        _prepare_task_templates()
+        _warm_metrics['isolationInit'] = round((isolated_at - start) * 1000, 3)
+        _warm_metrics['preload'] = round((preloaded_at - isolated_at) * 1000, 3)
+        _warm_metrics['templates'] = round((_time.perf_counter() - preloaded_at) * 1000, 3)
+        ready = {'type': 'ready', 'preloadMs': preload_ms}
+        # 预导入实际占用的 VmData，runner 据此设置后续预热进程的 preloadReserveMB
+        if data_before is not None and data_after is not None:
+            ready['preloadDataMB'] = round(data_after - data_before, 3)
+        if preload_errors:
+            ready['preloadErrors'] = preload_errors
+        use_frames = init_msg.get('protocol') == 'frame'
+        if use_frames:
+            ready['protocol'] = 'frame'
+        # ready 本身仍按行协议发送，runner 收到确认后再切换到帧协议。
+        _channel.write(ready)
     except (Exception, SystemExit) as e:
         _write_result({'success': False, 'message': str(e)})
         return
 
-    line = sys.stdin.readline()
-    if not line:
-        _write_result({'success': False, 'message': 'Missing task input'})
-        return
+    if use_frames:
+        _use_frame_channel()
     try:
-        msg = json.loads(line)
+        msg, blob = _channel.read()
     except Exception as e:
         _write_result({'success': False, 'message': f'Invalid JSON input: {e}'})
         return
-    _run_task(msg)
+    if msg is None:
+        _write_result({'success': False, 'message': 'Missing task input'})
+        return
+    _run_task(msg, blob, received_at=_time.perf_counter())
+
+
+def _use_frame_channel():
+    global _channel
+    _channel = _FrameChannel()
+
+
+def _write_zygote_message(payload):
+    # SIGCHLD 处理函数也会写 stdout；直接走单次 write 系统调用，避免与 TextIOWrapper 缓冲重入。
+    _os.write(1, (_original_json_dumps(payload, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+def _reap_zygote_children(signum, frame):
+    while True:
+        try:
+            pid, status = _os.waitpid(-1, _os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        exited = {'type': 'exited', 'pid': pid, 'code': None, 'signal': None}
+        if _os.WIFSIGNALED(status):
+            exited['signal'] = _os.WTERMSIG(status)
+        else:
+            exited['code'] = _os.waitstatus_to_exitcode(status)
+        _write_zygote_message(exited)
+
+
+def _run_zygote_child(msg):
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    _os.setsid()
+    for key, value in (msg.get('env') or {}).items():
+        _os.environ[str(key)] = str(value)
+
+    # stderr 单独一条连接，runner 按 token 归到该任务，崩溃时的诊断输出不会混进 zygote 的 stderr；
+    # 先于任务连接建立，保证任务开始前 fd 2 已经切换
+    err_sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    err_sock.connect(msg['socketPath'])
+    err_sock.sendall((_original_json_dumps({
+        'type': 'stderr',
+        'token': msg.get('token')
+    }, ensure_ascii=False) + '\n').encode('utf-8'))
+    sys.stderr.flush()
+    _os.dup2(err_sock.fileno(), 2)
+    err_sock.close()
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    sock.connect(msg['socketPath'])
+    _os.dup2(sock.fileno(), 0)
+    _os.dup2(sock.fileno(), 1)
+    sock.close()
+    sys.stdin = open(0, 'r', encoding='utf-8', closefd=False)
+    sys.stdout = open(1, 'w', encoding='utf-8', closefd=False)
+
+    sys.stdout.write(_original_json_dumps({
+        'type': 'hello',
+        'token': msg.get('token'),
+        'pid': _os.getpid()
+    }, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+    main()
+
+
+def _run_zygote(zygote_msg):
+    preload = [
+        name for name in (zygote_msg.get('preloadModules') or [])
+        if isinstance(name, str) and name.split('.')[0] not in _ZYGOTE_SKIP_PRELOAD
+    ]
+    preload_ms, preload_errors = _preload_modules(preload, zygote_msg.get('allowedModules'))
+    # 冻结预导入产生的对象，避免子进程 GC 遍历时触发 copy-on-write 复制共享页。
+    _gc.freeze()
+    signal.signal(signal.SIGCHLD, _reap_zygote_children)
+
+    ready = {'type': 'ready', 'pid': _os.getpid(), 'preloadMs': preload_ms}
+    if preload_errors:
+        ready['preloadErrors'] = preload_errors
+    _write_zygote_message(ready)
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            return
+        try:
+            msg = json.loads(line)
+        except Exception:
+            continue
+        if msg.get('type') != 'fork':
+            continue
+
+        token = msg.get('token')
+        try:
+            pid = _os.fork()
+        except OSError as e:
+            _write_zygote_message({'type': 'fork_failed', 'token': token, 'message': str(e)})
+            continue
+
+        if pid == 0:
+            code = 0
+            try:
+                _run_zygote_child(msg)
+            except BaseException:
+                code = 1
+            finally:
+                try:
+                    sys.stdout.flush()
+                except Exception:
+                    pass
+                _os._exit(code)
+
+        _write_zygote_message({'type': 'forked', 'token': token, 'pid': pid})
 
 
 def main():
     line = sys.stdin.readline()
+    received_at = _time.perf_counter()
     if not line:
         _write_result({'success': False, 'message': 'Missing task input'})
         return
@@ -874,7 +2137,10 @@ def main():
     if msg.get('type') == 'init':
         _run_warm_worker(msg)
         return
-    _run_task(msg)
+    if msg.get('type') == 'zygote':
+        _run_zygote(msg)
+        return
+    _run_task(msg, received_at=received_at)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,203 @@
+import { createInterface } from 'readline';
+import type { Readable, Writable } from 'stream';
+
+/**
+ * runner 与 python-bootstrap 之间的消息通道。
+ *
+ * - line：每条消息一行 JSON，二进制内容（编译结果等）需 base64 内联。
+ * - frame：8 字节头（JSON 长度、blob 长度，大端 u32）+ JSON + 原始字节 blob，
+ *   大响应体和 marshal 结果不经过转义/base64，也无需逐字节扫描换行符。
+ *
+ * 协议在 init 消息中协商：ready 仍按行发送，bootstrap 回传 protocol: 'frame' 后双方切换。
+ */
+export type PythonIpcProtocol = 'line' | 'frame';
+
+export const FRAME_HEADER_BYTES = 8;
+
+export type PythonChannelMessage = {
+  /** 消息 JSON 文本，由调用方自行解析，便于在解析前做大小与前缀检查 */
+  json: string;
+  /** frame 协议下附带的原始字节 */
+  blob?: Buffer;
+  /** 该消息在管道上占用的字节数（含换行或帧头） */
+  bytes: number;
+};
+
+export interface PythonChannel {
+  readonly protocol: PythonIpcProtocol;
+  /** 注册消息回调；onOversize 在帧头声明的长度超过上限时调用（仅 frame 协议） */
+  listen(
+    onMessage: (msg: PythonChannelMessage) => void,
+    onOversize?: (bytes: number) => void
+  ): void;
+  unlisten(): void;
+  send(msg: Record<string, any>, blob?: Buffer): void;
+  close(): void;
+}
+
+export class LineChannel implements PythonChannel {
+  readonly protocol = 'line' as const;
+  private readonly rl: ReturnType<typeof createInterface>;
+  private handler?: (line: string) => void;
+
+  constructor(
+    input: Readable,
+    private readonly output: Writable
+  ) {
+    this.rl = createInterface({ input, terminal: false });
+  }
+
+  listen(onMessage: (msg: PythonChannelMessage) => void) {
+    this.unlisten();
+    this.handler = (line: string) =>
+      onMessage({ json: line, bytes: Buffer.byteLength(line, 'utf8') + 1 });
+    this.rl.on('line', this.handler);
+  }
+
+  unlisten() {
+    if (this.handler) this.rl.off('line', this.handler);
+    this.handler = undefined;
+  }
+
+  send(msg: Record<string, any>) {
+    this.output.write(JSON.stringify(msg) + '\n');
+  }
+
+  close() {
+    this.unlisten();
+    this.rl.close();
+  }
+}
+
+/**
+ * 增量解析帧流。
+ *
+ * 数据块先挂在 chunks 上，凑够一个完整帧才合并一次，10MB 的结果只拷贝一次；
+ * 帧头声明的长度超过 maxFrameBytes 时直接判定为非法，不等数据到齐。
+ */
+export class FrameDecoder {
+  private chunks: Buffer[] = [];
+  private buffered = 0;
+  private header?: { jsonLength: number; blobLength: number };
+
+  constructor(
+    private readonly onFrame: (json: Buffer, blob: Buffer | undefined) => void,
+    private readonly onOversize: (bytes: number) => void,
+    private readonly maxFrameBytes = Infinity
+  ) {}
+
+  push(chunk: Buffer) {
+    this.chunks.push(chunk);
+    this.buffered += chunk.length;
+
+    while (true) {
+      if (!this.header) {
+        if (this.buffered < FRAME_HEADER_BYTES) return;
+        const head = this.take(FRAME_HEADER_BYTES);
+        const jsonLength = head.readUInt32BE(0);
+        const blobLength = head.readUInt32BE(4);
+        if (jsonLength + blobLength > this.maxFrameBytes) {
+          this.reset();
+          this.onOversize(jsonLength + blobLength);
+          return;
+        }
+        this.header = { jsonLength, blobLength };
+      }
+
+      const { jsonLength, blobLength } = this.header;
+      if (this.buffered < jsonLength + blobLength) return;
+      this.header = undefined;
+      const body = this.take(jsonLength + blobLength);
+      this.onFrame(
+        body.subarray(0, jsonLength),
+        blobLength > 0 ? body.subarray(jsonLength) : undefined
+      );
+    }
+  }
+
+  reset() {
+    this.chunks = [];
+    this.buffered = 0;
+    this.header = undefined;
+  }
+
+  private take(size: number): Buffer {
+    this.buffered -= size;
+    const first = this.chunks[0];
+    if (first.length >= size) {
+      if (first.length === size) this.chunks.shift();
+      else this.chunks[0] = first.subarray(size);
+      return first.subarray(0, size);
+    }
+
+    const out = Buffer.allocUnsafe(size);
+    let offset = 0;
+    while (offset < size) {
+      const chunk = this.chunks[0];
+      const n = Math.min(chunk.length, size - offset);
+      chunk.copy(out, offset, 0, n);
+      offset += n;
+      if (n < chunk.length) this.chunks[0] = chunk.subarray(n);
+      else this.chunks.shift();
+    }
+    return out;
+  }
+}
+
+export function encodeFrame(msg: Record<string, any>, blob?: Buffer): Buffer[] {
+  const json = Buffer.from(JSON.stringify(msg), 'utf8');
+  const head = Buffer.allocUnsafe(FRAME_HEADER_BYTES);
+  head.writeUInt32BE(json.length, 0);
+  head.writeUInt32BE(blob?.length ?? 0, 4);
+  return blob && blob.length > 0 ? [head, json, blob] : [head, json];
+}
+
+export class FrameChannel implements PythonChannel {
+  readonly protocol = 'frame' as const;
+  private readonly decoder: FrameDecoder;
+  private onMessage?: (msg: PythonChannelMessage) => void;
+  private onOversize?: (bytes: number) => void;
+  private readonly dataHandler = (chunk: Buffer) => this.decoder.push(chunk);
+
+  constructor(
+    private readonly input: Readable,
+    private readonly output: Writable,
+    maxFrameBytes?: number
+  ) {
+    this.decoder = new FrameDecoder(
+      (json, blob) =>
+        this.onMessage?.({
+          json: json.toString('utf8'),
+          blob,
+          bytes: FRAME_HEADER_BYTES + json.length + (blob?.length ?? 0)
+        }),
+      (bytes) => this.onOversize?.(bytes),
+      maxFrameBytes
+    );
+    input.on('data', this.dataHandler);
+    // 行通道关闭 readline 时会暂停输入流，这里需要显式恢复
+    input.resume();
+  }
+
+  listen(onMessage: (msg: PythonChannelMessage) => void, onOversize?: (bytes: number) => void) {
+    this.onMessage = onMessage;
+    this.onOversize = onOversize;
+  }
+
+  unlisten() {
+    this.onMessage = undefined;
+    this.onOversize = undefined;
+  }
+
+  send(msg: Record<string, any>, blob?: Buffer) {
+    for (const part of encodeFrame(msg, blob)) {
+      this.output.write(part);
+    }
+  }
+
+  close() {
+    this.unlisten();
+    this.input.off('data', this.dataHandler);
+    this.decoder.reset();
+  }
+}
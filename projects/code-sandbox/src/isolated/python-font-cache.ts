@@ -0,0 +1,100 @@
+import { execFile } from 'child_process';
+import {
+  chmodSync,
+  constants as fsConstants,
+  copyFileSync,
+  existsSync,
+  mkdirSync,
+  readdirSync
+} from 'fs';
+import { basename, join } from 'path';
+import { promisify } from 'util';
+import { getErrText } from '../utils';
+import { getLogger, LogCategories } from '../utils/logger';
+import {
+  getPythonMatplotlibFontCacheHostDir,
+  PYTHON_MATPLOTLIB_FONT_CACHE_DIR,
+  PYTHON_SANDBOX_ROOT,
+  shouldEnablePythonNativeIsolation
+} from './python-isolation-config';
+
+const execFileAsync = promisify(execFile);
+const serverLogger = getLogger(LogCategories.MODULE.SANDBOX.SERVER);
+const FONT_CACHE_BUILD_TIMEOUT = 120_000;
+const FONT_CACHE_FILE_PATTERN = /^fontlist-v\d+\.json$/;
+const BUILD_SCRIPT = [
+  'import matplotlib',
+  "matplotlib.use('Agg')",
+  'import matplotlib.font_manager'
+].join('\n');
+
+function listFontCacheFiles(dir: string): string[] {
+  if (!existsSync(dir)) return [];
+  return readdirSync(dir)
+    .filter((name) => FONT_CACHE_FILE_PATTERN.test(name))
+    .map((name) => join(dir, name));
+}
+
+/**
+ * 准备共享的 matplotlib 字体缓存，返回宿主机上的缓存文件列表。
+ *
+ * 镜像构建时已在 sandbox root 内生成缓存（见 Dockerfile）；缺失时在池初始化阶段补建一次。
+ * Linux 下通过 chroot 在 sandbox root 内构建，保证缓存里的字体路径与任务进程看到的一致。
+ * 缓存文件设为只读，失败时只记录日志，任务进程回退到各自冷构建。
+ */
+export async function prepareMatplotlibFontCache(): Promise<string[]> {
+  const hostDir = getPythonMatplotlibFontCacheHostDir();
+  let files = listFontCacheFiles(hostDir);
+  if (files.length > 0) return files;
+
+  const nativeIsolation = shouldEnablePythonNativeIsolation();
+  const configDir = nativeIsolation ? PYTHON_MATPLOTLIB_FONT_CACHE_DIR : hostDir;
+  const [command, args]: [string, string[]] = nativeIsolation
+    ? ['chroot', [PYTHON_SANDBOX_ROOT, 'python3', '-c', BUILD_SCRIPT]]
+    : ['python3', ['-c', BUILD_SCRIPT]];
+
+  const start = Date.now();
+  try {
+    mkdirSync(hostDir, { recursive: true, mode: 0o755 });
+    await execFileAsync(command, args, {
+      timeout: FONT_CACHE_BUILD_TIMEOUT,
+      env: {
+        PATH: process.env.PATH || '/usr/local/bin:/usr/bin:/bin',
+        HOME: configDir,
+        MPLCONFIGDIR: configDir,
+        PYTHONDONTWRITEBYTECODE: '1'
+      }
+    });
+  } catch (err) {
+    serverLogger.warn(`Build matplotlib font cache failed: ${getErrText(err)}`);
+    return [];
+  }
+
+  files = listFontCacheFiles(hostDir);
+  for (const file of files) {
+    chmodSync(file, 0o444);
+  }
+  chmodSync(hostDir, 0o755);
+  serverLogger.info(
+    `Matplotlib font cache built in ${Date.now() - start}ms: ${files.length} file(s)`
+  );
+  return files;
+}
+
+/**
+ * 把共享字体缓存复制进任务的 MPLCONFIGDIR。
+ *
+ * 每个任务一份只读副本而不是硬链接：未启用隔离、以 root 运行时文件权限拦不住写入，
+ * 硬链接会让一个任务改写共享缓存并影响之后的所有任务。支持时以 reflink 复制，不占额外空间。
+ */
+export function copyMatplotlibFontCache(files: readonly string[], taskConfigDir: string) {
+  for (const file of files) {
+    const target = join(taskConfigDir, basename(file));
+    try {
+      copyFileSync(file, target, fsConstants.COPYFILE_FICLONE);
+      chmodSync(target, 0o444);
+    } catch (err) {
+      serverLogger.warn(`Copy matplotlib font cache failed: ${getErrText(err)}`);
+    }
+  }
+}
@@ -1,21 +1,39 @@
-import { spawn, type ChildProcess } from 'child_process';
+import { spawn } from 'child_process';
+import { createHash } from 'crypto';
 import { createInterface } from 'readline';
 import { basename, dirname, join } from 'path';
 import { fileURLToPath } from 'url';
 import {
   chmodSync,
   chownSync,
+  closeSync,
+  constants as fsConstants,
   existsSync,
+  fstatSync,
   mkdirSync,
   mkdtempSync,
+  openSync,
   readdirSync,
+  readFileSync,
+  realpathSync,
   rmSync,
-  statSync
+  statSync,
+  writeFileSync
 } from 'fs';
 import { tmpdir } from 'os';
 import { env, RUNTIME_MEMORY_OVERHEAD_MB } from '../env';
-import type { ExecuteOptions, ExecuteResult } from '../types';
+import type {
+  ExecuteBatchOptions,
+  ExecuteBatchResult,
+  ExecuteFile,
+  ExecuteInputFile,
+  ExecuteMetrics,
+  ExecuteOptions,
+  ExecuteResult
+} from '../types';
 import { Semaphore } from '../utils/semaphore';
+import { LRUCache } from '../utils/lru-cache';
+import { DEFAULT_MEMORY_BUCKETS_MB, Histogram } from '../utils/histogram';
 import { getErrText } from '../utils';
 import { getLogger, LogCategories } from '../utils/logger';
 import {
@@ -25,6 +43,8 @@ import {
 } from '../utils/process-tree';
 import {
   runSandboxHttpRequest,
+  SandboxHttpCache,
+  SandboxHttpConnectionPool,
   type SandboxHttpRequestPayload,
   type SandboxHttpState
 } from '../utils/sandbox-http';
@@ -37,28 +57,80 @@ import {
   PYTHON_SANDBOX_UID,
   shouldEnablePythonNativeIsolation
 } from './python-isolation-config';
+import { copyMatplotlibFontCache, prepareMatplotlibFontCache } from './python-font-cache';
+import {
+  FrameChannel,
+  LineChannel,
+  type PythonChannel,
+  type PythonChannelMessage,
+  type PythonIpcProtocol
+} from './python-channel';
+import { PythonZygote, PythonZygoteChild, type SandboxChildProcess } from './python-zygote';
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
 const BOOTSTRAP_SCRIPT = join(__dirname, 'python-bootstrap.py');
 const NATIVE_SANDBOX_LIBRARY = getBundledPythonNativeLibraryPath(__dirname);
-const RSS_POLL_INTERVAL = 500;
-const TMP_USAGE_POLL_INTERVAL = 500;
+// 子进程内由 RLIMIT_DATA 硬限制内存，RSS 轮询只兜底 RLIMIT_DATA 覆盖不到的情况（共享映射等）
+const RSS_POLL_INTERVAL = 2000;
+/**
+ * 汇总到 stats.phases 的 ExecuteMetrics 字段（嵌套字段为 `父.子`）。
+ * metrics 由子进程上报，用户代码可以伪造任意键，只接受已知阶段以免直方图无限增长。
+ */
+const METRIC_PHASES: ReadonlySet<string> = new Set([
+  'isolationInit',
+  'tmpdirInit',
+  'osGuards',
+  'globals',
+  'compile',
+  'toUserCode',
+  'exec',
+  'main',
+  'http',
+  'serialize',
+  'warmup.isolationInit',
+  'warmup.preload',
+  'warmup.templates',
+  'total',
+  'peakRssMB',
+  'tracedPeakMB'
+]);
+// 首个预热进程实测预导入占用之前，为 numpy/pandas/matplotlib 预留的 VmData（MB）
+const DEFAULT_PRELOAD_RESERVE_MB = 192;
+// 子进程在写打开与阻塞检查点统计临时目录用量；先打开多个文件再写入时检查点覆盖不到，
+// 由低频遍历目录兜底
+const TMP_USAGE_POLL_INTERVAL = 2000;
 const PYTHON_TASK_MATPLOTLIB_DIR = 'matplotlib';
 const PYTHON_TASK_MATPLOTLIB_CACHE_DIR = join(PYTHON_TASK_MATPLOTLIB_DIR, 'cache');
 const PYTHON_TASK_MATPLOTLIB_CONFIG_DIR = join(PYTHON_TASK_MATPLOTLIB_DIR, 'config');
 const PYTHON_TASK_MATPLOTLIB_TMP_DIR = join(PYTHON_TASK_MATPLOTLIB_DIR, 'tmp');
+/** runner 写入的输入文件目录，文件名即变量名 */
+const PYTHON_TASK_INPUT_DIR = 'inputs';
+const INPUT_FILE_NAME_PATTERN = /^[A-Za-z_][A-Za-z0-9_]*$/;
+/** 与 bootstrap 的 _MAX_EMITTED_FILES 一致 */
+const MAX_EMITTED_FILES = 16;
+const WARMUP_LATENCY_WINDOW = 100;
+/** bootstrap 端限制 marshal 后 1MB，行协议 base64 后约 1.34MB，这里留出 JSON 包装的余量 */
+const MAX_COMPILED_MESSAGE_BYTES = 1.5 * 1024 * 1024;
 const serverLogger = getLogger(LogCategories.MODULE.SANDBOX.SERVER);
 
+type PythonTask = Omit<ExecuteOptions, 'queueId'> & {
+  variables: Record<string, any>;
+  /** 批量执行：模块顶层执行一次后对每一项调用 main */
+  batch?: { items: Record<string, any>[]; itemMaxOutputSize: number };
+};
+type PythonTaskResult = ExecuteResult | ExecuteBatchResult;
+
 type RunningChild = {
-  proc: ChildProcess;
+  proc: SandboxChildProcess;
+  createdAt: number;
   stderrBuf: string[];
-  stdoutRl: ReturnType<typeof createInterface>;
+  /** 初始为行协议，预热完成且 bootstrap 确认后切换为帧协议 */
+  channel: PythonChannel;
   stderrRl: ReturnType<typeof createInterface>;
   taskTmpDir?: {
     hostPath: string;
     sandboxPath: string;
   };
-  lineHandler?: (line: string) => void;
   closeHandler?: (code: number | null, signal: NodeJS.Signals | null) => void;
   errorHandler?: (err: Error) => void;
 };
@@ -77,10 +149,42 @@ export class PythonIsolatedRunner {
   private readonly warmingChildren = new Set<RunningChild>();
   private readonly warmIdleTarget: number;
   private ready = false;
+  private preloadErrorReported = false;
+  /** 预热进程 ready 中上报的预导入实测 VmData 占用（MB），取观测到的最大值 */
+  private preloadDataMB?: number;
+  private readonly useZygote: boolean;
+  private readonly protocol: PythonIpcProtocol;
+  private zygote?: PythonZygote;
+  private readonly warmupLatencies: number[] = [];
+  private fontCacheFiles: string[] = [];
+  /** 各执行阶段的耗时分布，键为 ExecuteMetrics 字段名（warmup.* 为预热阶段） */
+  private readonly phaseHistograms = new Map<string, Histogram>();
+  /** 代码 SHA-256 -> 已通过 AST 校验的 marshal code object */
+  private readonly compileCache = new LRUCache<string, Buffer>(
+    env.SANDBOX_PYTHON_COMPILE_CACHE_SIZE
+  );
+  /** 代理层幂等 GET 响应缓存，跨任务共享 */
+  private readonly httpCache = new SandboxHttpCache(
+    env.SANDBOX_REQUEST_CACHE_SIZE,
+    env.SANDBOX_REQUEST_CACHE_TTL_MS,
+    env.SANDBOX_REQUEST_CACHE_MAX_ENTRY_KB * 1024
+  );
+  /** 代理出网的 keep-alive 连接和 DNS 缓存，跨任务共享 */
+  private readonly httpConnections = new SandboxHttpConnectionPool({
+    maxOrigins: env.SANDBOX_REQUEST_MAX_ORIGINS,
+    maxSocketsPerOrigin: env.SANDBOX_REQUEST_MAX_SOCKETS_PER_ORIGIN,
+    keepAliveMs: env.SANDBOX_REQUEST_KEEPALIVE_MS,
+    dnsTtlMs: env.SANDBOX_REQUEST_DNS_TTL_MS
+  });
 
-  constructor(private readonly maxConcurrency = env.SANDBOX_POOL_SIZE) {
+  constructor(
+    private readonly maxConcurrency = env.SANDBOX_POOL_SIZE,
+    options: { zygote?: boolean; protocol?: PythonIpcProtocol } = {}
+  ) {
     this.semaphore = new Semaphore(maxConcurrency);
     this.warmIdleTarget = maxConcurrency;
+    this.useZygote = options.zygote ?? env.SANDBOX_PYTHON_ZYGOTE;
+    this.protocol = options.protocol ?? env.SANDBOX_PYTHON_IPC_PROTOCOL;
   }
 
   async init(): Promise<void> {
@@ -88,6 +192,12 @@ export class PythonIsolatedRunner {
     this.ready = true;
 
     try {
+      if (env.SANDBOX_PYTHON_ALLOWED_MODULES.includes('matplotlib')) {
+        this.fontCacheFiles = await prepareMatplotlibFontCache();
+      }
+      if (this.useZygote) {
+        await this.startZygote();
+      }
       await this.replenishWarmChildren(true);
       if (this.idleChildren.size < this.warmIdleTarget) {
         throw new Error(
@@ -108,16 +218,20 @@ export class PythonIsolatedRunner {
   async shutdown(): Promise<void> {
     this.ready = false;
     for (const child of [...this.running, ...this.idleChildren, ...this.warmingChildren]) {
-      killProcessTree(child.proc.pid);
+      this.killChild(child);
       this.cleanupChild(child);
     }
     this.running.clear();
     this.idleChildren.clear();
     this.warmingChildren.clear();
+    this.zygote?.stop();
+    this.zygote = undefined;
+    this.httpConnections.destroy();
   }
 
   get stats() {
     const semaphoreStats = this.semaphore.stats;
+    const latencies = this.warmupLatencies;
     return {
       total: this.running.size + this.idleChildren.size + this.warmingChildren.size,
       idle: this.idleChildren.size,
@@ -125,6 +239,21 @@ export class PythonIsolatedRunner {
       warming: this.warmingChildren.size,
       queued: semaphoreStats.queued,
       poolSize: semaphoreStats.max,
+      mode: this.useZygote ? 'zygote' : 'spawn',
+      protocol: this.protocol,
+      compileCache: this.compileCache.stats,
+      httpCache: this.httpCache.stats,
+      httpConnections: this.httpConnections.stats,
+      phases: Object.fromEntries(
+        [...this.phaseHistograms].map(([phase, histogram]) => [phase, histogram.stats])
+      ),
+      warmupMs: {
+        last: latencies.length > 0 ? latencies[latencies.length - 1] : null,
+        avg:
+          latencies.length > 0
+            ? latencies.reduce((sum, value) => sum + value, 0) / latencies.length
+            : null
+      },
       ready:
         this.ready && this.idleChildren.size + this.running.size + this.warmingChildren.size > 0
     };
@@ -137,22 +266,55 @@ export class PythonIsolatedRunner {
       return { success: false, message: 'Code cannot be empty' };
     }
 
+    return (await this.runTask({ ...options, variables: variables || {} })) as ExecuteResult;
+  }
+
+  /**
+   * 批量执行：同一段代码只启动一个进程、校验编译并执行一次模块顶层，再逐项调用 main。
+   *
+   * 超时时间是整批的预算；超时或累计输出超限后剩余项直接标记失败，已完成的项照常返回。
+   */
+  async executeBatch(options: ExecuteBatchOptions): Promise<ExecuteBatchResult> {
+    const { code, variablesList, ...rest } = options;
+
+    if (!code || typeof code !== 'string' || !code.trim()) {
+      return { success: false, message: 'Code cannot be empty' };
+    }
+    if (!Array.isArray(variablesList) || variablesList.length === 0) {
+      return { success: false, message: 'variablesList cannot be empty' };
+    }
+    if (variablesList.length > env.SANDBOX_PYTHON_BATCH_MAX_ITEMS) {
+      return {
+        success: false,
+        message: `Too many batch items (limit: ${env.SANDBOX_PYTHON_BATCH_MAX_ITEMS})`
+      };
+    }
+
+    return (await this.runTask({
+      ...rest,
+      code,
+      variables: {},
+      batch: {
+        items: variablesList,
+        itemMaxOutputSize: env.SANDBOX_PYTHON_BATCH_ITEM_MAX_OUTPUT_KB * 1024
+      }
+    })) as ExecuteBatchResult;
+  }
+
+  private async runTask(task: PythonTask): Promise<PythonTaskResult> {
     await this.semaphore.acquire();
     try {
       if (!this.ready) {
         return { success: false, message: 'Python isolated runner is not ready' };
       }
-      return await this.executeOneShot({ code, variables: variables || {} });
+      return await this.executeOneShot(task);
     } finally {
       this.semaphore.release();
       void this.replenishWarmChildren();
     }
   }
 
-  private async executeOneShot(task: {
-    code: string;
-    variables: Record<string, any>;
-  }): Promise<ExecuteResult> {
+  private async executeOneShot(task: PythonTask): Promise<PythonTaskResult> {
     const child = this.takeIdleChild() ?? this.createChild();
     this.running.add(child);
     return this.executeWithChild(child, task);
@@ -169,35 +331,86 @@ export class PythonIsolatedRunner {
     return child;
   }
 
-  private createChild(): RunningChild {
-    const taskTmpDir = this.createTaskTmpDir();
-    const proc = spawn('python3', ['-u', BOOTSTRAP_SCRIPT], {
+  private buildBaseEnv(): Record<string, string> {
+    return {
+      PATH: process.env.PATH || '/usr/local/bin:/usr/bin:/bin',
+      CHECK_INTERNAL_IP: String(env.CHECK_INTERNAL_IP),
+      PYTHONISOLATED: '1',
+      PYTHONDONTWRITEBYTECODE: '1',
+      // numpy/OpenBLAS may create worker threads while importing native extensions.
+      // Keep it single-threaded so seccomp does not need to allow clone/fork.
+      OPENBLAS_NUM_THREADS: '1',
+      OMP_NUM_THREADS: '1',
+      MKL_NUM_THREADS: '1',
+      NUMEXPR_NUM_THREADS: '1'
+    };
+  }
+
+  private buildTaskEnv(taskTmpDir: { sandboxPath: string }): Record<string, string> {
+    return {
+      HOME: taskTmpDir.sandboxPath,
+      TMPDIR: taskTmpDir.sandboxPath,
+      FASTGPT_TASK_TMPDIR: taskTmpDir.sandboxPath,
+      MPLCONFIGDIR: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_DIR}`,
+      XDG_CACHE_HOME: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_CACHE_DIR}`,
+      XDG_CONFIG_HOME: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_CONFIG_DIR}`,
+      MATPLOTLIB_TMPDIR: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_TMP_DIR}`
+    };
+  }
+
+  /**
+   * 启动 zygote fork-server。
+   *
+   * zygote 常驻期间异常退出时自动重建；重建完成前 createChild 回退到冷启动 spawn，
+   * 保证池不会因为 zygote 故障整体不可用。
+   */
+  private async startZygote(): Promise<void> {
+    const zygote = new PythonZygote({
+      script: BOOTSTRAP_SCRIPT,
+      cwd: shouldEnablePythonNativeIsolation() ? PYTHON_SANDBOX_ROOT : undefined,
+      env: this.buildBaseEnv(),
+      allowedModules: env.SANDBOX_PYTHON_ALLOWED_MODULES,
+      preloadModules: env.SANDBOX_PYTHON_PRELOAD_MODULES,
+      onExit: () => {
+        if (this.zygote !== zygote) return;
+        zygote.stop();
+        this.zygote = undefined;
+        if (!this.ready) return;
+        this.startZygote().catch((err) => {
+          serverLogger.error(`Python zygote restart failed: ${getErrText(err)}`);
+        });
+      }
+    });
+    const ready = await zygote.start();
+    if (!this.ready) {
+      zygote.stop();
+      return;
+    }
+    this.zygote = zygote;
+    this.reportPreload(ready);
+    serverLogger.info(`Python zygote ready: pid=${zygote.pid}`);
+  }
+
+  private spawnProcess(taskTmpDir: { sandboxPath: string }): SandboxChildProcess {
+    const taskEnv = this.buildTaskEnv(taskTmpDir);
+    if (this.zygote?.alive) {
+      return this.zygote.fork(taskEnv);
+    }
+    return spawn('python3', ['-u', BOOTSTRAP_SCRIPT], {
       stdio: ['pipe', 'pipe', 'pipe'],
       detached: PROCESS_GROUP_SUPPORTED,
       cwd: shouldEnablePythonNativeIsolation() ? PYTHON_SANDBOX_ROOT : undefined,
-      env: {
-        PATH: process.env.PATH || '/usr/local/bin:/usr/bin:/bin',
-        CHECK_INTERNAL_IP: String(env.CHECK_INTERNAL_IP),
-        PYTHONISOLATED: '1',
-        HOME: taskTmpDir.sandboxPath,
-        TMPDIR: taskTmpDir.sandboxPath,
-        FASTGPT_TASK_TMPDIR: taskTmpDir.sandboxPath,
-        MPLCONFIGDIR: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_DIR}`,
-        XDG_CACHE_HOME: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_CACHE_DIR}`,
-        XDG_CONFIG_HOME: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_CONFIG_DIR}`,
-        MATPLOTLIB_TMPDIR: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_MATPLOTLIB_TMP_DIR}`,
-        PYTHONDONTWRITEBYTECODE: '1',
-        // numpy/OpenBLAS may create worker threads while importing native extensions.
-        // Keep it single-threaded so seccomp does not need to allow clone/fork.
-        OPENBLAS_NUM_THREADS: '1',
-        OMP_NUM_THREADS: '1',
-        MKL_NUM_THREADS: '1',
-        NUMEXPR_NUM_THREADS: '1'
-      }
+      env: { ...this.buildBaseEnv(), ...taskEnv }
     });
-    const stdoutRl = createInterface({ input: proc.stdout!, terminal: false });
+  }
+
+  private createChild(): RunningChild {
+    const taskTmpDir = this.createTaskTmpDir();
+    const createdAt = performance.now();
+    const proc = this.spawnProcess(taskTmpDir);
+    const channel = new LineChannel(proc.stdout!, proc.stdin!);
     const stderrRl = createInterface({ input: proc.stderr!, terminal: false });
-    const child: RunningChild = { proc, stderrBuf: [], stdoutRl, stderrRl, taskTmpDir };
+    const child: RunningChild = { proc, createdAt, stderrBuf: [], channel, stderrRl, taskTmpDir };
 
     stderrRl.on('line', (line: string) => {
       child.stderrBuf.push(line);
@@ -241,6 +454,9 @@ export class PythonIsolatedRunner {
     for (const dir of taskWritableDirs) {
       chmodSync(dir, 0o700);
     }
+    if (this.fontCacheFiles.length > 0) {
+      copyMatplotlibFontCache(this.fontCacheFiles, join(hostPath, PYTHON_TASK_MATPLOTLIB_DIR));
+    }
 
     return {
       hostPath,
@@ -248,13 +464,104 @@ export class PythonIsolatedRunner {
     };
   }
 
+  /**
+   * 把大输入写入任务临时目录的 inputs/ 下，任务消息中只携带路径与格式。
+   *
+   * 目录和文件归 runner 所有且只读，sandbox 用户可以读取但不能改写或删除，也不计入
+   * 子进程的临时目录配额；随任务临时目录一起在 cleanup 时删除。
+   */
+  private writeInputFiles(child: RunningChild, inputFiles: Record<string, ExecuteInputFile>) {
+    const taskTmpDir = child.taskTmpDir;
+    if (!taskTmpDir) throw new Error('Task temporary directory is not available');
+
+    const hostDir = join(taskTmpDir.hostPath, PYTHON_TASK_INPUT_DIR);
+    mkdirSync(hostDir, { mode: 0o755 });
+    const descriptors: Record<string, { path: string; format: string; size: number }> = {};
+    for (const [name, file] of Object.entries(inputFiles)) {
+      if (!INPUT_FILE_NAME_PATTERN.test(name)) {
+        throw new Error(`Invalid input file name: ${name}`);
+      }
+      const data =
+        typeof file.data === 'string' ? Buffer.from(file.data, file.encoding ?? 'utf8') : file.data;
+      writeFileSync(join(hostDir, name), data, { mode: 0o444 });
+      descriptors[name] = {
+        path: `${taskTmpDir.sandboxPath}/${PYTHON_TASK_INPUT_DIR}/${name}`,
+        format: file.format ?? 'bytes',
+        size: data.byteLength
+      };
+    }
+    return descriptors;
+  }
+
+  /**
+   * 按 emit_file 上报的路径从宿主机侧的任务临时目录读取附件。
+   *
+   * 路径来自子进程，不可信：映射到 hostPath 后先 realpath，拒绝解析到临时目录之外的路径
+   * （chroot 内的符号链接在宿主机上会指向宿主机自己的文件）；再以 O_NOFOLLOW|O_NONBLOCK
+   * 打开并确认是普通文件，避免读取 FIFO/设备文件时阻塞。
+   */
+  private readEmittedFiles(child: RunningChild, files: unknown, maxBytes: number): ExecuteFile[] {
+    const taskTmpDir = child.taskTmpDir;
+    if (!taskTmpDir) throw new Error('Task temporary directory is not available');
+    if (!Array.isArray(files) || files.length > MAX_EMITTED_FILES) {
+      throw new Error('Invalid emitted file list');
+    }
+
+    const root = realpathSync(taskTmpDir.hostPath);
+    const emitted: ExecuteFile[] = [];
+    let totalBytes = 0;
+    for (const file of files) {
+      const { path, name, mime } = (file ?? {}) as Record<string, unknown>;
+      const prefix =
+        typeof path === 'string'
+          ? [taskTmpDir.sandboxPath, root].find((dir) => path.startsWith(`${dir}/`))
+          : undefined;
+      if (typeof path !== 'string' || !prefix) {
+        throw new Error(`Invalid emitted file path: ${String(path)}`);
+      }
+      const hostPath = realpathSync(join(root, path.slice(prefix.length + 1)));
+      if (!hostPath.startsWith(`${root}/`)) {
+        throw new Error(`Emitted file is outside the task temporary directory: ${path}`);
+      }
+
+      const fd = openSync(
+        hostPath,
+        fsConstants.O_RDONLY | fsConstants.O_NOFOLLOW | fsConstants.O_NONBLOCK
+      );
+      try {
+        const stat = fstatSync(fd);
+        if (!stat.isFile()) throw new Error(`Emitted file is not a regular file: ${path}`);
+        totalBytes += stat.size;
+        if (totalBytes > maxBytes) {
+          throw new Error(`Output too large (limit: ${env.SANDBOX_MAX_OUTPUT_MB}MB)`);
+        }
+        emitted.push({
+          name: typeof name === 'string' && name ? name : basename(hostPath),
+          mime: typeof mime === 'string' && mime ? mime : 'application/octet-stream',
+          size: stat.size,
+          data: readFileSync(fd)
+        });
+      } finally {
+        closeSync(fd);
+      }
+    }
+    return emitted;
+  }
+
+  private killChild(child: RunningChild) {
+    if (child.proc instanceof PythonZygoteChild) {
+      child.proc.kill();
+      return;
+    }
+    killProcessTree(child.proc.pid);
+  }
+
   private cleanupChild(child: RunningChild) {
     try {
       child.proc.stdin?.end();
     } catch {}
-    child.stdoutRl.close();
+    child.channel.close();
     child.stderrRl.close();
-    if (child.lineHandler) child.stdoutRl.off('line', child.lineHandler);
     if (child.closeHandler) child.proc.off('close', child.closeHandler);
     if (child.errorHandler) child.proc.off('error', child.errorHandler);
     child.proc.removeAllListeners();
@@ -321,23 +628,26 @@ export class PythonIsolatedRunner {
       const settle = (ready: boolean) => {
         if (settled) return;
         settled = true;
-        if (lineHandler) child.stdoutRl.off('line', lineHandler);
+        child.channel.unlisten();
         if (closeHandler) child.proc.off('close', closeHandler);
         if (errorHandler) child.proc.off('error', errorHandler);
         this.warmingChildren.delete(child);
         if (ready && this.ready) {
+          this.recordWarmupLatency(performance.now() - child.createdAt);
           this.markChildIdle(child);
         } else {
-          killProcessTree(child.proc.pid);
+          this.killChild(child);
           this.cleanupChild(child);
         }
         resolve();
       };
 
-      const lineHandler = (line: string) => {
+      const messageHandler = ({ json: line }: PythonChannelMessage) => {
         try {
           const msg = JSON.parse(line);
           if (msg.type === 'ready') {
+            this.reportPreload(msg);
+            if (msg.protocol === 'frame') this.switchToFrameChannel(child);
             settle(true);
             return;
           }
@@ -365,17 +675,22 @@ export class PythonIsolatedRunner {
         settle(false);
       };
 
-      child.stdoutRl.on('line', lineHandler);
+      child.channel.listen(messageHandler);
       child.proc.once('close', closeHandler);
       child.proc.once('error', errorHandler);
 
       try {
-        child.proc.stdin!.write(
-          JSON.stringify({
-            type: 'init',
-            isolation: this.buildIsolationPayload()
-          }) + '\n'
-        );
+        child.channel.send({
+          type: 'init',
+          isolation: this.buildIsolationPayload(),
+          memoryLimitMB: this.getMemoryLimitMB(),
+          preloadReserveMB: this.getPreloadReserveMB(),
+          maxTmpBytes: this.getMaxTmpBytes(),
+          allowedModules: env.SANDBOX_PYTHON_ALLOWED_MODULES,
+          preloadModules: env.SANDBOX_PYTHON_PRELOAD_MODULES,
+          // 旧版 bootstrap 忽略该字段且不会在 ready 中确认，此时继续使用行协议
+          ...(this.protocol === 'frame' ? { protocol: 'frame' } : {})
+        });
       } catch (err) {
         serverLogger.warn(`Python warm child communication error: ${getErrText(err)}`);
         settle(false);
@@ -383,20 +698,72 @@ export class PythonIsolatedRunner {
     });
   }
 
-  private executeWithChild(
-    child: RunningChild,
-    task: { code: string; variables: Record<string, any> }
-  ): Promise<ExecuteResult> {
-    return new Promise<ExecuteResult>((resolve) => {
-      const timeoutMs = env.SANDBOX_MAX_TIMEOUT;
+  /**
+   * ready 之后 bootstrap 只会在收到任务后才继续输出，此时 readline 中没有残留数据，
+   * 可以安全地关闭行通道并改由帧解码器接管 stdout。
+   */
+  private switchToFrameChannel(child: RunningChild) {
+    child.channel.close();
+    child.channel = new FrameChannel(
+      child.proc.stdout!,
+      child.proc.stdin!,
+      Math.max(env.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024, MAX_COMPILED_MESSAGE_BYTES)
+    );
+  }
+
+  private recordWarmupLatency(ms: number) {
+    this.warmupLatencies.push(ms);
+    if (this.warmupLatencies.length > WARMUP_LATENCY_WINDOW) this.warmupLatencies.shift();
+  }
+
+  /**
+   * 记录预热进程的预导入耗时。
+   *
+   * 预导入失败不影响进程就绪（用户代码 import 时会得到真实错误），仅首次出现时告警，
+   * 避免每个预热进程重复刷日志。
+   */
+  private reportPreload(msg: {
+    preloadMs?: Record<string, number>;
+    preloadErrors?: Record<string, string>;
+    preloadDataMB?: number;
+  }) {
+    if (typeof msg.preloadDataMB === 'number' && msg.preloadDataMB >= 0) {
+      this.preloadDataMB = Math.max(this.preloadDataMB ?? 0, Math.ceil(msg.preloadDataMB));
+    }
+    if (msg.preloadErrors && !this.preloadErrorReported) {
+      this.preloadErrorReported = true;
+      serverLogger.warn(`Python warm child preload failed: ${JSON.stringify(msg.preloadErrors)}`);
+    }
+    if (msg.preloadMs && Object.keys(msg.preloadMs).length > 0) {
+      serverLogger.debug(`Python warm child preload timings(ms): ${JSON.stringify(msg.preloadMs)}`);
+    }
+  }
+
+  private executeWithChild(child: RunningChild, task: PythonTask): Promise<PythonTaskResult> {
+    return new Promise<PythonTaskResult>((resolve) => {
+      // 不经过 schema 的内部调用可能传入 0 或负数，至少 1ms，否则子进程的计时器会被取消
+      const timeoutMs = Math.max(
+        Math.min(task.timeoutMs ?? env.SANDBOX_MAX_TIMEOUT, env.SANDBOX_MAX_TIMEOUT),
+        1
+      );
+      const graceMs = env.SANDBOX_PYTHON_TIMEOUT_GRACE_MS;
       const proc = child.proc;
-      const stdoutRl = child.stdoutRl;
+      const channel = child.channel;
+      const maxOutputBytes = env.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024;
 
       let settled = false;
+      let resultReceived = false;
       let outputBytes = 0;
+      // onChunk 逐个串行调用，保证消费方看到的顺序和 chunk_ack 的顺序与产生顺序一致
+      let chunkDelivery: Promise<void> = Promise.resolve();
       let rssTimer: ReturnType<typeof setInterval> | undefined;
       let tmpUsageTimer: ReturnType<typeof setInterval> | undefined;
       const httpState: SandboxHttpState = { requestCount: 0 };
+      const httpSemaphore = new Semaphore(env.SANDBOX_REQUEST_MAX_CONCURRENCY);
+      const codeHash = createHash('sha256').update(task.code).digest('hex');
+      const compiledCode = this.compileCache.get(codeHash);
+      const emitCompiled = compiledCode === undefined && env.SANDBOX_PYTHON_COMPILE_CACHE_SIZE > 0;
+      let awaitingCompiled = emitCompiled;
       const httpLimits = {
         maxRequests: env.SANDBOX_REQUEST_MAX_COUNT,
         timeoutMs: env.SANDBOX_REQUEST_TIMEOUT,
@@ -411,24 +778,33 @@ export class PythonIsolatedRunner {
         this.cleanupChild(child);
       };
 
-      const settle = (result: ExecuteResult, opts: { kill?: boolean } = {}) => {
+      const settle = (result: PythonTaskResult, opts: { kill?: boolean } = {}) => {
         if (settled) return;
         settled = true;
         if (opts.kill) {
-          killProcessTree(proc.pid);
+          this.killChild(child);
         }
         cleanup();
         resolve(result);
       };
 
-      child.lineHandler = (line: string) => {
-        outputBytes += Buffer.byteLength(line, 'utf8') + 1;
-        const maxOutputBytes = env.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024;
+      const settleOutputTooLarge = () =>
+        settle(
+          { success: false, message: `Output too large (limit: ${maxOutputBytes} bytes)` },
+          { kill: true }
+        );
+
+      const messageHandler = (message: PythonChannelMessage) => {
+        const line = message.json;
+        // 编译结果只接受任务的第一条消息：此时用户代码尚未执行，无法伪造。
+        if (awaitingCompiled) {
+          awaitingCompiled = false;
+          if (this.acceptCompiledMessage(codeHash, message)) return;
+        }
+
+        outputBytes += message.bytes;
         if (outputBytes > maxOutputBytes) {
-          settle(
-            { success: false, message: `Output too large (limit: ${maxOutputBytes} bytes)` },
-            { kill: true }
-          );
+          settleOutputTooLarge();
           return;
         }
 
@@ -437,10 +813,12 @@ export class PythonIsolatedRunner {
           if (msg.type === 'http_request') {
             this.handleHttpRequestMessage({
               proc,
+              channel,
               id: msg.id,
               payload: msg.payload,
               httpState,
-              httpLimits
+              httpLimits,
+              httpSemaphore
             }).catch((err) => {
               serverLogger.warn(
                 `PythonIsolatedRunner http_request handler failed: ${getErrText(err)}`
@@ -448,9 +826,61 @@ export class PythonIsolatedRunner {
             });
             return;
           }
+          if (msg.type === 'log') {
+            if (typeof msg.data === 'string') this.forwardLog(task.onLog, msg.data);
+            return;
+          }
+          if (msg.type === 'chunk') {
+            chunkDelivery = chunkDelivery.then(async () => {
+              if (settled) return;
+              await this.forwardChunk(task.onChunk, msg.data);
+              if (!settled && proc.stdin?.writable) channel.send({ type: 'chunk_ack' });
+            });
+            return;
+          }
+          // 子进程只在用量跨过档位时上报；超出配额时即使用户代码吞掉异常也直接结束任务
+          if (msg.type === 'tmp_usage') {
+            if (typeof msg.bytes === 'number' && msg.bytes > this.getMaxTmpBytes()) {
+              settle(
+                {
+                  success: false,
+                  message: `Temporary file limit exceeded (size: ${Math.ceil(
+                    msg.bytes / 1024 / 1024
+                  )}MB, limit: ${env.SANDBOX_MAX_TMP_MB}MB)`
+                },
+                { kill: true }
+              );
+            }
+            return;
+          }
           if (msg.type === 'result') {
             delete msg.type;
-            settle(msg as ExecuteResult);
+            if (msg.metrics) {
+              msg.metrics.total = performance.now() - sentAt;
+              this.recordMetrics(msg.metrics);
+              // 子进程总是上报耗时供 stats 汇总，只有请求开启时才随结果返回
+              if (!task.metrics) delete msg.metrics;
+            }
+            if (msg.files !== undefined) {
+              // 结果写出后不会再有用户代码运行；先结束子进程，保证读取期间文件不再变化
+              this.killChild(child);
+              try {
+                msg.files = this.readEmittedFiles(child, msg.files, maxOutputBytes - outputBytes);
+              } catch (err) {
+                settle({
+                  success: false,
+                  message: `Failed to read emitted files: ${getErrText(err)}`
+                });
+                return;
+              }
+            }
+            if (!msg.success) {
+              settle(msg as PythonTaskResult);
+              return;
+            }
+            // 成功结果在已收到的 chunk 全部交付后再返回；消费方一直不返回时由兜底定时器结束任务
+            resultReceived = true;
+            void chunkDelivery.then(() => settle(msg as PythonTaskResult));
             return;
           }
           settle(
@@ -464,7 +894,7 @@ export class PythonIsolatedRunner {
           );
         }
       };
-      stdoutRl.on('line', child.lineHandler);
+      channel.listen(messageHandler, settleOutputTooLarge);
 
       child.errorHandler = (err) => {
         settle({ success: false, message: `Python runner spawn error: ${getErrText(err)}` });
@@ -476,7 +906,7 @@ export class PythonIsolatedRunner {
       // is still buffered in the parent process. Wait for `close`, which is
       // emitted after stdio streams are closed, before declaring "no result".
       child.closeHandler = (code, signal) => {
-        if (settled) return;
+        if (settled || resultReceived) return;
         const stderr = child.stderrBuf.length > 0 ? ` | stderr: ${child.stderrBuf.join('\n')}` : '';
         settle({
           success: false,
@@ -485,15 +915,16 @@ export class PythonIsolatedRunner {
       };
       proc.once('close', child.closeHandler);
 
+      // 子进程在 timeoutMs 抛 TimeoutError、再过 graceMs 强制退出，这里只兜底卡在 C 代码里的情况
       const timer = setTimeout(() => {
         settle(
           { success: false, message: `Script execution timed out after ${timeoutMs}ms` },
           { kill: true }
         );
-      }, timeoutMs + 2000);
+      }, timeoutMs + graceMs + 500);
 
       if (env.SANDBOX_MAX_MEMORY_MB > 0 && proc.pid) {
-        const limitMB = env.SANDBOX_MAX_MEMORY_MB + RUNTIME_MEMORY_OVERHEAD_MB;
+        const limitMB = this.getMemoryLimitMB();
         rssTimer = setInterval(async () => {
           if (settled || !proc.pid) return;
           const rss = await getProcessTreeRSSMB(proc.pid);
@@ -510,10 +941,10 @@ export class PythonIsolatedRunner {
       }
 
       if (env.SANDBOX_MAX_TMP_MB > 0 && child.taskTmpDir) {
-        const limitBytes = env.SANDBOX_MAX_TMP_MB * 1024 * 1024;
+        const limitBytes = this.getMaxTmpBytes();
         tmpUsageTimer = setInterval(() => {
           if (settled || !child.taskTmpDir) return;
-          const size = this.getDirectorySize(child.taskTmpDir.hostPath);
+          const size = this.getTaskTmpDirSize(child.taskTmpDir.hostPath);
           if (size !== null && size > limitBytes) {
             settle(
               {
@@ -528,26 +959,54 @@ export class PythonIsolatedRunner {
         }, TMP_USAGE_POLL_INTERVAL);
       }
 
+      let inputFiles: Record<string, { path: string; format: string; size: number }> | undefined;
+      try {
+        if (task.inputFiles) inputFiles = this.writeInputFiles(child, task.inputFiles);
+      } catch (err) {
+        settle(
+          { success: false, message: `Failed to write input files: ${getErrText(err)}` },
+          { kill: true }
+        );
+        return;
+      }
+
       const payload = {
         code: task.code,
         variables: task.variables,
+        ...(task.batch ? { batch: task.batch } : {}),
+        ...(inputFiles ? { inputFiles } : {}),
         timeoutMs,
+        timeoutGraceMs: graceMs,
         allowedModules: env.SANDBOX_PYTHON_ALLOWED_MODULES,
         requestLimits: {
           maxRequests: env.SANDBOX_REQUEST_MAX_COUNT,
           timeoutMs: env.SANDBOX_REQUEST_TIMEOUT,
           maxResponseSize: env.SANDBOX_REQUEST_MAX_RESPONSE_MB * 1024 * 1024,
           maxRequestBodySize: env.SANDBOX_REQUEST_MAX_BODY_MB * 1024 * 1024,
-          maxOutputSize: env.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024
+          maxOutputSize: env.SANDBOX_MAX_OUTPUT_MB * 1024 * 1024,
+          maxConcurrency: env.SANDBOX_REQUEST_MAX_CONCURRENCY
         },
         taskTmpDir: child.taskTmpDir?.sandboxPath,
+        // 帧协议下编译结果作为 blob 随任务发送，行协议下 base64 内联
+        ...(compiledCode !== undefined && channel.protocol === 'line'
+          ? { compiledCode: compiledCode.toString('base64') }
+          : {}),
+        ...(emitCompiled ? { emitCompiled: true } : {}),
+        ...(task.onLog ? { streamLogs: true } : {}),
+        ...(task.onChunk ? { streamResult: true } : {}),
+        ...(task.profile ? { profile: true } : {}),
+        ...(task.traceMemory ? { traceMemory: true } : {}),
+        memoryLimitMB: this.getMemoryLimitMB(),
+        maxTmpBytes: this.getMaxTmpBytes(),
+        ...this.buildResultEncoderPayload(task),
         isolation: {
           ...this.buildIsolationPayload()
         }
       };
 
+      const sentAt = performance.now();
       try {
-        proc.stdin!.write(JSON.stringify(payload) + '\n');
+        channel.send(payload, channel.protocol === 'frame' ? compiledCode : undefined);
       } catch (err) {
         settle(
           { success: false, message: `Python runner communication error: ${getErrText(err)}` },
@@ -557,14 +1016,107 @@ export class PythonIsolatedRunner {
     });
   }
 
+  private recordMetrics(metrics: ExecuteMetrics) {
+    const record = (phase: string, value: unknown) => {
+      if (typeof value !== 'number' || !METRIC_PHASES.has(phase)) return;
+      let histogram = this.phaseHistograms.get(phase);
+      if (!histogram) {
+        histogram = new Histogram(phase.endsWith('MB') ? DEFAULT_MEMORY_BUCKETS_MB : undefined);
+        this.phaseHistograms.set(phase, histogram);
+      }
+      histogram.record(value);
+    };
+
+    for (const [phase, value] of Object.entries(metrics)) {
+      if (Array.isArray(value)) {
+        value.forEach((item) => record(phase, item));
+      } else if (value && typeof value === 'object') {
+        for (const [subPhase, subValue] of Object.entries(value)) {
+          record(`${phase}.${subPhase}`, subValue);
+        }
+      } else {
+        record(phase, value);
+      }
+    }
+  }
+
+  /**
+   * 与 RSS 兜底轮询使用同一上限：用户可用内存 + 运行时开销。
+   *
+   * 子进程设置 RLIMIT_DATA 时还会加上当时的 VmData 与 preloadReserveMB，解释器和预导入模块
+   * 不占用这部分额度。
+   */
+  private getMemoryLimitMB() {
+    return env.SANDBOX_MAX_MEMORY_MB + RUNTIME_MEMORY_OVERHEAD_MB;
+  }
+
+  /**
+   * 预热进程在设置 RLIMIT_DATA 之后才进入隔离并预导入模块，需为预导入预留额度。
+   * 优先使用已观测到的实测值，首个预热进程就绪前使用保守的默认值。
+   */
+  private getPreloadReserveMB() {
+    if (env.SANDBOX_PYTHON_PRELOAD_MODULES.length === 0) return 0;
+    return this.preloadDataMB ?? DEFAULT_PRELOAD_RESERVE_MB;
+  }
+
+  /** 子进程内按写打开的文件统计用量并设置 RLIMIT_FSIZE，runner 只低频遍历临时目录兜底 */
+  private getMaxTmpBytes() {
+    return env.SANDBOX_MAX_TMP_MB * 1024 * 1024;
+  }
+
+  private buildResultEncoderPayload(task: PythonTask) {
+    const resultEncoder = task.resultEncoder ?? env.SANDBOX_PYTHON_RESULT_ENCODER;
+    if (resultEncoder !== 'native') return {};
+    return { resultEncoder, dataFrameOrient: task.dataFrameOrient ?? 'records' };
+  }
+
+  private forwardLog(onLog: ((chunk: string) => void) | undefined, chunk: string) {
+    if (!onLog) return;
+    try {
+      onLog(chunk);
+    } catch (err) {
+      serverLogger.warn(`PythonIsolatedRunner onLog callback failed: ${getErrText(err)}`);
+    }
+  }
+
+  /** 消费方处理完成（含返回的 Promise）后才 resolve，调用方据此回 chunk_ack */
+  private async forwardChunk(onChunk: ExecuteOptions['onChunk'], value: any) {
+    if (!onChunk) return;
+    try {
+      await onChunk(value);
+    } catch (err) {
+      serverLogger.warn(`PythonIsolatedRunner onChunk callback failed: ${getErrText(err)}`);
+    }
+  }
+
+  private acceptCompiledMessage(codeHash: string, message: PythonChannelMessage): boolean {
+    if (!message.json.startsWith('{"type": "compiled"')) return false;
+    if (message.bytes > MAX_COMPILED_MESSAGE_BYTES) return true;
+    if (message.blob) {
+      // 帧解码出的 blob 可能是合并缓冲区的视图，缓存前复制一份
+      this.compileCache.set(codeHash, Buffer.from(message.blob));
+      return true;
+    }
+    try {
+      const msg = JSON.parse(message.json);
+      if (typeof msg.code === 'string') {
+        this.compileCache.set(codeHash, Buffer.from(msg.code, 'base64'));
+      }
+    } catch {}
+    return true;
+  }
+
   private async handleHttpRequestMessage({
     proc,
+    channel,
     id,
     payload,
     httpState,
-    httpLimits
+    httpLimits,
+    httpSemaphore
   }: {
-    proc: ChildProcess;
+    proc: SandboxChildProcess;
+    channel: PythonChannel;
     id: string;
     payload: SandboxHttpRequestPayload;
     httpState: SandboxHttpState;
@@ -574,25 +1126,39 @@ export class PythonIsolatedRunner {
       maxResponseSize: number;
       maxRequestBodySize: number;
     };
+    /** 单个任务的在途请求上限，http_request_many 的并发请求在这里排队 */
+    httpSemaphore: Semaphore;
   }) {
-    const writeResponse = (response: Record<string, any>) => {
+    const writeResponse = (response: Record<string, any>, blob?: Buffer) => {
       if (!proc.stdin?.writable) return;
-      proc.stdin.write(JSON.stringify({ type: 'http_response', id, ...response }) + '\n');
+      channel.send({ type: 'http_response', id, ...response }, blob);
     };
 
+    await httpSemaphore.acquire();
     try {
       const data = await runSandboxHttpRequest({
         payload,
         limits: httpLimits,
-        state: httpState
+        state: httpState,
+        cache: this.httpCache,
+        connections: this.httpConnections
       });
-      writeResponse({ success: true, payload: data });
+      if (channel.protocol === 'frame' && typeof data.data === 'string') {
+        // 响应体以原始字节随帧发送，避免大响应体在 JSON 中转义
+        const { data: body, ...rest } = data;
+        writeResponse({ success: true, payload: rest }, Buffer.from(body, 'utf8'));
+      } else {
+        writeResponse({ success: true, payload: data });
+      }
     } catch (err) {
       writeResponse({ success: false, message: getErrText(err, 'HTTP request failed') });
+    } finally {
+      httpSemaphore.release();
     }
   }
 
-  private getDirectorySize(root: string): number | null {
+  /** 临时目录中用户写入的文件总大小；runner 写入的 inputs/ 不计入配额 */
+  private getTaskTmpDirSize(root: string): number | null {
     let total = 0;
     const stack = [root];
 
@@ -602,6 +1168,7 @@ export class PythonIsolatedRunner {
         const stat = statSync(current);
         if (stat.isDirectory()) {
           for (const entry of readdirSync(current)) {
+            if (current === root && entry === PYTHON_TASK_INPUT_DIR) continue;
             stack.push(join(current, entry));
           }
         } else {
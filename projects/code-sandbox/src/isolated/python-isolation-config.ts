@@ -1,11 +1,13 @@
 import { existsSync } from 'fs';
-import { platform } from 'os';
+import { platform, tmpdir } from 'os';
 import { join } from 'path';
 
 export const PYTHON_SANDBOX_ROOT = '/tmp/fastgpt-python-sandbox';
 export const PYTHON_SANDBOX_UID = 65537;
 export const PYTHON_SANDBOX_GID = 65537;
 export const PYTHON_ENABLE_NETWORK_SYSCALLS = false;
+/** 预生成的 matplotlib 字体缓存目录（sandbox 内路径），root 持有、sandbox 用户只读 */
+export const PYTHON_MATPLOTLIB_FONT_CACHE_DIR = '/var/cache/fastgpt-matplotlib';
 
 export function shouldEnablePythonNativeIsolation(): boolean {
   return platform() === 'linux';
@@ -28,6 +30,13 @@ export function assertPythonNativeIsolationReady(libraryPath: string) {
   }
 }
 
+/** 字体缓存目录在宿主机上的路径；非 Linux 本地开发模式下放在系统临时目录 */
+export function getPythonMatplotlibFontCacheHostDir() {
+  return shouldEnablePythonNativeIsolation()
+    ? join(PYTHON_SANDBOX_ROOT, PYTHON_MATPLOTLIB_FONT_CACHE_DIR)
+    : join(tmpdir(), 'fastgpt-matplotlib-font-cache');
+}
+
 export function getBundledPythonNativeLibraryPath(dirname: string) {
   return join(dirname, 'fastgpt_python_sandbox.so');
 }
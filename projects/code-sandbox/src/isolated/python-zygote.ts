@@ -0,0 +1,398 @@
+import { spawn, type ChildProcess } from 'child_process';
+import { randomUUID } from 'crypto';
+import { EventEmitter } from 'events';
+import { mkdtempSync, rmSync } from 'fs';
+import { createServer, type Server, type Socket } from 'net';
+import { constants as osConstants, tmpdir } from 'os';
+import { join } from 'path';
+import { createInterface } from 'readline';
+import { PassThrough, type Readable, type Writable } from 'stream';
+import { getErrText } from '../utils';
+import { getLogger, LogCategories } from '../utils/logger';
+import { killProcessTree, PROCESS_GROUP_SUPPORTED } from '../utils/process-tree';
+
+const serverLogger = getLogger(LogCategories.MODULE.SANDBOX.SERVER);
+const ZYGOTE_START_TIMEOUT = 120_000;
+const CHILD_CONNECT_TIMEOUT = 10_000;
+/** 任务 socket 关闭后等待 zygote 上报退出码、stderr 连接读完的最长时间 */
+const CHILD_EXIT_STATUS_WAIT = 200;
+const MAX_HELLO_BYTES = 4096;
+
+/**
+ * Python 子进程的最小公共接口。
+ *
+ * 冷启动模式下是 `child_process.spawn` 返回的 ChildProcess；zygote 模式下是
+ * PythonZygoteChild，stdin/stdout 由 Unix socket 承载。
+ */
+export interface SandboxChildProcess {
+  readonly pid?: number;
+  readonly stdin: Writable | null;
+  readonly stdout: Readable | null;
+  readonly stderr: Readable | null;
+  once(
+    event: 'close',
+    listener: (code: number | null, signal: NodeJS.Signals | null) => void
+  ): unknown;
+  once(event: 'error', listener: (err: Error) => void): unknown;
+  off(event: string, listener: (...args: any[]) => void): unknown;
+  removeAllListeners(): unknown;
+}
+
+/**
+ * zygote fork 出的单任务子进程句柄。
+ *
+ * 子进程 fork 后会连接 runner 的 Unix socket 并把它 dup 到 stdin/stdout，
+ * 之后的协议与冷启动子进程完全一致。stderr 通过另一条按 token 匹配的连接转发到
+ * 本对象的 stderr，与冷启动子进程一样可以在失败结果中附带诊断输出。
+ */
+export class PythonZygoteChild extends EventEmitter implements SandboxChildProcess {
+  pid?: number;
+  readonly stdin = new PassThrough();
+  readonly stdout = new PassThrough();
+  readonly stderr = new PassThrough();
+  private socket?: Socket;
+  private socketClosed = false;
+  private stderrSocket?: Socket;
+  private stderrClosed = false;
+  private exitStatus?: { code: number | null; signal: NodeJS.Signals | null };
+  private closed = false;
+  private killRequested = false;
+  private connectTimer?: ReturnType<typeof setTimeout>;
+  private exitWaitTimer?: ReturnType<typeof setTimeout>;
+
+  constructor(readonly token: string) {
+    super();
+    this.connectTimer = setTimeout(() => {
+      this.fail(new Error(`Python zygote child did not connect within ${CHILD_CONNECT_TIMEOUT}ms`));
+    }, CHILD_CONNECT_TIMEOUT);
+  }
+
+  setPid(pid: number) {
+    this.pid = pid;
+    if (this.killRequested || this.closed) killProcessTree(pid);
+  }
+
+  attach(socket: Socket) {
+    clearTimeout(this.connectTimer);
+    if (this.closed) {
+      socket.destroy();
+      return;
+    }
+    this.socket = socket;
+    this.stdin.pipe(socket);
+    socket.pipe(this.stdout);
+    socket.on('error', () => {});
+    socket.once('close', () => {
+      this.socketClosed = true;
+      this.maybeFinish();
+    });
+  }
+
+  attachStderr(socket: Socket) {
+    if (this.closed || this.stderrSocket) {
+      socket.destroy();
+      return;
+    }
+    this.stderrSocket = socket;
+    // stderr 由 finish 统一结束，避免先于 close 事件结束流
+    socket.pipe(this.stderr, { end: false });
+    socket.on('error', () => {});
+    socket.once('close', () => {
+      this.stderrClosed = true;
+      this.maybeFinish();
+    });
+  }
+
+  markExited(code: number | null, signal: NodeJS.Signals | null) {
+    this.exitStatus = { code, signal };
+    if (!this.socket) {
+      this.finish();
+      return;
+    }
+    this.maybeFinish();
+  }
+
+  /** 任务 socket 关闭、退出码已知且 stderr 读完后结束；任一项迟迟不到时由定时器兜底 */
+  private maybeFinish() {
+    if (!this.socketClosed) return;
+    if (this.exitStatus && (!this.stderrSocket || this.stderrClosed)) {
+      this.finish();
+      return;
+    }
+    this.exitWaitTimer ??= setTimeout(() => this.finish(), CHILD_EXIT_STATUS_WAIT);
+  }
+
+  /** 在 pid 尚未返回时也能保证最终被杀掉 */
+  kill() {
+    this.killRequested = true;
+    if (this.pid) killProcessTree(this.pid);
+  }
+
+  get attached() {
+    return !!this.socket;
+  }
+
+  fail(err: Error) {
+    if (this.closed) return;
+    if (this.listenerCount('error') > 0) this.emit('error', err);
+    this.kill();
+    this.finish();
+  }
+
+  private finish() {
+    if (this.closed) return;
+    this.closed = true;
+    clearTimeout(this.connectTimer);
+    clearTimeout(this.exitWaitTimer);
+    this.socket?.destroy();
+    this.stderrSocket?.destroy();
+    this.stdout.end();
+    this.stderr.end();
+    this.emit('close', this.exitStatus?.code ?? null, this.exitStatus?.signal ?? null);
+  }
+}
+
+/**
+ * PythonZygote - Python fork-server。
+ *
+ * 单个预先初始化的 python3 进程完成 bootstrap 加载和白名单模块预导入后常驻，
+ * 每个任务由它 fork 一个子进程。子进程在 fork 之后才加载 native 库并进入
+ * seccomp/chroot/降权，执行一条任务即退出，one-shot 隔离语义不变；预导入模块的
+ * 内存页通过 copy-on-write 在子进程间共享，启动耗时降到毫秒级。
+ */
+export class PythonZygote {
+  private proc?: ChildProcess;
+  private server?: Server;
+  private socketDir?: string;
+  private socketPath?: string;
+  private readonly children = new Map<string, PythonZygoteChild>();
+  private readonly childrenByPid = new Map<number, PythonZygoteChild>();
+  private readonly stderrBuf: string[] = [];
+
+  constructor(
+    private readonly options: {
+      script: string;
+      cwd?: string;
+      env: NodeJS.ProcessEnv;
+      allowedModules: readonly string[];
+      preloadModules: readonly string[];
+      onExit?: () => void;
+    }
+  ) {}
+
+  get alive() {
+    return !!this.proc && this.proc.exitCode === null && this.proc.signalCode === null;
+  }
+
+  get pid() {
+    return this.proc?.pid;
+  }
+
+  async start(): Promise<{ preloadMs?: Record<string, number>; preloadErrors?: Record<string, string> }> {
+    this.socketDir = mkdtempSync(join(tmpdir(), 'fastgpt-python-zygote-'));
+    this.socketPath = join(this.socketDir, 'zygote.sock');
+    this.server = createServer((socket) => this.handleConnection(socket));
+    await new Promise<void>((resolve, reject) => {
+      this.server!.once('error', reject);
+      this.server!.listen(this.socketPath, () => {
+        this.server!.off('error', reject);
+        resolve();
+      });
+    });
+
+    const proc = spawn('python3', ['-u', this.options.script], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+      detached: PROCESS_GROUP_SUPPORTED,
+      cwd: this.options.cwd,
+      env: this.options.env
+    });
+    this.proc = proc;
+
+    const stderrRl = createInterface({ input: proc.stderr!, terminal: false });
+    stderrRl.on('line', (line: string) => {
+      this.stderrBuf.push(line);
+      if (this.stderrBuf.length > 20) this.stderrBuf.shift();
+    });
+
+    return new Promise((resolve, reject) => {
+      let ready = false;
+      const startTimer = setTimeout(() => {
+        fail(new Error(`Python zygote init timeout after ${ZYGOTE_START_TIMEOUT}ms`));
+      }, ZYGOTE_START_TIMEOUT);
+
+      const fail = (err: Error) => {
+        if (ready) return;
+        ready = true;
+        clearTimeout(startTimer);
+        this.stop();
+        reject(err);
+      };
+
+      const stdoutRl = createInterface({ input: proc.stdout!, terminal: false });
+      stdoutRl.on('line', (line: string) => {
+        let msg: any;
+        try {
+          msg = JSON.parse(line);
+        } catch {
+          serverLogger.warn(`Invalid python zygote message: ${line}`);
+          return;
+        }
+        if (msg.type === 'ready' && !ready) {
+          ready = true;
+          clearTimeout(startTimer);
+          resolve(msg);
+          return;
+        }
+        this.handleMessage(msg);
+      });
+
+      proc.once('error', (err) => fail(new Error(`Python zygote spawn error: ${getErrText(err)}`)));
+      proc.once('close', (code, signal) => {
+        const stderr = this.stderrBuf.length > 0 ? ` | stderr: ${this.stderrBuf.join('\n')}` : '';
+        const message = `Python zygote exited (exit code: ${code}, signal: ${signal})${stderr}`;
+        if (!ready) {
+          fail(new Error(message));
+          return;
+        }
+        serverLogger.warn(message);
+        this.proc = undefined;
+        this.failPending(new Error(message));
+        this.options.onExit?.();
+      });
+
+      proc.stdin!.write(
+        JSON.stringify({
+          type: 'zygote',
+          allowedModules: this.options.allowedModules,
+          preloadModules: this.options.preloadModules
+        }) + '\n'
+      );
+    });
+  }
+
+  /** 请求 zygote fork 一个新的任务子进程，子进程环境变量在 fork 后覆盖写入 */
+  fork(env: Record<string, string>): PythonZygoteChild {
+    const child = new PythonZygoteChild(randomUUID());
+    this.children.set(child.token, child);
+    child.once('close', () => {
+      this.children.delete(child.token);
+      if (child.pid) this.childrenByPid.delete(child.pid);
+    });
+
+    if (!this.alive || !this.proc?.stdin?.writable) {
+      queueMicrotask(() => child.fail(new Error('Python zygote is not running')));
+      return child;
+    }
+    this.proc.stdin.write(
+      JSON.stringify({ type: 'fork', token: child.token, socketPath: this.socketPath, env }) + '\n'
+    );
+    return child;
+  }
+
+  stop() {
+    const proc = this.proc;
+    this.proc = undefined;
+    if (proc) {
+      proc.removeAllListeners('close');
+      try {
+        proc.stdin?.end();
+      } catch {}
+      killProcessTree(proc.pid);
+    }
+    this.failPending(new Error('Python zygote stopped'));
+    // 已建立的子进程连接由各自任务清理，这里只停止接受新连接，不等待其关闭。
+    this.server?.close();
+    this.server = undefined;
+    if (this.socketDir) {
+      rmSync(this.socketDir, { recursive: true, force: true });
+      this.socketDir = undefined;
+    }
+  }
+
+  private handleMessage(msg: any) {
+    if (msg.type === 'forked') {
+      const child = this.children.get(msg.token);
+      if (!child) {
+        killProcessTree(msg.pid);
+        return;
+      }
+      this.childrenByPid.set(msg.pid, child);
+      child.setPid(msg.pid);
+      return;
+    }
+    if (msg.type === 'fork_failed') {
+      this.children.get(msg.token)?.fail(new Error(`Python zygote fork failed: ${msg.message}`));
+      return;
+    }
+    if (msg.type === 'exited') {
+      const child = this.childrenByPid.get(msg.pid);
+      if (!child) return;
+      this.childrenByPid.delete(msg.pid);
+      const signal = typeof msg.signal === 'number' ? signalName(msg.signal) : null;
+      child.markExited(msg.code ?? null, signal);
+      return;
+    }
+    serverLogger.warn(`Unexpected python zygote message: ${JSON.stringify(msg)}`);
+  }
+
+  /**
+   * 子进程连接后第一行是 hello，按 token 匹配 fork 请求，剩余字节交还给任务协议。
+   * 每个子进程先建立一条 type 为 stderr 的连接，再建立 type 为 hello 的任务连接。
+   */
+  private handleConnection(socket: Socket) {
+    let buf = Buffer.alloc(0);
+    const onData = (chunk: Buffer) => {
+      buf = Buffer.concat([buf, chunk]);
+      const idx = buf.indexOf(10);
+      if (idx < 0) {
+        if (buf.length > MAX_HELLO_BYTES) socket.destroy();
+        return;
+      }
+      socket.off('data', onData);
+      socket.pause();
+      const rest = buf.subarray(idx + 1);
+      if (rest.length > 0) socket.unshift(rest);
+
+      let hello: any;
+      try {
+        hello = JSON.parse(buf.subarray(0, idx).toString('utf8'));
+      } catch {
+        socket.destroy();
+        return;
+      }
+      const child =
+        hello?.type === 'hello' || hello?.type === 'stderr'
+          ? this.children.get(hello.token)
+          : undefined;
+      if (!child) {
+        socket.destroy();
+        return;
+      }
+      if (hello.type === 'stderr') {
+        child.attachStderr(socket);
+        return;
+      }
+      if (!child.pid && typeof hello.pid === 'number') {
+        this.childrenByPid.set(hello.pid, child);
+        child.setPid(hello.pid);
+      }
+      child.attach(socket);
+    };
+    socket.on('data', onData);
+    socket.on('error', () => {});
+  }
+
+  /** 已连上 socket 的子进程独立于 zygote 继续执行，只让尚未就位的 fork 请求失败 */
+  private failPending(err: Error) {
+    for (const child of [...this.children.values()]) {
+      if (!child.attached) child.fail(err);
+    }
+  }
+}
+
+function signalName(signal: number): NodeJS.Signals | null {
+  for (const [name, value] of Object.entries(osConstants.signals)) {
+    if (value === signal) return name as NodeJS.Signals;
+  }
+  return null;
+}
@@ -1,8 +1,90 @@
+/** 以文件方式传入的大输入（仅 Python）：写入任务临时目录，子进程首次访问时才加载 */
+export type ExecuteInputFile = {
+  /** Buffer 原样写入；字符串按 encoding 解码，默认 utf8 */
+  data: Buffer | string;
+  encoding?: 'utf8' | 'base64';
+  /** bytes 为字节串（切片按需读取），text 为字符串，json/csv 首次访问时解析（csv 为逐行 dict），默认 bytes */
+  format?: 'bytes' | 'text' | 'json' | 'csv';
+};
+
 /** 执行请求参数 */
 export type ExecuteOptions = {
   code: string;
   variables: Record<string, any>;
   queueId?: string;
+  /** 本次执行的超时（ms，仅 Python），不超过 SANDBOX_MAX_TIMEOUT，未指定时取该上限 */
+  timeoutMs?: number;
+  /**
+   * 流式日志回调（目前仅 Python runner 支持）：print 输出按大小/时间阈值分块推送，
+   * 提供该回调时结果中的 data.log 为空。
+   */
+  onLog?: (chunk: string) => void;
+  /**
+   * 流式结果回调（仅 Python）：main 为生成器或返回迭代器时，每产生一个值就回调一次，
+   * 回调返回的 Promise 完成后才归还子进程的发送额度（背压）。提供该回调时结果中的
+   * data.codeReturn 为 null；未提供时迭代器的值整体作为列表返回。
+   */
+  onChunk?: (value: any) => void | Promise<void>;
+  /**
+   * 返回值编码方式（仅 Python）：str 为 json.dumps(default=str)；native 对 numpy/pandas、
+   * datetime、Decimal、set、bytes 做原生转换。未指定时使用 SANDBOX_PYTHON_RESULT_ENCODER。
+   */
+  resultEncoder?: 'str' | 'native';
+  /** native 编码下 DataFrame 的朝向：records 为 [{列: 值}]，columns 为 {列: [值]} */
+  dataFrameOrient?: 'records' | 'columns';
+  /** 对用户代码开启 CPU 采样（仅 Python），结果中返回折叠栈 */
+  profile?: boolean;
+  /** 用 tracemalloc 统计用户代码的 Python/numpy 内存分配峰值（仅 Python），有一定开销 */
+  traceMemory?: boolean;
+  /** 结果中附带各阶段耗时 metrics（仅 Python）；不论是否开启，runner 都会汇总到 stats.phases */
+  metrics?: boolean;
+  /** 以文件方式传入的大输入（仅 Python），按名称与 variables 合并，同名时覆盖 variables */
+  inputFiles?: Record<string, ExecuteInputFile>;
+};
+
+/** Python 任务各阶段耗时（毫秒），未执行到的阶段不出现 */
+export type ExecuteMetrics = {
+  isolationInit?: number;
+  tmpdirInit?: number;
+  osGuards?: number;
+  /** safe builtins 与执行 globals 构造 */
+  globals?: number;
+  /** AST 校验 + 编译，编译缓存命中时为反序列化耗时 */
+  compile?: number;
+  /** 收到任务消息到开始执行用户字节码，即每个任务固定的准备开销 */
+  toUserCode?: number;
+  /** 模块顶层代码执行 */
+  exec?: number;
+  main?: number;
+  /** 每次 HTTP 代理往返 */
+  http?: number[];
+  serialize?: number;
+  /** 预热阶段耗时，不在请求的关键路径上 */
+  warmup?: { isolationInit?: number; preload?: number; templates?: number };
+  /** runner 侧观测：发送任务到收到结果 */
+  total?: number;
+  /** 子进程峰值 RSS（MB，VmHWM），包含预导入模块 */
+  peakRssMB?: number;
+  /** traceMemory 时 tracemalloc 统计的分配峰值（MB） */
+  tracedPeakMB?: number;
+};
+
+/** Python 采样结果，collapsed 为 flamegraph.pl / speedscope 可读的折叠栈 */
+export type ExecuteProfile = {
+  intervalMs: number;
+  samples: number;
+  /** 每行 `root;...;leaf 采样数`，按采样数降序 */
+  collapsed: string;
+  /** 超出输出上限时丢弃了采样数最少的栈 */
+  truncated: boolean;
+};
+
+/** Python emit_file 登记的附件，由 runner 从任务临时目录直接读取；HTTP 响应中 data 为 base64 */
+export type ExecuteFile = {
+  name: string;
+  mime: string;
+  size: number;
+  data: Buffer;
 };
 
 /** 执行结果 */
@@ -13,4 +95,32 @@ export type ExecuteResult = {
     log: string;
   };
   message?: string;
+  metrics?: ExecuteMetrics;
+  profile?: ExecuteProfile;
+  files?: ExecuteFile[];
+};
+
+/** Python 批量执行参数：同一段代码的模块顶层只执行一次，再对 variablesList 中的每一项调用 main */
+export type ExecuteBatchOptions = Omit<
+  ExecuteOptions,
+  'variables' | 'onLog' | 'onChunk' | 'inputFiles'
+> & {
+  variablesList: Record<string, any>[];
+};
+
+/** 批量执行中单项的结果，结构与单次执行相同，不含 metrics/profile */
+export type ExecuteBatchItemResult = Omit<ExecuteResult, 'metrics' | 'profile'>;
+
+/** 批量执行结果：success 表示模块顶层执行成功，各项成败见 results */
+export type ExecuteBatchResult = {
+  success: boolean;
+  data?: {
+    results: ExecuteBatchItemResult[];
+    /** 模块顶层的 print 输出 */
+    log: string;
+  };
+  message?: string;
+  metrics?: ExecuteMetrics;
+  profile?: ExecuteProfile;
+  files?: ExecuteFile[];
 };
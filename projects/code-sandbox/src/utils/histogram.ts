@@ -0,0 +1,64 @@
+/** 默认桶上界（毫秒），覆盖从亚毫秒的守卫安装到秒级的用户代码 */
+export const DEFAULT_LATENCY_BUCKETS_MS = [
+  0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000
+];
+
+/** 内存类指标（MB）的桶上界 */
+export const DEFAULT_MEMORY_BUCKETS_MB = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096];
+
+/**
+ * Histogram - 固定桶的耗时直方图
+ *
+ * 只记录各桶计数与 sum/max，内存占用与样本数无关；分位数按桶上界估算。
+ */
+export class Histogram {
+  private readonly counts: number[];
+  private count = 0;
+  private sum = 0;
+  private max = 0;
+
+  constructor(private readonly bounds: number[] = DEFAULT_LATENCY_BUCKETS_MS) {
+    // 最后一个桶收纳超过所有上界的样本
+    this.counts = new Array(bounds.length + 1).fill(0);
+  }
+
+  record(value: number) {
+    if (!Number.isFinite(value) || value < 0) return;
+    let index = this.bounds.findIndex((bound) => value <= bound);
+    if (index === -1) index = this.bounds.length;
+    this.counts[index]++;
+    this.count++;
+    this.sum += value;
+    if (value > this.max) this.max = value;
+  }
+
+  /** 估算分位数：返回累计计数首次达到 q 的桶上界，溢出桶返回观测到的最大值 */
+  quantile(q: number): number | null {
+    if (this.count === 0) return null;
+    const target = Math.max(1, Math.ceil(this.count * q));
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      seen += this.counts[i];
+      if (seen < target) continue;
+      return i < this.bounds.length ? Math.min(this.bounds[i], this.max) : this.max;
+    }
+    return this.max;
+  }
+
+  get stats() {
+    const buckets: Record<string, number> = {};
+    this.bounds.forEach((bound, i) => {
+      buckets[String(bound)] = this.counts[i];
+    });
+    buckets['+Inf'] = this.counts[this.bounds.length];
+    return {
+      count: this.count,
+      avg: this.count > 0 ? this.sum / this.count : null,
+      p50: this.quantile(0.5),
+      p95: this.quantile(0.95),
+      p99: this.quantile(0.99),
+      max: this.count > 0 ? this.max : null,
+      buckets
+    };
+  }
+}
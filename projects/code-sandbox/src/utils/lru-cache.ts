@@ -0,0 +1,59 @@
+/**
+ * LRUCache - 基于 Map 插入顺序的定长 LRU 缓存
+ *
+ * get 命中时把条目移到队尾，set 超出容量时淘汰队首（最久未使用）条目。
+ * maxSize <= 0 时缓存关闭，get 始终未命中。onEvict 只在因容量淘汰时调用，delete/clear 不触发。
+ */
+export class LRUCache<K, V> {
+  private readonly entries = new Map<K, V>();
+  private hits = 0;
+  private misses = 0;
+
+  constructor(
+    private readonly maxSize: number,
+    private readonly onEvict?: (key: K, value: V) => void
+  ) {}
+
+  get(key: K): V | undefined {
+    const value = this.entries.get(key);
+    if (value === undefined) {
+      this.misses++;
+      return undefined;
+    }
+    this.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    return value;
+  }
+
+  set(key: K, value: V) {
+    if (this.maxSize <= 0) return;
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    while (this.entries.size > this.maxSize) {
+      const [oldestKey, oldestValue] = this.entries.entries().next().value as [K, V];
+      this.entries.delete(oldestKey);
+      this.onEvict?.(oldestKey, oldestValue);
+    }
+  }
+
+  delete(key: K) {
+    this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  values() {
+    return this.entries.values();
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  get stats() {
+    return { hits: this.hits, misses: this.misses, size: this.entries.size, maxSize: this.maxSize };
+  }
+}
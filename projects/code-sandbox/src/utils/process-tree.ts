@@ -16,6 +16,17 @@ export function readLinuxRSSKB(pid: number): number | null {
   }
 }
 
+/** 按比例分摊共享页后的内存占用（Pss），用于衡量 copy-on-write 共享的实际收益 */
+export function readLinuxPSSKB(pid: number): number | null {
+  try {
+    const rollup = readFileSync(`/proc/${pid}/smaps_rollup`, 'utf-8');
+    const match = rollup.match(/^Pss:\s+(\d+)\s+kB/m);
+    return match ? parseInt(match[1], 10) : null;
+  } catch {
+    return null;
+  }
+}
+
 export function getLinuxChildPids(pid: number): number[] {
   const children = new Set<number>();
   try {
@@ -3,6 +3,7 @@ import https from 'https';
 import { isIP } from 'net';
 import dns from 'dns/promises';
 import { isInternalAddress, isInternalResolvedIP } from './ipCheck.util';
+import { LRUCache } from './lru-cache';
 
 export type SandboxHttpLimits = {
   maxRequests: number;
@@ -25,26 +26,249 @@ export type SandboxHttpRequestPayload = {
   timeoutMs?: number;
 };
 
+export type SandboxHttpResponse = {
+  status: number;
+  statusText: string;
+  headers: Record<string, any>;
+  data: string;
+};
+
+type SandboxHttpCacheEntry = {
+  response: SandboxHttpResponse;
+  expiresAt: number;
+};
+
+/**
+ * SandboxHttpCache - 代理层幂等 GET 响应的短时缓存，跨任务共享
+ *
+ * 以 URL + 请求头为 key，只缓存无请求体的 GET 200 响应，条目数和单条响应体大小都有上限。
+ * 有效期取响应 Cache-Control 的 s-maxage/max-age 与 ttlMs 中较小者；响应带
+ * no-store/no-cache/private 或 Set-Cookie 时不缓存，请求带 Cache-Control: no-cache/no-store
+ * 时跳过缓存直接出网。maxEntries <= 0 时关闭。
+ */
+export class SandboxHttpCache {
+  private readonly entries: LRUCache<string, SandboxHttpCacheEntry>;
+  private hits = 0;
+  private misses = 0;
+
+  constructor(
+    private readonly maxEntries: number,
+    private readonly ttlMs: number,
+    private readonly maxEntryBytes: number
+  ) {
+    this.entries = new LRUCache(maxEntries);
+  }
+
+  /** 可缓存的请求返回缓存 key，否则返回 undefined */
+  keyOf(payload: SandboxHttpRequestPayload): string | undefined {
+    if (this.maxEntries <= 0 || this.ttlMs <= 0) return undefined;
+    if ((payload.method || 'GET').toUpperCase() !== 'GET' || payload.body != null) return undefined;
+    const headers = Object.entries(payload.headers || {})
+      .map(([name, value]) => [name.toLowerCase(), String(value)])
+      .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+    const cacheControl = headers.find(([name]) => name === 'cache-control')?.[1] ?? '';
+    if (/\b(no-cache|no-store)\b/i.test(cacheControl)) return undefined;
+    return JSON.stringify([payload.url, headers]);
+  }
+
+  get(key: string): SandboxHttpResponse | undefined {
+    const entry = this.entries.get(key);
+    if (entry && entry.expiresAt > Date.now()) {
+      this.hits++;
+      return { ...entry.response, headers: { ...entry.response.headers } };
+    }
+    if (entry) this.entries.delete(key);
+    this.misses++;
+    return undefined;
+  }
+
+  set(key: string, response: SandboxHttpResponse) {
+    if (response.status !== 200 || response.headers['set-cookie']) return;
+    if (Buffer.byteLength(response.data, 'utf8') > this.maxEntryBytes) return;
+    const cacheControl = String(response.headers['cache-control'] ?? '');
+    if (/\b(no-store|no-cache|private)\b/i.test(cacheControl)) return;
+    const maxAge = /\bs-maxage=(\d+)/i.exec(cacheControl) ?? /\bmax-age=(\d+)/i.exec(cacheControl);
+    const ttlMs = maxAge ? Math.min(Number(maxAge[1]) * 1000, this.ttlMs) : this.ttlMs;
+    if (ttlMs <= 0) return;
+    this.entries.set(key, {
+      response: { ...response, headers: { ...response.headers } },
+      expiresAt: Date.now() + ttlMs
+    });
+  }
+
+  get stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups > 0 ? this.hits / lookups : null,
+      size: this.entries.size,
+      maxSize: this.maxEntries
+    };
+  }
+}
+
 const dnsResolve = async (hostname: string) => {
   const res = await dns.lookup(hostname, { all: true });
   return res.map((r) => r.address);
 };
 
+const assertPublicIPs = (ips: string[]) => {
+  if (ips.length === 0 || ips.some((ip) => isInternalResolvedIP(ip))) {
+    throw new Error('Request to private network not allowed');
+  }
+};
+
+/** URL 预检 + DNS 解析 + 对解析出的全部 IP 复检，返回可以连接的 IP */
+const resolvePublicIPs = async (url: string, hostname: string) => {
+  if (await isInternalAddress(url)) {
+    throw new Error('Request to private network not allowed');
+  }
+  const ips = await dnsResolve(hostname);
+  assertPublicIPs(ips);
+  return ips;
+};
+
+const countSockets = (sockets: NodeJS.ReadOnlyDict<unknown[]>) =>
+  Object.values(sockets).reduce((sum, list) => sum + (list?.length ?? 0), 0);
+
+type SandboxHttpDnsEntry = {
+  ips: string[];
+  expiresAt: number;
+};
+
+export type SandboxHttpConnectionPoolOptions = {
+  /** 保留 Agent 的 origin 数上限，超出时淘汰最久未用的 origin */
+  maxOrigins: number;
+  /** 单个 origin 的连接数上限（含空闲连接），超出的请求在 Agent 内排队 */
+  maxSocketsPerOrigin: number;
+  /** 空闲连接保留时长（ms），0 表示不复用连接 */
+  keepAliveMs: number;
+  /** DNS 解析结果缓存时长（ms），0 表示不缓存 */
+  dnsTtlMs: number;
+};
+
+/**
+ * SandboxHttpConnectionPool - 代理出网的 keep-alive 连接池与 DNS 缓存，跨任务共享
+ *
+ * 每个 origin（协议 + 主机 + 端口）使用独立的 keep-alive Agent，连接数和空闲时长受限，
+ * HTTPS Agent 同时缓存 TLS session；origin 被淘汰时关闭其空闲连接，在途请求不受影响。
+ *
+ * DNS 缓存只保存通过内网预检的解析结果。命中时跳过预检和解析，但仍对缓存中的全部 IP
+ * 复检 isInternalResolvedIP，连接始终钉在复检过的 IP 上（DNS pinning 不变）。
+ */
+export class SandboxHttpConnectionPool {
+  private readonly agents: LRUCache<string, http.Agent>;
+  private readonly dnsCache: LRUCache<string, SandboxHttpDnsEntry>;
+  private dnsHits = 0;
+  private dnsMisses = 0;
+  private newConnections = 0;
+  private reusedConnections = 0;
+
+  constructor(private readonly options: SandboxHttpConnectionPoolOptions) {
+    this.agents = new LRUCache(options.maxOrigins, (_origin, agent) => {
+      for (const sockets of Object.values(agent.freeSockets)) {
+        for (const socket of sockets ?? []) socket.destroy();
+      }
+    });
+    this.dnsCache = new LRUCache(options.dnsTtlMs > 0 ? options.maxOrigins : 0);
+  }
+
+  /** 解析并校验目标 IP，命中缓存时只复检 IP */
+  async lookup(url: string, hostname: string): Promise<string[]> {
+    const entry = this.dnsCache.get(hostname);
+    if (entry && entry.expiresAt > Date.now()) {
+      this.dnsHits++;
+      assertPublicIPs(entry.ips);
+      return entry.ips;
+    }
+    this.dnsMisses++;
+    const ips = await resolvePublicIPs(url, hostname);
+    if (this.options.dnsTtlMs > 0) {
+      this.dnsCache.set(hostname, { ips, expiresAt: Date.now() + this.options.dnsTtlMs });
+    }
+    return ips;
+  }
+
+  /** 返回 origin 对应的 keep-alive Agent；keepAliveMs 为 0 时返回 false，每个请求新建连接 */
+  agentFor(url: URL): http.Agent | false {
+    if (this.options.keepAliveMs <= 0) return false;
+    const origin = url.origin;
+    let agent = this.agents.get(origin);
+    if (!agent) {
+      const agentOptions = {
+        keepAlive: true,
+        timeout: this.options.keepAliveMs,
+        maxSockets: this.options.maxSocketsPerOrigin,
+        maxFreeSockets: this.options.maxSocketsPerOrigin,
+        scheduling: 'lifo' as const
+      };
+      agent =
+        url.protocol === 'https:' ? new https.Agent(agentOptions) : new http.Agent(agentOptions);
+      this.agents.set(origin, agent);
+    }
+    return agent;
+  }
+
+  recordConnection(reused: boolean) {
+    if (reused) this.reusedConnections++;
+    else this.newConnections++;
+  }
+
+  destroy() {
+    for (const agent of this.agents.values()) agent.destroy();
+    this.agents.clear();
+    this.dnsCache.clear();
+  }
+
+  get stats() {
+    const agents = [...this.agents.values()];
+    const dnsLookups = this.dnsHits + this.dnsMisses;
+    return {
+      origins: agents.length,
+      maxOrigins: this.options.maxOrigins,
+      maxSocketsPerOrigin: this.options.maxSocketsPerOrigin,
+      activeSockets: agents.reduce((sum, agent) => sum + countSockets(agent.sockets), 0),
+      freeSockets: agents.reduce((sum, agent) => sum + countSockets(agent.freeSockets), 0),
+      newConnections: this.newConnections,
+      reusedConnections: this.reusedConnections,
+      dns: {
+        hits: this.dnsHits,
+        misses: this.dnsMisses,
+        hitRate: dnsLookups > 0 ? this.dnsHits / dnsLookups : null,
+        size: this.dnsCache.size
+      }
+    };
+  }
+}
+
 /**
  * 执行受控 HTTP 请求。
  *
  * 该函数用于 sandbox 代理出网，集中维护协议、SSRF、DNS pinning、请求次数、
  * 请求体大小、响应大小和超时限制。调用方应为每次代码执行创建独立 state。
+ * 传入 cache 时，命中缓存的 GET 直接返回，不计入请求次数，也不做 DNS 解析和出网；
+ * 传入 connections 时复用其 DNS 缓存和 keep-alive 连接。
  */
 export async function runSandboxHttpRequest({
   payload,
   limits,
-  state
+  state,
+  cache,
+  connections
 }: {
   payload: SandboxHttpRequestPayload;
   limits: SandboxHttpLimits;
   state: SandboxHttpState;
-}): Promise<any> {
+  cache?: SandboxHttpCache;
+  connections?: SandboxHttpConnectionPool;
+}): Promise<SandboxHttpResponse> {
+  const cacheKey = cache?.keyOf(payload);
+  if (cacheKey !== undefined) {
+    const cached = cache!.get(cacheKey);
+    if (cached) return cached;
+  }
+
   if (++state.requestCount > limits.maxRequests) {
     throw new Error('Request limit exceeded');
   }
@@ -68,14 +292,9 @@ export async function runSandboxHttpRequest({
     throw new Error('Request body too large');
   }
 
-  if (await isInternalAddress(payload.url)) {
-    throw new Error('Request to private network not allowed');
-  }
-
-  const ips = await dnsResolve(parsed.hostname);
-  if (ips.length === 0 || ips.some((ip) => isInternalResolvedIP(ip))) {
-    throw new Error('Request to private network not allowed');
-  }
+  const ips = connections
+    ? await connections.lookup(payload.url, parsed.hostname)
+    : await resolvePublicIPs(payload.url, parsed.hostname);
 
   const timeout = (() => {
     if (typeof payload.timeoutMs === 'number' && Number.isFinite(payload.timeoutMs)) {
@@ -101,45 +320,72 @@ export async function runSandboxHttpRequest({
   }
 
   const lib = parsed.protocol === 'https:' ? https : http;
+  const agent = connections?.agentFor(parsed);
+  // 复用的空闲连接可能恰好被服务端关闭，幂等请求在收到响应前遇到 ECONNRESET 时换新连接重试一次
+  let retryOnReset = method === 'GET' || method === 'HEAD';
 
-  return new Promise((resolve, reject) => {
-    const req = lib.request(
-      {
-        method,
-        headers,
-        timeout,
-        hostname: resolvedIP,
-        port: parsed.port || (parsed.protocol === 'https:' ? 443 : 80),
-        path: parsed.pathname + parsed.search,
-        ...(isIP(parsed.hostname) ? {} : { servername: parsed.hostname })
-      },
-      (res: any) => {
-        const chunks: Buffer[] = [];
-        let size = 0;
-        res.on('data', (chunk: Buffer) => {
-          size += chunk.length;
-          if (size > limits.maxResponseSize) {
-            req.destroy();
-            reject(new Error('Response too large'));
-            return;
-          }
-          chunks.push(chunk);
-        });
-        res.on('end', () => {
-          const data = Buffer.concat(chunks).toString('utf-8');
-          const h: Record<string, any> = {};
-          for (const [k, v] of Object.entries(res.headers)) h[k] = v;
-          resolve({ status: res.statusCode, statusText: res.statusMessage, headers: h, data });
-        });
-        res.on('error', reject);
-      }
-    );
-    req.on('timeout', () => {
-      req.destroy();
-      reject(new Error('Request timeout'));
+  const send = (): Promise<SandboxHttpResponse> =>
+    new Promise((resolve, reject) => {
+      let responded = false;
+      let timedOut = false;
+      const req = lib.request(
+        {
+          method,
+          headers,
+          timeout,
+          hostname: resolvedIP,
+          port: parsed.port || (parsed.protocol === 'https:' ? 443 : 80),
+          path: parsed.pathname + parsed.search,
+          ...(agent === undefined ? {} : { agent }),
+          ...(isIP(parsed.hostname) ? {} : { servername: parsed.hostname })
+        },
+        (res: any) => {
+          responded = true;
+          connections?.recordConnection(req.reusedSocket);
+          const chunks: Buffer[] = [];
+          let size = 0;
+          res.on('data', (chunk: Buffer) => {
+            size += chunk.length;
+            if (size > limits.maxResponseSize) {
+              req.destroy();
+              reject(new Error('Response too large'));
+              return;
+            }
+            chunks.push(chunk);
+          });
+          res.on('end', () => {
+            const data = Buffer.concat(chunks).toString('utf-8');
+            const h: Record<string, any> = {};
+            for (const [k, v] of Object.entries(res.headers)) h[k] = v;
+            const response = {
+              status: res.statusCode,
+              statusText: res.statusMessage,
+              headers: h,
+              data
+            };
+            if (cacheKey !== undefined) cache!.set(cacheKey, response);
+            resolve(response);
+          });
+          res.on('error', reject);
+        }
+      );
+      req.on('timeout', () => {
+        timedOut = true;
+        req.destroy();
+        reject(new Error('Request timeout'));
+      });
+      req.on('error', (err: NodeJS.ErrnoException) => {
+        const reset = err.code === 'ECONNRESET' && req.reusedSocket;
+        if (reset && retryOnReset && !responded && !timedOut) {
+          retryOnReset = false;
+          resolve(send());
+          return;
+        }
+        reject(err);
+      });
+      if (body) req.write(body);
+      req.end();
     });
-    req.on('error', reject);
-    if (body) req.write(body);
-    req.end();
-  });
+
+  return send();
 }
@@ -0,0 +1,79 @@
+/**
+ * Python 二进制附件返回方式对比：base64 放进返回值 vs emit_file
+ *
+ * 用法: pnpm bench:python-artifact
+ *       BENCH_ROUNDS=20 BENCH_SIZE_MB=5 pnpm bench:python-artifact
+ *
+ * 每轮在子进程内生成 BENCH_SIZE_MB 大小的 PNG 文件内容，分别以 base64 字符串作为
+ * codeReturn 返回、以 emit_file 登记后由 runner 直接读取，输出端到端耗时和
+ * 结果消息大小（不含附件内容）。
+ */
+process.env.SANDBOX_MAX_OUTPUT_MB ||= '64';
+process.env.SANDBOX_MAX_TMP_MB ||= '64';
+
+const ROUNDS = Number(process.env.BENCH_ROUNDS || 10);
+const SIZE_MB = Number(process.env.BENCH_SIZE_MB || 5);
+const WRITE_PNG = `import random
+
+def write_png():
+    path = task_tmpdir + "/chart.png"
+    with open(path, "wb") as f:
+        f.write(b"\\x89PNG\\r\\n\\x1a\\n" + random.randbytes(${SIZE_MB} * 1024 * 1024))
+    return path
+`;
+const CASES = {
+  base64: `import base64
+${WRITE_PNG}
+def main():
+    with open(write_png(), "rb") as f:
+        return {"image": base64.b64encode(f.read()).decode()}`,
+  emit_file: `${WRITE_PNG}
+def main():
+    emit_file(write_png())
+    return {"image": "chart.png"}`
+};
+
+function summarize(values: number[]) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const pick = (p: number) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+  return {
+    count: sorted.length,
+    avgMs: sorted.reduce((sum, value) => sum + value, 0) / Math.max(sorted.length, 1),
+    p50Ms: pick(0.5),
+    p95Ms: pick(0.95),
+    maxMs: sorted[sorted.length - 1]
+  };
+}
+
+async function main() {
+  // env 在模块加载时解析，需在设置上面的默认值之后再导入 runner
+  const { PythonIsolatedRunner } = await import('../../src/isolated/python-isolated-runner');
+  const runner = new PythonIsolatedRunner(1);
+  await runner.init();
+
+  const results = [];
+  for (const [name, code] of Object.entries(CASES)) {
+    const roundTrip: number[] = [];
+    let resultBytes = 0;
+    for (let i = 0; i < ROUNDS; i++) {
+      const start = performance.now();
+      const result = await runner.execute({ code, variables: {} });
+      roundTrip.push(performance.now() - start);
+      if (!result.success) throw new Error(`bench task failed: ${result.message}`);
+      const { files, ...rest } = result;
+      if (name === 'emit_file' && files?.[0]?.size !== SIZE_MB * 1024 * 1024 + 8) {
+        throw new Error('bench emitted file mismatch');
+      }
+      resultBytes = Buffer.byteLength(JSON.stringify(rest));
+    }
+    results.push({ name, resultBytes, roundTrip: summarize(roundTrip) });
+  }
+
+  await runner.shutdown();
+  console.log(JSON.stringify({ rounds: ROUNDS, sizeMB: SIZE_MB, results }, null, 2));
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exit(1);
+});
@@ -0,0 +1,84 @@
+/**
+ * Python 批量执行与逐项执行的吞吐对比
+ *
+ * 用法: pnpm bench:python-batch
+ *       BENCH_ITEMS=500 BENCH_CONCURRENCY=8 pnpm bench:python-batch
+ *
+ * 同一段代码对 BENCH_ITEMS 个 variables 执行，输出三种方式的耗时与 items/sec：
+ * - perItemSequential：逐项调用 execute，即工作流按顺序循环调用 /sandbox/python
+ * - perItemConcurrent：以 BENCH_CONCURRENCY 的并发逐项调用 execute
+ * - batch：一次 executeBatch
+ */
+const ITEMS = Number(process.env.BENCH_ITEMS || 200);
+const CONCURRENCY = Number(process.env.BENCH_CONCURRENCY || 4);
+const CODE = `import json
+
+def main(text, n):
+    words = text.split()
+    return {"count": len(words), "n": n, "digest": json.dumps(sorted(words)[:3])}`;
+
+async function main() {
+  const { PythonIsolatedRunner } = await import('../../src/isolated/python-isolated-runner');
+  const variablesList = Array.from({ length: ITEMS }, (_, n) => ({
+    text: `item ${n} lorem ipsum dolor sit amet`.repeat(4),
+    n
+  }));
+
+  const runner = new PythonIsolatedRunner(CONCURRENCY);
+  await runner.init();
+
+  const measure = async (run: () => Promise<number>) => {
+    const start = performance.now();
+    const succeeded = await run();
+    const elapsedMs = performance.now() - start;
+    if (succeeded !== ITEMS) throw new Error(`bench items failed: ${ITEMS - succeeded}`);
+    return { elapsedMs, itemsPerSec: (ITEMS / elapsedMs) * 1000 };
+  };
+
+  const perItemSequential = await measure(async () => {
+    let succeeded = 0;
+    for (const variables of variablesList) {
+      const result = await runner.execute({ code: CODE, variables });
+      if (result.success) succeeded++;
+    }
+    return succeeded;
+  });
+
+  const perItemConcurrent = await measure(async () => {
+    let next = 0;
+    let succeeded = 0;
+    const workers = Array.from({ length: CONCURRENCY }, async () => {
+      while (next < variablesList.length) {
+        const variables = variablesList[next++];
+        const result = await runner.execute({ code: CODE, variables });
+        if (result.success) succeeded++;
+      }
+    });
+    await Promise.all(workers);
+    return succeeded;
+  });
+
+  const batch = await measure(async () => {
+    const result = await runner.executeBatch({ code: CODE, variablesList });
+    if (!result.success) throw new Error(`bench batch failed: ${result.message}`);
+    return result.data!.results.filter((item) => item.success).length;
+  });
+
+  await runner.shutdown();
+  console.log(
+    JSON.stringify(
+      {
+        items: ITEMS,
+        concurrency: CONCURRENCY,
+        results: { perItemSequential, perItemConcurrent, batch }
+      },
+      null,
+      2
+    )
+  );
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exit(1);
+});
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Python bootstrap 协议级基准
+
+用法: python3 test/benchmark/bench-python-bootstrap.py
+      BENCH_ROUNDS=20 BENCH_PROTOCOL=line python3 test/benchmark/bench-python-bootstrap.py
+      BENCH_CASES=warm_worker,many_proxy_calls python3 test/benchmark/bench-python-bootstrap.py
+
+不经过 HTTP 服务、并发控制和 runner，直接按 runner 的 stdin/stdout 协议驱动
+python-bootstrap.py：init -> ready -> 任务 -> http_request/http_response -> result。
+HTTP 代理由本脚本内的桩直接应答，不访问网络。每个场景每轮启动一个新进程，输出 JSON：
+- spawnMs：启动进程到可以发送任务（冷启动为 0，预热为收到 ready）
+- taskMs：发送任务到读完 result
+- phases：bootstrap 上报的 metrics 各阶段中位数，其中 toUserCode 为收到任务消息到开始执行
+  用户字节码的耗时，是衡量每任务固定开销的主要指标；peakRssMB 为子进程峰值 RSS，
+  large_input_*/large_table_* 对比 50MB 输入内联在 variables 与通过 inputFiles 传入的内存占用
+未启用 native 隔离，只衡量 bootstrap 本身的开销。
+"""
+
+import json
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '10'))
+PROTOCOL = os.environ.get('BENCH_PROTOCOL', 'frame')
+SELECTED = [name for name in os.environ.get('BENCH_CASES', '').split(',') if name]
+BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'isolated', 'python-bootstrap.py'
+)
+HEADER = struct.Struct('>II')
+ALLOWED_MODULES = ['json', 'math', 'time', 'numpy', 'pandas']
+HEAVY_MODULES = ['numpy', 'pandas']
+STUB_BODY = json.dumps({'ok': True, 'items': list(range(32))})
+
+TRIVIAL = '''def main():
+    return {"ok": True}
+'''
+HEAVY_IMPORTS = '''import numpy as np
+import pandas as pd
+
+def main():
+    return int(pd.DataFrame({"a": np.arange(10)})["a"].sum())
+'''
+ECHO_SIZE = '''def main(variables):
+    return len(variables["payload"])
+'''
+LARGE_RESULT = '''def main():
+    return "abc\\"中文\\\\n" * (10 * 1024 * 1024 // 12)
+'''
+FILE_OPENS = '''def main():
+    path = task_tmpdir + "/bench.txt"
+    for i in range(2000):
+        with open(path, "w") as f:
+            f.write("x" * 64)
+        with open(path) as f:
+            f.read()
+    return 1
+'''
+INPUT_LEN = '''def main(doc):
+    return len(doc)
+'''
+LARGE_TEXT = 'abc"中文\\n' * (50 * 1024 * 1024 // 12)
+LARGE_TABLE = [{'id': i, 'name': f'row-{i}', 'score': i * 0.5} for i in range(50 * 1024 * 1024 // 48)]
+PROXY_CALLS = '''def main():
+    for i in range(100):
+        http_request("https://example.com/api?i=" + str(i))
+    responses = http_request_many([{"url": "https://example.com/api?j=" + str(i)} for i in range(100)])
+    return len(responses)
+'''
+
+# 名称: (代码, variables, 是否预热, 预导入模块)
+CASES = {
+    'cold_spawn': (TRIVIAL, {}, False, []),
+    'warm_worker': (TRIVIAL, {}, True, []),
+    'heavy_imports_cold': (HEAVY_IMPORTS, {}, False, []),
+    'heavy_imports_preloaded': (HEAVY_IMPORTS, {}, True, HEAVY_MODULES),
+    'large_variables': (ECHO_SIZE, {'payload': 'abc"中文\\n' * (10 * 1024 * 1024 // 12)}, True, []),
+    'large_result': (LARGE_RESULT, {}, True, []),
+    'many_file_opens': (FILE_OPENS, {}, True, []),
+    'many_proxy_calls': (PROXY_CALLS, {}, True, []),
+    'large_input_inline': (INPUT_LEN, {'doc': LARGE_TEXT}, True, []),
+    'large_input_file': (INPUT_LEN, {}, True, []),
+    'large_table_inline': (INPUT_LEN, {'doc': LARGE_TABLE}, True, []),
+    'large_table_file': (INPUT_LEN, {}, True, []),
+}
+# 名称: {变量名: (文件内容, format)}，按 runner 的方式写入任务临时目录的 inputs/ 后传入 inputFiles
+INPUT_FILES = {
+    'large_input_file': {'doc': (LARGE_TEXT.encode('utf-8'), 'bytes')},
+    'large_table_file': {'doc': (json.dumps(LARGE_TABLE).encode('utf-8'), 'json')},
+}
+
+
+class Worker:
+    def __init__(self):
+        self.task_dir = tempfile.mkdtemp(prefix='task-')
+        env = {
+            'PATH': os.environ.get('PATH', '/usr/local/bin:/usr/bin:/bin'),
+            'HOME': self.task_dir,
+            'TMPDIR': self.task_dir,
+            'FASTGPT_TASK_TMPDIR': self.task_dir,
+            'PYTHONDONTWRITEBYTECODE': '1',
+            'OPENBLAS_NUM_THREADS': '1',
+        }
+        self.proc = subprocess.Popen(
+            [sys.executable, '-u', BOOTSTRAP], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+        )
+        self.frames = False
+
+    def send(self, msg):
+        data = json.dumps(msg, ensure_ascii=False).encode('utf-8')
+        if self.frames:
+            self.proc.stdin.write(HEADER.pack(len(data), 0) + data)
+        else:
+            self.proc.stdin.write(data + b'\n')
+        self.proc.stdin.flush()
+
+    def read(self):
+        if not self.frames:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError('bootstrap exited before result')
+            return json.loads(line), None
+        header = self.proc.stdout.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise RuntimeError('bootstrap exited before result')
+        json_len, blob_len = HEADER.unpack(header)
+        msg = json.loads(self.proc.stdout.read(json_len))
+        blob = self.proc.stdout.read(blob_len) if blob_len else None
+        return msg, blob
+
+    def init(self, preload):
+        init = {
+            'type': 'init',
+            'allowedModules': ALLOWED_MODULES,
+            'preloadModules': preload,
+            'memoryLimitMB': 2048,
+            'maxTmpBytes': 64 * 1024 * 1024,
+        }
+        if PROTOCOL == 'frame':
+            init['protocol'] = 'frame'
+        self.send(init)
+        ready, _ = self.read()
+        if ready.get('type') != 'ready':
+            raise RuntimeError(f'warmup failed: {ready}')
+        self.frames = ready.get('protocol') == 'frame'
+
+    def write_inputs(self, files):
+        input_dir = os.path.join(self.task_dir, 'inputs')
+        os.makedirs(input_dir, exist_ok=True)
+        descriptors = {}
+        for name, (data, fmt) in files.items():
+            path = os.path.join(input_dir, name)
+            with open(path, 'wb') as f:
+                f.write(data)
+            descriptors[name] = {'path': path, 'format': fmt, 'size': len(data)}
+        return descriptors
+
+    def run(self, code, variables, input_files=None):
+        self.send({
+            'code': code,
+            'variables': variables,
+            'inputFiles': self.write_inputs(input_files) if input_files else None,
+            'taskTmpDir': self.task_dir,
+            'allowedModules': ALLOWED_MODULES,
+            'timeoutMs': 60000,
+            'memoryLimitMB': 2048,
+            'maxTmpBytes': 64 * 1024 * 1024,
+            'requestLimits': {'maxOutputSize': 256 * 1024 * 1024, 'maxRequests': 1000},
+        })
+        while True:
+            msg, _ = self.read()
+            if msg.get('type') == 'http_request':
+                # 本地桩：不发起真实请求，直接返回固定响应
+                self.send({
+                    'type': 'http_response',
+                    'id': msg['id'],
+                    'success': True,
+                    'payload': {'status': 200, 'headers': {}, 'data': STUB_BODY},
+                })
+                continue
+            if msg.get('type') == 'result':
+                return msg
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+    }
+
+
+def bench(code, variables, warm, preload, input_files=None):
+    spawn_ms = []
+    task_ms = []
+    phases = {}
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        worker = Worker()
+        try:
+            if warm:
+                worker.init(preload)
+            sent = time.perf_counter()
+            result = worker.run(code, variables, input_files)
+            done = time.perf_counter()
+        finally:
+            worker.close()
+        if not result.get('success'):
+            raise RuntimeError(f'bench task failed: {result.get("message")}')
+        spawn_ms.append((sent - start) * 1000 if warm else 0)
+        task_ms.append((done - sent) * 1000)
+        for phase, value in (result.get('metrics') or {}).items():
+            if isinstance(value, (int, float)):
+                phases.setdefault(phase, []).append(value)
+    return {
+        'spawnMs': summarize(spawn_ms),
+        'taskMs': summarize(task_ms),
+        'phases': {phase: statistics.median(values) for phase, values in phases.items()},
+    }
+
+
+def main():
+    report = {'protocol': PROTOCOL, 'rounds': ROUNDS, 'cases': {}}
+    for name, (code, variables, warm, preload) in CASES.items():
+        if SELECTED and name not in SELECTED:
+            continue
+        report['cases'][name] = bench(code, variables, warm, preload, INPUT_FILES.get(name))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Python bootstrap 文件系统守卫开销微基准
+
+用法: python3 test/benchmark/bench-python-guards.py
+      BENCH_ITERATIONS=50000 python3 test/benchmark/bench-python-guards.py
+
+在同一进程内先测未加守卫的文件 I/O，再安装 bootstrap 的 open 守卫、os 守卫和
+audit hook 后重测（audit hook 安装后无法卸载，所以顺序固定），输出 JSON。
+用户代码以 '<string>' 文件名编译，走与沙箱任务相同的判定路径。
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '20000'))
+FILE_COUNT = 64
+BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'isolated', 'python-bootstrap.py'
+)
+
+USER_CODE = '''
+def open_read(paths, n):
+    for i in range(n):
+        with open(paths[i % len(paths)]) as f:
+            f.read()
+
+def stat(paths, n):
+    for i in range(n):
+        os.stat(paths[i % len(paths)])
+
+def listdir(root, n):
+    for i in range(n):
+        os.listdir(root)
+'''
+
+
+def load_bootstrap():
+    spec = importlib.util.spec_from_file_location('fastgpt_python_bootstrap', BOOTSTRAP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def user_functions(open_func):
+    namespace = {'open': open_func, 'os': os}
+    exec(compile(USER_CODE, '<string>', 'exec'), namespace)
+    return namespace
+
+
+def measure(funcs, paths, root):
+    cases = {
+        'open_read': lambda: funcs['open_read'](paths, ITERATIONS),
+        'stat': lambda: funcs['stat'](paths, ITERATIONS),
+        'listdir': lambda: funcs['listdir'](root, ITERATIONS // 10),
+    }
+    counts = {'open_read': ITERATIONS, 'stat': ITERATIONS, 'listdir': ITERATIONS // 10}
+    results = {}
+    for name, run in cases.items():
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        results[name] = counts[name] / elapsed
+    return results
+
+
+def main():
+    bootstrap = load_bootstrap()
+    root = tempfile.mkdtemp(prefix='fastgpt-guard-bench-')
+    paths = []
+    for i in range(FILE_COUNT):
+        path = os.path.join(root, f'file-{i}.txt')
+        with open(path, 'w') as f:
+            f.write('x' * 256)
+        paths.append(path)
+
+    unguarded = measure(user_functions(open), paths, root)
+
+    bootstrap._init_task_tmpdir(root)
+    bootstrap._install_os_guards()
+    bootstrap._install_audit_hook()
+    guarded = measure(user_functions(bootstrap._restricted_open), paths, root)
+
+    report = {
+        'iterations': ITERATIONS,
+        'python': sys.version.split()[0],
+        'opsPerSecond': {},
+    }
+    for name in unguarded:
+        report['opsPerSecond'][name] = {
+            'unguarded': round(unguarded[name]),
+            'guarded': round(guarded[name]),
+            'overheadPct': round((unguarded[name] / guarded[name] - 1) * 100, 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+/**
+ * Python runner 消息协议对比：逐行 JSON vs 长度前缀帧
+ *
+ * 用法: pnpm bench:python-ipc
+ *       BENCH_ROUNDS=20 pnpm bench:python-ipc
+ *
+ * 每轮把 1MB / 10MB 的字符串作为变量传入，再原样作为返回值取回，
+ * 输出两种协议下端到端往返耗时。
+ */
+process.env.SANDBOX_MAX_OUTPUT_MB ||= '64';
+process.env.SANDBOX_MAX_MEMORY_MB ||= '1024';
+
+const ROUNDS = Number(process.env.BENCH_ROUNDS || 10);
+const SIZES_MB = [1, 10];
+const CODE = `def main(variables):
+    return variables['payload']`;
+
+function summarize(values: number[]) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const pick = (p: number) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+  return {
+    count: sorted.length,
+    avgMs: sorted.reduce((sum, value) => sum + value, 0) / Math.max(sorted.length, 1),
+    p50Ms: pick(0.5),
+    p95Ms: pick(0.95),
+    maxMs: sorted[sorted.length - 1]
+  };
+}
+
+async function main() {
+  // env 在模块加载时解析，需在设置上面的默认值之后再导入 runner
+  const { PythonIsolatedRunner } = await import('../../src/isolated/python-isolated-runner');
+
+  const results = [];
+  for (const protocol of ['line', 'frame'] as const) {
+    const runner = new PythonIsolatedRunner(1, { protocol });
+    await runner.init();
+
+    for (const sizeMB of SIZES_MB) {
+      // 含多字节字符和需要转义的引号，接近真实的文本负载
+      const payload = 'abc"中文\\n'.repeat(Math.ceil((sizeMB * 1024 * 1024) / 12));
+      const roundTrip: number[] = [];
+      for (let i = 0; i < ROUNDS; i++) {
+        const start = performance.now();
+        const result = await runner.execute({ code: CODE, variables: { payload } });
+        roundTrip.push(performance.now() - start);
+        if (!result.success) throw new Error(`bench task failed: ${result.message}`);
+        if (result.data?.codeReturn !== payload) throw new Error('bench payload mismatch');
+      }
+      results.push({ protocol, sizeMB, roundTrip: summarize(roundTrip) });
+    }
+
+    await runner.shutdown();
+  }
+  console.log(JSON.stringify({ rounds: ROUNDS, results }, null, 2));
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exit(1);
+});
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""首次 plt.savefig 延迟基准
+
+用法: python3 test/benchmark/bench-python-matplotlib.py
+      BENCH_ROUNDS=10 python3 test/benchmark/bench-python-matplotlib.py
+      # 与旧版本对比：
+      git show <rev>:projects/code-sandbox/src/isolated/python-bootstrap.py > /tmp/old-bootstrap.py
+      BENCH_BASELINE=/tmp/old-bootstrap.py python3 test/benchmark/bench-python-matplotlib.py
+
+每轮启动一个全新的 bootstrap 进程和任务临时目录，按 runner 的协议发送任务，记录任务内
+首次 savefig 的耗时和从发送任务到收到结果的端到端耗时，输出 JSON。
+cold 为空的 matplotlib 缓存（每个任务重新扫描字体）；warm 先构建一次共享字体缓存，
+再像 runner 一样把 fontlist-*.json 只读复制进每个任务的 MPLCONFIGDIR。
+未启用 native 隔离，只衡量 bootstrap 本身的开销。
+"""
+
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '5'))
+BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'isolated', 'python-bootstrap.py'
+)
+CODE = '''import io
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+def main():
+    start = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(4, 3))
+    ax.plot([1, 2, 3], [1, 4, 9], label='y')
+    ax.set_title('bench')
+    ax.legend()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return {'savefigMs': (time.perf_counter() - start) * 1000, 'bytes': len(buf.getvalue())}
+'''
+
+
+def build_font_cache():
+    cache_dir = tempfile.mkdtemp(prefix='fastgpt-matplotlib-font-cache-')
+    subprocess.run(
+        [sys.executable, '-c', "import matplotlib; matplotlib.use('Agg'); import matplotlib.font_manager"],
+        env={**os.environ, 'HOME': cache_dir, 'MPLCONFIGDIR': cache_dir},
+        check=True,
+    )
+    files = glob.glob(os.path.join(cache_dir, 'fontlist-v*.json'))
+    for path in files:
+        os.chmod(path, 0o444)
+    return files
+
+
+def run_once(bootstrap, font_cache_files):
+    task_dir = tempfile.mkdtemp(prefix='task-')
+    mpl_dir = os.path.join(task_dir, 'matplotlib')
+    os.makedirs(mpl_dir)
+    for path in font_cache_files:
+        target = os.path.join(mpl_dir, os.path.basename(path))
+        shutil.copyfile(path, target)
+        os.chmod(target, 0o444)
+    env = {
+        'PATH': os.environ.get('PATH', '/usr/local/bin:/usr/bin:/bin'),
+        'HOME': task_dir,
+        'TMPDIR': task_dir,
+        'FASTGPT_TASK_TMPDIR': task_dir,
+        'PYTHONDONTWRITEBYTECODE': '1',
+    }
+    proc = subprocess.Popen(
+        [sys.executable, '-u', bootstrap], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+    )
+    task = {
+        'code': CODE,
+        'variables': {},
+        'taskTmpDir': task_dir,
+        'allowedModules': ['matplotlib', 'io', 'time'],
+        'timeoutMs': 60000,
+    }
+    start = time.perf_counter()
+    proc.stdin.write((json.dumps(task) + '\n').encode())
+    proc.stdin.flush()
+    result = None
+    for line in proc.stdout:
+        msg = json.loads(line)
+        if msg.get('type') == 'result':
+            result = msg
+            break
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdin.close()
+    proc.wait()
+    if not result or not result.get('success'):
+        raise RuntimeError(f'bench task failed: {result}')
+    return result['data']['codeReturn']['savefigMs'], elapsed
+
+
+def bench(bootstrap, font_cache_files=()):
+    savefig = []
+    total = []
+    for _ in range(ROUNDS):
+        savefig_ms, total_ms = run_once(bootstrap, font_cache_files)
+        savefig.append(savefig_ms)
+        total.append(total_ms)
+    return {
+        'firstSavefigMs': {'median': statistics.median(savefig), 'max': max(savefig)},
+        'taskMs': {'median': statistics.median(total), 'max': max(total)},
+    }
+
+
+def main():
+    font_cache_files = build_font_cache()
+    report = {
+        'rounds': ROUNDS,
+        'cold': bench(BOOTSTRAP),
+        'warm': bench(BOOTSTRAP, font_cache_files),
+    }
+    baseline = os.environ.get('BENCH_BASELINE')
+    if baseline:
+        report['baseline'] = {
+            'cold': bench(baseline),
+            'warm': bench(baseline, font_cache_files),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
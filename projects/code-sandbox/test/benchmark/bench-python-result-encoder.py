@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""DataFrame 返回值编码基准
+
+用法: python3 test/benchmark/bench-python-result-encoder.py
+      BENCH_ROWS=200000 BENCH_ROUNDS=5 python3 test/benchmark/bench-python-result-encoder.py
+
+每轮启动一个全新的 bootstrap 进程，按 runner 的协议发送任务：构造 BENCH_ROWS 行的
+DataFrame 并作为结果返回，记录从发送任务到读完结果的端到端耗时、结果字节数和子进程
+峰值 RSS（wait4 的 ru_maxrss），输出 JSON。
+- build_only：只构造不返回，作为耗时与内存的基线
+- str_to_dict：旧写法，用户自行 to_dict('records')，结果走 json.dumps(default=str)
+- native_records / native_columns：直接返回 DataFrame，由 resultEncoder=native 编码
+未启用 native 隔离，只衡量 bootstrap 本身的开销。
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROWS = int(os.environ.get('BENCH_ROWS', '100000'))
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '3'))
+BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'isolated', 'python-bootstrap.py'
+)
+BUILD = '''import numpy as np
+import pandas as pd
+
+def build(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'score': rng.random(n),
+        'name': ['user-' + str(i) for i in range(n)],
+        'created': pd.date_range('2024-01-01', periods=n, freq='min'),
+        'active': rng.random(n) > 0.5,
+    })
+'''
+CASES = {
+    'build_only': (BUILD + '''
+def main(variables):
+    return len(build(variables['rows']))
+''', {}),
+    'str_to_dict': (BUILD + '''
+def main(variables):
+    df = build(variables['rows'])
+    df['created'] = df['created'].astype(str)
+    return df.to_dict('records')
+''', {}),
+    'native_records': (BUILD + '''
+def main(variables):
+    return build(variables['rows'])
+''', {'resultEncoder': 'native', 'dataFrameOrient': 'records'}),
+    'native_columns': (BUILD + '''
+def main(variables):
+    return build(variables['rows'])
+''', {'resultEncoder': 'native', 'dataFrameOrient': 'columns'}),
+}
+
+
+def run_once(code, options):
+    task_dir = tempfile.mkdtemp(prefix='task-')
+    env = {
+        'PATH': os.environ.get('PATH', '/usr/local/bin:/usr/bin:/bin'),
+        'HOME': task_dir,
+        'TMPDIR': task_dir,
+        'FASTGPT_TASK_TMPDIR': task_dir,
+        'PYTHONDONTWRITEBYTECODE': '1',
+        'OPENBLAS_NUM_THREADS': '1',
+    }
+    proc = subprocess.Popen(
+        [sys.executable, '-u', BOOTSTRAP], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+    )
+    task = {
+        'code': code,
+        'variables': {'rows': ROWS},
+        'taskTmpDir': task_dir,
+        'allowedModules': ['numpy', 'pandas'],
+        'timeoutMs': 60000,
+        'requestLimits': {'maxOutputSize': 1024 * 1024 * 1024},
+        **options,
+    }
+    start = time.perf_counter()
+    proc.stdin.write((json.dumps(task) + '\n').encode())
+    proc.stdin.flush()
+    line = proc.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdin.close()
+    _, _, usage = os.wait4(proc.pid, 0)
+    result = json.loads(line)
+    if not result.get('success'):
+        raise RuntimeError(f'bench task failed: {result.get("message")}')
+    return elapsed, len(line), usage.ru_maxrss / 1024
+
+
+def bench(code, options):
+    elapsed = []
+    peak_rss = []
+    size = 0
+    for _ in range(ROUNDS):
+        task_ms, size, rss_mb = run_once(code, options)
+        elapsed.append(task_ms)
+        peak_rss.append(rss_mb)
+    return {
+        'taskMs': {'median': statistics.median(elapsed), 'max': max(elapsed)},
+        'peakRssMB': max(peak_rss),
+        'resultBytes': size,
+    }
+
+
+def main():
+    report = {'rows': ROWS, 'rounds': ROUNDS}
+    for name, (code, options) in CASES.items():
+        report[name] = bench(code, options)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
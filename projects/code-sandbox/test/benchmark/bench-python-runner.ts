@@ -0,0 +1,91 @@
+/**
+ * Python runner 启动模式对比：冷启动 spawn vs zygote fork
+ *
+ * 用法: pnpm bench:python-runner
+ *       BENCH_POOL_SIZE=8 BENCH_ROUNDS=50 pnpm bench:python-runner
+ *
+ * 输出 JSON：每种模式的补充进程耗时（spawn -> ready）、单任务端到端耗时，
+ * 以及池满时每个空闲进程的 RSS/PSS（仅 Linux）。
+ */
+import { PythonIsolatedRunner } from '../../src/isolated/python-isolated-runner';
+import { readLinuxPSSKB, readLinuxRSSKB } from '../../src/utils/process-tree';
+
+const POOL_SIZE = Number(process.env.BENCH_POOL_SIZE || 4);
+const ROUNDS = Number(process.env.BENCH_ROUNDS || 30);
+const CODE = `import numpy as np
+import pandas as pd
+
+def main(variables):
+    return {"sum": int(np.arange(10).sum()), "rows": len(pd.DataFrame({"a": [1, 2]}))}`;
+
+function summarize(values: number[]) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const pick = (p: number) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+  return {
+    count: sorted.length,
+    avgMs: sorted.reduce((sum, value) => sum + value, 0) / Math.max(sorted.length, 1),
+    p50Ms: pick(0.5),
+    p95Ms: pick(0.95),
+    maxMs: sorted[sorted.length - 1]
+  };
+}
+
+async function waitForFullPool(runner: PythonIsolatedRunner) {
+  const deadline = Date.now() + 120_000;
+  while (runner.stats.idle < POOL_SIZE && Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, 20));
+  }
+}
+
+function idleMemory(runner: PythonIsolatedRunner) {
+  const pids = [...(runner as any).idleChildren].map((child: any) => child.proc.pid as number);
+  const rss = pids.map(readLinuxRSSKB).filter((value): value is number => value !== null);
+  const pss = pids.map(readLinuxPSSKB).filter((value): value is number => value !== null);
+  const avg = (values: number[]) =>
+    values.length > 0 ? values.reduce((sum, value) => sum + value, 0) / values.length : null;
+  return { workers: pids.length, avgRssKB: avg(rss), avgPssKB: avg(pss) };
+}
+
+async function benchMode(zygote: boolean) {
+  const runner = new PythonIsolatedRunner(POOL_SIZE, { zygote });
+  const initStart = performance.now();
+  await runner.init();
+  await waitForFullPool(runner);
+  const initMs = performance.now() - initStart;
+  const memory = idleMemory(runner);
+
+  const warmup: number[] = [];
+  const execute: number[] = [];
+  for (let i = 0; i < ROUNDS; i++) {
+    const start = performance.now();
+    const result = await runner.execute({ code: CODE, variables: {} });
+    execute.push(performance.now() - start);
+    if (!result.success) throw new Error(`bench task failed: ${result.message}`);
+
+    await waitForFullPool(runner);
+    const last = runner.stats.warmupMs.last;
+    if (last !== null) warmup.push(last);
+  }
+
+  await runner.shutdown();
+  return {
+    mode: zygote ? 'zygote' : 'spawn',
+    initMs,
+    idleMemory: memory,
+    warmup: summarize(warmup),
+    execute: summarize(execute)
+  };
+}
+
+async function main() {
+  const results = [];
+  for (const zygote of [false, true]) {
+    results.push(await benchMode(zygote));
+  }
+  console.log(JSON.stringify({ poolSize: POOL_SIZE, rounds: ROUNDS, results }, null, 2));
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exit(1);
+});
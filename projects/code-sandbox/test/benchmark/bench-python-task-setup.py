@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Python bootstrap 每任务模块保护开销微基准
+
+用法: python3 test/benchmark/bench-python-task-setup.py
+      BENCH_ITERATIONS=5000 python3 test/benchmark/bench-python-task-setup.py
+
+对比两种防止用户代码污染 json/math/time 等模块的方式，输出 JSON（单位微秒）：
+- snapshot_restore：旧实现，任务开始时 dir()+getattr 快照，结束时 dir() 对比并逐个 setattr 还原
+- module_shims：当前实现，每个任务创建一组模块副本（ModuleType + 一次字典拷贝）
+并对比用户代码经副本与直接访问原模块读取属性的耗时，确认副本不拖慢热循环。
+"""
+
+import importlib.util
+import json
+import os
+import time
+import timeit
+
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '2000'))
+BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'isolated', 'python-bootstrap.py'
+)
+
+
+def load_bootstrap():
+    spec = importlib.util.spec_from_file_location('fastgpt_python_bootstrap', BOOTSTRAP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_snapshot(modules):
+    snapshots = []
+    for mod in modules:
+        attrs = {}
+        for name in dir(mod):
+            if not name.startswith('__'):
+                try:
+                    attrs[name] = getattr(mod, name)
+                except Exception:
+                    pass
+        snapshots.append((mod, attrs))
+    return snapshots
+
+
+def legacy_restore(snapshots):
+    for mod, attrs in snapshots:
+        current_names = set(n for n in dir(mod) if not n.startswith('__'))
+        for name in current_names - set(attrs.keys()):
+            try:
+                delattr(mod, name)
+            except Exception:
+                pass
+        for name, val in attrs.items():
+            try:
+                setattr(mod, name, val)
+            except Exception:
+                pass
+
+
+def per_call_us(func):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    bootstrap = load_bootstrap()
+    modules = bootstrap._SHIMMED_MODULES
+    shims = bootstrap._new_module_shims()
+    report = {
+        'iterations': ITERATIONS,
+        'modules': [mod.__name__ for mod in modules],
+        'setupUs': {
+            'snapshot_restore': per_call_us(lambda: legacy_restore(legacy_snapshot(modules))),
+            'module_shims': per_call_us(bootstrap._new_module_shims),
+        },
+        'attributeReadNs': {
+            'module': timeit.timeit('m.sqrt', globals={'m': bootstrap._math}, number=1_000_000) * 1000,
+            'shim': timeit.timeit('m.sqrt', globals={'m': shims['math']}, number=1_000_000) * 1000,
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
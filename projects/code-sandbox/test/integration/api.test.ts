@@ -291,6 +291,44 @@ describe('API Routes', () => {
     expect(data.message).toContain('not in the allowlist');
   });
 
+  it('POST /sandbox/python multipart 上传 inputFiles', async () => {
+    const form = new FormData();
+    form.append(
+      'payload',
+      JSON.stringify({
+        code: 'def main(doc, table):\n    return {"size": len(doc), "head": list(doc[:2]), "rows": len(table)}',
+        variables: {},
+        inputFiles: { table: { format: 'csv' } }
+      })
+    );
+    form.append('inputFiles.doc', new Blob([new Uint8Array([1, 2, 3, 4])]));
+    form.append('inputFiles.table', new Blob(['a,b\n1,2\n3,4\n']));
+
+    const res = await app.request('/sandbox/python', {
+      method: 'POST',
+      headers: headers(),
+      body: form
+    });
+    const data = await res.json();
+    expect(data.success).toBe(true);
+    expect(data.data.codeReturn).toEqual({ size: 4, head: [1, 2], rows: 2 });
+  });
+
+  it('POST /sandbox/python multipart 缺少 payload 返回 400', async () => {
+    const form = new FormData();
+    form.append('inputFiles.doc', new Blob(['x']));
+
+    const res = await app.request('/sandbox/python', {
+      method: 'POST',
+      headers: headers(),
+      body: form
+    });
+    const data = await res.json();
+    expect(res.status).toBe(400);
+    expect(data.success).toBe(false);
+    expect(data.message).toContain('Missing payload field');
+  });
+
   // ===== Modules =====
   it('GET /sandbox/modules 返回可用模块列表', async () => {
     const res = await app.request('/sandbox/modules', {
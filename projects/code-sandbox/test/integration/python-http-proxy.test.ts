@@ -0,0 +1,134 @@
+/**
+ * Python HTTP 代理并发集成测试
+ *
+ * 本地 stub 服务按 query 中的 delay 延迟响应，验证 http_request_many /
+ * http_request_async 的总耗时取决于最慢的请求，而不是各请求耗时之和。
+ *
+ * stub 服务监听在回环地址，而回环地址只在 NODE_ENV=development 下放行，且 ipCheck
+ * 在模块加载时读取 NODE_ENV，因此以 development 重新加载 runner，结束后恢复。
+ */
+import { afterAll, afterEach, beforeAll, describe, expect, it, vi } from 'vitest';
+import http from 'http';
+import type { PythonIsolatedRunner } from '../../src/isolated/python-isolated-runner';
+
+let runner: PythonIsolatedRunner;
+let server: http.Server;
+let baseUrl: string;
+let inFlight = 0;
+let maxInFlight = 0;
+
+beforeAll(async () => {
+  server = http.createServer((req, res) => {
+    const url = new URL(req.url || '/', 'http://localhost');
+    const delay = Number(url.searchParams.get('delay') || 0);
+    inFlight++;
+    maxInFlight = Math.max(maxInFlight, inFlight);
+    setTimeout(() => {
+      inFlight--;
+      res.setHeader('content-type', 'application/json');
+      res.end(JSON.stringify({ path: url.pathname, delay }));
+    }, delay);
+  });
+  await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+  const address = server.address();
+  if (!address || typeof address === 'string') throw new Error('Failed to start test server');
+  baseUrl = `http://127.0.0.1:${address.port}`;
+
+  vi.stubEnv('NODE_ENV', 'development');
+  vi.resetModules();
+  const { PythonIsolatedRunner } = await import('../../src/isolated/python-isolated-runner');
+  runner = new PythonIsolatedRunner(1);
+  await runner.init();
+});
+
+afterAll(async () => {
+  await runner.shutdown();
+  await new Promise<void>((resolve) => server.close(() => resolve()));
+  // 不让 development 下加载的网络模块留在模块缓存里，影响其他文件的 SSRF 校验
+  vi.unstubAllEnvs();
+  vi.resetModules();
+});
+
+afterEach(() => {
+  maxInFlight = 0;
+});
+
+describe('Python HTTP 代理并发请求', () => {
+  it('http_request_many 总耗时接近最慢请求而不是耗时之和', async () => {
+    const delays = [600, 100, 300, 200, 400];
+
+    const start = Date.now();
+    const result = await runner.execute({
+      code: `def main(variables):
+    base = variables['base']
+    responses = http_request_many([base + '/r' + str(i) + '?delay=' + str(d) for i, d in enumerate(variables['delays'])])
+    return {'paths': [json.loads(r['data'])['path'] for r in responses], 'statuses': [r['status'] for r in responses]}`,
+      variables: { base: baseUrl, delays }
+    });
+    const elapsed = Date.now() - start;
+
+    expect(result.success, JSON.stringify(result)).toBe(true);
+    expect(result.data?.codeReturn.paths).toEqual(['/r0', '/r1', '/r2', '/r3', '/r4']);
+    expect(result.data?.codeReturn.statuses).toEqual([200, 200, 200, 200, 200]);
+    expect(maxInFlight).toBeGreaterThan(1);
+    // 串行执行至少需要 1600ms；并发时约等于最慢的 600ms 加上进程开销
+    expect(elapsed).toBeLessThan(1400);
+  });
+
+  it('http_request_async 返回句柄，result() 按 id 取回各自响应', async () => {
+
+    const result = await runner.execute({
+      code: `def main(variables):
+    base = variables['base']
+    slow = http_request_async(base + '/slow?delay=300')
+    fast = http_request_async(base + '/fast?delay=10')
+    sync = http_request(base + '/sync')
+    return {
+        'fast': json.loads(fast.result()['data'])['path'],
+        'slow': json.loads(slow.result()['data'])['path'],
+        'sync': json.loads(sync['data'])['path']
+    }`,
+      variables: { base: baseUrl }
+    });
+
+    expect(result.success, JSON.stringify(result)).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ fast: '/fast', slow: '/slow', sync: '/sync' });
+  });
+
+  it('return_exceptions=True 时失败请求以异常对象返回，其余结果不受影响', async () => {
+
+    const result = await runner.execute({
+      code: `def main(variables):
+    results = http_request_many(
+        [variables['base'] + '/ok', {'url': 'ftp://example.com/file'}],
+        return_exceptions=True
+    )
+    return {'ok': json.loads(results[0]['data'])['path'], 'error': str(results[1])}`,
+      variables: { base: baseUrl }
+    });
+
+    expect(result.success, JSON.stringify(result)).toBe(true);
+    expect(result.data?.codeReturn.ok).toBe('/ok');
+    expect(result.data?.codeReturn.error).toMatch(/Protocol not allowed/);
+  });
+
+  it('在途请求数受 SANDBOX_REQUEST_MAX_CONCURRENCY 限制，总数仍受请求次数上限约束', async () => {
+    const code = `def main(variables):
+    urls = [variables['base'] + '/n' + str(i) + '?delay=100' for i in range(variables['count'])]
+    results = http_request_many(urls, return_exceptions=True)
+    return {'errors': [str(r) for r in results if isinstance(r, Exception)]}`;
+
+    // 请求次数上限（默认 30）以内全部成功，在途数恰好打满并发上限（默认 10）
+    const withinLimit = await runner.execute({ code, variables: { base: baseUrl, count: 30 } });
+    expect(withinLimit.success, JSON.stringify(withinLimit)).toBe(true);
+    expect(withinLimit.data?.codeReturn.errors).toEqual([]);
+    expect(maxInFlight).toBe(10);
+
+    maxInFlight = 0;
+    const overLimit = await runner.execute({ code, variables: { base: baseUrl, count: 35 } });
+    expect(overLimit.success, JSON.stringify(overLimit)).toBe(true);
+    expect(overLimit.data?.codeReturn.errors).toHaveLength(5);
+    expect(overLimit.data?.codeReturn.errors[0]).toMatch(/Request limit exceeded/);
+    expect(maxInFlight).toBe(10);
+  });
+});
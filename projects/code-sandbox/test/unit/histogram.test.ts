@@ -0,0 +1,41 @@
+/**
+ * Histogram 单元测试
+ *
+ * - 样本按桶上界计数，超出所有上界的进入 +Inf 桶
+ * - 分位数按桶上界估算，不超过观测到的最大值
+ * - 非法样本被忽略
+ */
+import { describe, it, expect } from 'vitest';
+import { Histogram } from '../../src/utils/histogram';
+
+describe('Histogram', () => {
+  it('按桶上界计数，超出上界的样本进入 +Inf 桶', () => {
+    const histogram = new Histogram([1, 10, 100]);
+    [0.5, 1, 5, 50, 500].forEach((value) => histogram.record(value));
+
+    expect(histogram.stats).toMatchObject({
+      count: 5,
+      avg: 111.3,
+      max: 500,
+      buckets: { '1': 2, '10': 1, '100': 1, '+Inf': 1 }
+    });
+  });
+
+  it('分位数取累计计数达到目标的桶上界，且不超过最大值', () => {
+    const histogram = new Histogram([1, 10, 100]);
+    for (let i = 0; i < 90; i++) histogram.record(0.2);
+    for (let i = 0; i < 10; i++) histogram.record(7);
+
+    expect(histogram.quantile(0.5)).toBe(1);
+    expect(histogram.quantile(0.95)).toBe(7);
+    expect(histogram.quantile(1)).toBe(7);
+  });
+
+  it('空直方图与非法样本', () => {
+    const histogram = new Histogram([1]);
+    histogram.record(NaN);
+    histogram.record(-1);
+
+    expect(histogram.stats).toMatchObject({ count: 0, avg: null, p50: null, max: null });
+  });
+});
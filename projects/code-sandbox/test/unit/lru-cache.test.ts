@@ -0,0 +1,67 @@
+/**
+ * LRUCache 单元测试
+ *
+ * - 命中后刷新顺序，超出容量淘汰最久未使用条目
+ * - hits/misses/size 统计
+ * - maxSize 为 0 时不缓存
+ * - 容量淘汰时回调 onEvict
+ */
+import { describe, it, expect } from 'vitest';
+import { LRUCache } from '../../src/utils/lru-cache';
+
+describe('LRUCache', () => {
+  it('超出容量时淘汰最久未使用的条目', () => {
+    const cache = new LRUCache<string, number>(2);
+    cache.set('a', 1);
+    cache.set('b', 2);
+    expect(cache.get('a')).toBe(1);
+    cache.set('c', 3);
+
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('c')).toBe(3);
+    expect(cache.size).toBe(2);
+  });
+
+  it('重复 set 同一个 key 只占一个位置并刷新顺序', () => {
+    const cache = new LRUCache<string, number>(2);
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.set('a', 10);
+    cache.set('c', 3);
+
+    expect(cache.get('a')).toBe(10);
+    expect(cache.get('b')).toBeUndefined();
+  });
+
+  it('容量淘汰时调用 onEvict，delete 不触发', () => {
+    const evicted: [string, number][] = [];
+    const cache = new LRUCache<string, number>(2, (key, value) => evicted.push([key, value]));
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.delete('b');
+    cache.set('c', 3);
+    cache.set('d', 4);
+
+    expect(evicted).toEqual([['a', 1]]);
+    expect(cache.size).toBe(2);
+  });
+
+  it('stats 统计命中与未命中次数', () => {
+    const cache = new LRUCache<string, number>(4);
+    cache.set('a', 1);
+    cache.get('a');
+    cache.get('a');
+    cache.get('missing');
+
+    expect(cache.stats).toEqual({ hits: 2, misses: 1, size: 1, maxSize: 4 });
+  });
+
+  it('maxSize 为 0 时关闭缓存', () => {
+    const cache = new LRUCache<string, number>(0);
+    cache.set('a', 1);
+
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.size).toBe(0);
+  });
+});
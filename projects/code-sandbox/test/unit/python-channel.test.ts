@@ -0,0 +1,51 @@
+import { describe, expect, it } from 'vitest';
+import { encodeFrame, FrameDecoder } from '../../src/isolated/python-channel';
+
+function decodeAll(chunks: Buffer[], maxFrameBytes?: number) {
+  const frames: { json: string; blob?: string }[] = [];
+  const oversize: number[] = [];
+  const decoder = new FrameDecoder(
+    (json, blob) => frames.push({ json: json.toString('utf8'), blob: blob?.toString('utf8') }),
+    (bytes) => oversize.push(bytes),
+    maxFrameBytes
+  );
+  for (const chunk of chunks) decoder.push(chunk);
+  return { frames, oversize };
+}
+
+describe('FrameDecoder', () => {
+  it('按字节任意切分时仍能还原完整的帧和 blob', () => {
+    const stream = Buffer.concat([
+      ...encodeFrame({ type: 'http_request', id: 'http-1' }),
+      ...encodeFrame({ type: 'compiled' }, Buffer.from('中文 blob')),
+      ...encodeFrame({ type: 'result', success: true })
+    ]);
+    const chunks = [...stream].map((byte) => Buffer.from([byte]));
+
+    const { frames } = decodeAll(chunks);
+
+    expect(frames).toEqual([
+      { json: '{"type":"http_request","id":"http-1"}', blob: undefined },
+      { json: '{"type":"compiled"}', blob: '中文 blob' },
+      { json: '{"type":"result","success":true}', blob: undefined }
+    ]);
+  });
+
+  it('帧头声明的长度超过上限时立即报告，不等待数据到齐', () => {
+    const head = Buffer.alloc(8);
+    head.writeUInt32BE(1024, 0);
+    head.writeUInt32BE(1024, 4);
+
+    const { frames, oversize } = decodeAll([head], 1024);
+
+    expect(frames).toEqual([]);
+    expect(oversize).toEqual([2048]);
+  });
+
+  it('行协议数据被当作帧头解析时按超限处理', () => {
+    const { frames, oversize } = decodeAll([Buffer.from('{"type": "result"}\n')], 10 * 1024 * 1024);
+
+    expect(frames).toEqual([]);
+    expect(oversize).toHaveLength(1);
+  });
+});
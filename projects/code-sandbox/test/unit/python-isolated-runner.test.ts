@@ -1,6 +1,8 @@
 import { afterEach, describe, expect, it } from 'vitest';
 import http from 'http';
 import { existsSync } from 'fs';
+import { createHash } from 'crypto';
+import { env } from '../../src/env';
 import { PythonIsolatedRunner } from '../../src/isolated/python-isolated-runner';
 import {
   PYTHON_SANDBOX_ROOT,
@@ -15,8 +17,11 @@ describe('PythonIsolatedRunner 兼容性', () => {
     runner = undefined;
   });
 
-  async function createRunner(maxConcurrency = 2) {
-    runner = new PythonIsolatedRunner(maxConcurrency);
+  async function createRunner(
+    maxConcurrency = 2,
+    options: ConstructorParameters<typeof PythonIsolatedRunner>[1] = {}
+  ) {
+    runner = new PythonIsolatedRunner(maxConcurrency, options);
     await runner.init();
     return runner;
   }
@@ -46,6 +51,113 @@ describe('PythonIsolatedRunner 兼容性', () => {
     expect(result.data?.log).toContain('debug');
   });
 
+  it('print 日志按 UTF-8 字节计算上限，超出时追加截断标记', async () => {
+    const r = await createRunner(1);
+
+    const result = await r.execute({
+      code: `def main():
+    print("start")
+    print("中" * 400000)
+    print("after")
+    return 1`,
+      variables: {}
+    });
+
+    expect(result.success).toBe(true);
+    expect(result.data?.log).toBe('start\n[log truncated: exceeded 1048576 bytes]');
+  });
+
+  it('传入 onLog 时日志在执行过程中分块推送，结果中不再重复携带', async () => {
+    const r = await createRunner(1);
+    const chunks: { data: string; at: number }[] = [];
+
+    const start = Date.now();
+    const result = await r.execute({
+      code: `def main():
+    for i in range(3):
+        print("tick", i)
+        delay(300)
+    return "done"`,
+      variables: {},
+      onLog: (data) => chunks.push({ data, at: Date.now() - start })
+    });
+    const elapsed = Date.now() - start;
+
+    expect(result.success).toBe(true);
+    expect(result.data?.log).toBe('');
+    expect(chunks.map((chunk) => chunk.data)).toEqual(['tick 0', 'tick 1', 'tick 2']);
+    expect(chunks[0].at).toBeLessThan(elapsed - 500);
+  });
+
+  it('生成器 main 传入 onChunk 时逐个推送，消费方未确认时暂停产生新值', async () => {
+    const r = await createRunner(1);
+    const code = `def main():
+    for i in range(40):
+        yield {"i": i}`;
+
+    const chunks: any[] = [];
+    const pending = r.execute({
+      code,
+      variables: {},
+      onChunk: async (value) => {
+        chunks.push(value);
+        await new Promise((resolve) => setTimeout(resolve, 300));
+      }
+    });
+    await new Promise((resolve) => setTimeout(resolve, 200));
+    // 未确认的值达到窗口（16）后生成器暂停
+    expect(chunks.length).toBeGreaterThan(0);
+    expect(chunks.length).toBeLessThanOrEqual(16);
+
+    const result = await pending;
+    expect(result.success).toBe(true);
+    expect(result.data?.codeReturn).toBeNull();
+    expect(chunks).toEqual(Array.from({ length: 40 }, (_, i) => ({ i })));
+
+    // async 消费方也按产生顺序逐个收到
+    const ordered: number[] = [];
+    const orderedResult = await r.execute({
+      code: 'def main():\n    yield from range(20)',
+      variables: {},
+      onChunk: async (value) => {
+        await new Promise((resolve) => setTimeout(resolve, (20 - value) * 2));
+        ordered.push(value);
+      }
+    });
+    expect(orderedResult.success).toBe(true);
+    expect(ordered).toEqual(Array.from({ length: 20 }, (_, i) => i));
+
+    // 未传入 onChunk 时整体作为列表返回
+    const collected = await r.execute({
+      code: 'def main():\n    return map(str, range(3))',
+      variables: {}
+    });
+    expect(collected.data?.codeReturn).toEqual(['0', '1', '2']);
+  });
+
+  it('onChunk 一直不确认时生成器等待额度期间仍按 timeoutMs 超时，而不是宽限期后强制退出', async () => {
+    const r = await createRunner(1);
+    const chunks: any[] = [];
+
+    const start = performance.now();
+    const result = await r.execute({
+      code: 'def main():\n    i = 0\n    while True:\n        yield i\n        i += 1',
+      variables: {},
+      timeoutMs: 300,
+      onChunk: (value) => {
+        chunks.push(value);
+        return new Promise<void>(() => undefined);
+      }
+    });
+    const elapsed = performance.now() - start;
+
+    expect(result.success).toBe(false);
+    expect(result.message).toBe('Script execution timed out');
+    expect(elapsed - 300).toBeLessThan(50);
+    // 串行交付：第一个值未确认前不会调用下一次 onChunk
+    expect(chunks).toEqual([0]);
+  });
+
   it('预热阶段没有 ready 子进程时 init fail closed', async () => {
     const r = new PythonIsolatedRunner(1);
     (r as any).replenishWarmChildren = async () => undefined;
@@ -56,6 +168,109 @@ describe('PythonIsolatedRunner 兼容性', () => {
     expect(r.stats.total).toBe(0);
   });
 
+  it('预热进程在 ready 中上报白名单模块的预导入耗时，且不放开非白名单 import', async () => {
+    const r = new PythonIsolatedRunner(1);
+    const reports: any[] = [];
+    const reportPreload = (r as any).reportPreload.bind(r);
+    (r as any).reportPreload = (msg: any) => {
+      reports.push(msg);
+      reportPreload(msg);
+    };
+    runner = r;
+    await r.init();
+
+    expect(reports.length).toBeGreaterThan(0);
+    expect(typeof reports[0].preloadMs.numpy).toBe('number');
+    expect(reports[0].preloadErrors).toBeUndefined();
+
+    const result = await r.execute({
+      code: `import numpy as np
+def main():
+    try:
+        __import__('os')
+        blocked = False
+    except Exception:
+        blocked = True
+    return {"sum": int(np.arange(4).sum()), "blocked": blocked}`,
+      variables: {}
+    });
+    expect(result.success).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ sum: 6, blocked: true });
+  });
+
+  it('zygote 模式下任务进程由 fork 产生，仍然一任务一进程且 zygote 退出后自动重建', async () => {
+    const r = new PythonIsolatedRunner(1, { zygote: true });
+    runner = r;
+    await r.init();
+    expect(r.stats.mode).toBe('zygote');
+
+    const zygotePid = (r as any).zygote.pid;
+    const firstPid = await waitForIdlePid(r);
+    expect(firstPid).toBeDefined();
+    expect(firstPid).not.toBe(zygotePid);
+
+    const first = await r.execute({
+      code: `import numpy as np
+def main(variables):
+    return {"sum": int(np.arange(variables["n"]).sum())}`,
+      variables: { n: 5 }
+    });
+    expect(first.success).toBe(true);
+    expect(first.data?.codeReturn).toEqual({ sum: 10 });
+
+    const secondPid = await waitForIdlePid(r, firstPid);
+    expect(secondPid).toBeDefined();
+    expect(r.stats.warmupMs.last).not.toBeNull();
+
+    process.kill(zygotePid, 'SIGKILL');
+    const deadline = Date.now() + 10000;
+    while (Date.now() < deadline && (r as any).zygote?.pid === zygotePid) {
+      await new Promise((resolve) => setTimeout(resolve, 50));
+    }
+    while (Date.now() < deadline && !(r as any).zygote?.alive) {
+      await new Promise((resolve) => setTimeout(resolve, 50));
+    }
+    expect((r as any).zygote?.alive).toBe(true);
+
+    const second = await r.execute({
+      code: `def main():
+    return {"ok": True}`,
+      variables: {}
+    });
+    expect(second.success).toBe(true);
+    expect(second.data?.codeReturn).toEqual({ ok: true });
+  });
+
+  it('zygote 模式下每个任务子进程的 stderr 单独归属到该任务', async () => {
+    const r = new PythonIsolatedRunner(1, { zygote: true });
+    runner = r;
+    let childStderr = '';
+    const createChild = (r as any).createChild.bind(r);
+    (r as any).createChild = () => {
+      const child = createChild();
+      child.proc.stderr.on('data', (chunk: Buffer) => (childStderr += chunk.toString()));
+      return child;
+    };
+    await r.init();
+
+    const result = await r.execute({
+      code: `import numpy as np
+def main():
+    return {"inf": str(np.float64(1) / 0)}`,
+      variables: {}
+    });
+    expect(result.success).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ inf: 'inf' });
+
+    // stderr 与结果走不同的连接，到达顺序不固定
+    const deadline = Date.now() + 2000;
+    while (Date.now() < deadline && !childStderr.includes('divide by zero')) {
+      await new Promise((resolve) => setTimeout(resolve, 20));
+    }
+    expect(childStderr).toContain('divide by zero');
+    expect((r as any).zygote.stderrBuf.join('\n')).not.toContain('divide by zero');
+  });
+
   it('支持 main(variables) 和 main(a, b) 旧写法', async () => {
     const r = await createRunner();
 
@@ -76,6 +291,18 @@ describe('PythonIsolatedRunner 兼容性', () => {
     expect(byArgs.data?.codeReturn.sum).toBe(3);
   });
 
+  it('与新增辅助函数同名的 variables 仍注入为全局变量，内置辅助函数名不被覆盖', async () => {
+    const r = await createRunner(1);
+
+    const result = await r.execute({
+      code: `def main():
+    return {"emit_file": emit_file, "many": http_request_many, "delay": callable(delay)}`,
+      variables: { emit_file: 'a', http_request_many: 2, delay: 3 }
+    });
+    expect(result.success).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ emit_file: 'a', many: 2, delay: true });
+  });
+
   it('保留 type() 正常判断能力', async () => {
     const r = await createRunner();
 
@@ -120,6 +347,481 @@ def main():
     expect(second.data?.codeReturn.has_leaked).toBe(false);
   });
 
+  it('用户改写 json/math 只作用于本任务的模块副本，不影响结果序列化', async () => {
+    const r = await createRunner(1);
+
+    const result = await r.execute({
+      code: `import json
+import math
+from json import dumps
+json.dumps = lambda *args, **kwargs: "polluted"
+json.JSONEncoder = None
+math.pi = 3
+
+def main():
+    import json as again
+    return {"dumps": again.dumps({}), "original": dumps({"a": 1}), "pi": math.pi, "sqrt": math.sqrt(9)}`,
+      variables: {}
+    });
+
+    expect(result.success).toBe(true);
+    expect(result.data?.codeReturn).toEqual({
+      dumps: 'polluted',
+      original: '{"a": 1}',
+      pi: 3,
+      sqrt: 3
+    });
+  });
+
+  it('相同代码命中编译缓存，不同 variables 结果正确', async () => {
+    const r = await createRunner(1);
+    const code = `def main(variables):
+    return {"double": variables["n"] * 2}`;
+
+    const first = await r.execute({ code, variables: { n: 1 } });
+    const second = await r.execute({ code, variables: { n: 21 } });
+
+    expect(first.data?.codeReturn).toEqual({ double: 2 });
+    expect(second.data?.codeReturn).toEqual({ double: 42 });
+    expect(r.stats.compileCache).toMatchObject({ hits: 1, misses: 1, size: 1 });
+  });
+
+  it('编译缓存只接受任务第一条消息，用户代码伪造的 compiled 消息被拒绝', async () => {
+    const r = await createRunner(1, { protocol: 'line' });
+    const result = await r.execute({
+      code: `import platform
+def main():
+    platform.os.write(1, b'{"type": "compiled", "code": "AAAA"}\\n')
+    return {"ok": True}`,
+      variables: {}
+    });
+
+    expect(result.success).toBe(false);
+    expect(result.message).toContain('Unknown python runner message');
+    expect(r.stats.compileCache.size).toBe(1);
+    expect(
+      (r as any).compileCache.entries.values().next().value.toString('base64')
+    ).not.toBe('AAAA');
+  });
+
+  it('帧协议下伪造的 compiled 帧同样被拒绝，编译缓存仍以原始字节往返', async () => {
+    const r = await createRunner(1, { protocol: 'frame' });
+    const code = `import platform
+import struct
+def main(variables):
+    if variables.get("forge"):
+        body = b'{"type": "compiled"}'
+        platform.os.write(1, struct.pack('>II', len(body), 4) + body + b'AAAA')
+    return {"n": variables["n"]}`;
+
+    const forged = await r.execute({ code, variables: { n: 1, forge: true } });
+    const cached = await r.execute({ code, variables: { n: 2 } });
+
+    expect(forged.success).toBe(false);
+    expect(forged.message).toContain('Unknown python runner message');
+    expect(cached.data?.codeReturn).toEqual({ n: 2 });
+    expect(r.stats).toMatchObject({ protocol: 'frame', compileCache: { hits: 1, size: 1 } });
+  });
+
+  it('metrics 为 true 时结果附带各阶段耗时，stats.phases 始终按阶段汇总', async () => {
+    const r = await createRunner(1);
+
+    const ok = await r.execute({
+      code: `def main():
+    return 1`,
+      variables: {},
+      metrics: true
+    });
+    const failed = await r.execute({
+      code: `def main():
+    raise ValueError("boom")`,
+      variables: {},
+      metrics: true
+    });
+    const plain = await r.execute({
+      code: `def main():
+    return 1`,
+      variables: {}
+    });
+
+    expect(Object.keys(ok.metrics || {})).toEqual(
+      expect.arrayContaining([
+        'isolationInit',
+        'tmpdirInit',
+        'osGuards',
+        'globals',
+        'compile',
+        'toUserCode',
+        'exec',
+        'main',
+        'serialize',
+        'warmup',
+        'total'
+      ])
+    );
+    expect(failed.success).toBe(false);
+    expect(failed.metrics?.exec).toBeGreaterThanOrEqual(0);
+    expect(failed.metrics?.main).toBeUndefined();
+    expect(plain.success).toBe(true);
+    expect(plain.metrics).toBeUndefined();
+    expect(r.stats.phases.total.count).toBe(3);
+    expect(r.stats.phases.main.count).toBe(2);
+    expect(r.stats.phases['warmup.preload'].count).toBe(3);
+
+    // 子进程上报的未知字段不会新建直方图
+    const phases = Object.keys(r.stats.phases);
+    (r as any).recordMetrics({ main: 1, bogus: 1, extra: [1, 2], warmup: { forged: 1 } });
+    expect(Object.keys(r.stats.phases)).toEqual(phases);
+    expect(r.stats.phases.main.count).toBe(3);
+  });
+
+  it('timeoutMs 按毫秒生效，超时后的尾部占用不超过 50ms', async () => {
+    const r = await createRunner(1);
+
+    const measure = async (code: string, timeoutMs: number) => {
+      const start = performance.now();
+      const result = await r.execute({ code, variables: {}, timeoutMs });
+      return { result, elapsed: performance.now() - start };
+    };
+
+    const busy = await measure(`def main():\n    while True:\n        pass`, 200);
+    expect(busy.result.success).toBe(false);
+    expect(busy.result.message).toBe('Script execution timed out');
+    expect(busy.elapsed).toBeGreaterThanOrEqual(200);
+    expect(busy.elapsed - 200).toBeLessThan(50);
+
+    // delay 计入剩余时间：注定越过截止时间的睡眠立即失败
+    const sleepy = await measure(`def main():\n    delay(5000)\n    return 1`, 300);
+    expect(sleepy.result.success).toBe(false);
+    expect(sleepy.result.message).toBe('Script execution timed out');
+    expect(sleepy.elapsed).toBeLessThan(300);
+
+    // 吞掉 TimeoutError 的代码在宽限期（默认 500ms）后被强制退出
+    const swallow = await measure(
+      `def main():
+    while True:
+        try:
+            while True:
+                pass
+        except Exception:
+            pass`,
+      200
+    );
+    expect(swallow.result.success).toBe(false);
+    expect(swallow.result.message).toBe('Script execution timed out (forced)');
+    expect(swallow.elapsed - 700).toBeLessThan(50);
+
+    // 绕过 schema 传入 0 或负数时按最小超时处理，不会取消计时器导致任务永不结束
+    for (const timeoutMs of [0, -1]) {
+      const zero = await measure(`def main():\n    while True:\n        pass`, timeoutMs);
+      expect(zero.result.success).toBe(false);
+      expect(zero.result.message).toBe('Script execution timed out');
+      expect(zero.elapsed).toBeLessThan(50);
+    }
+
+    // 阻塞在 HTTP 代理响应上的任务同样按时抛出 TimeoutError，而不是等宽限期后强制退出
+    (r as any).handleHttpRequestMessage = () => new Promise(() => undefined);
+    for (const call of [
+      'http_request("https://example.com/slow")',
+      'http_request_many(["https://example.com/a", "https://example.com/b"])'
+    ]) {
+      const waiting = await measure(`def main():\n    ${call}\n    return 1`, 200);
+      expect(waiting.result.success).toBe(false);
+      expect(waiting.result.message).toBe('Script execution timed out');
+      expect(waiting.elapsed - 200).toBeLessThan(50);
+    }
+  });
+
+  it('超出内存上限时子进程内抛出 MemoryError 并正常返回，结果附带峰值内存', async () => {
+    const r = await createRunner(1);
+
+    const start = performance.now();
+    const oom = await r.execute({
+      code: `import numpy as np
+
+def main():
+    return float(np.ones(200_000_000).sum())`,
+      variables: {},
+      metrics: true
+    });
+    const elapsed = performance.now() - start;
+    const ok = await r.execute({
+      code: `def main():
+    data = bytearray(32 * 1024 * 1024)
+    return len(data)`,
+      variables: {},
+      traceMemory: true,
+      metrics: true
+    });
+
+    expect(oom.success).toBe(false);
+    expect(oom.message).toMatch(/^Memory limit exceeded \(limit: \d+MB\)$/);
+    // 不依赖 runner 的 RSS 轮询兜底
+    expect(elapsed).toBeLessThan(1000);
+    expect(oom.metrics?.peakRssMB).toBeGreaterThan(0);
+
+    expect(ok.success).toBe(true);
+    expect(ok.metrics?.peakRssMB).toBeGreaterThan(32);
+    expect(ok.metrics?.tracedPeakMB).toBeGreaterThanOrEqual(32);
+    expect(r.stats.phases.peakRssMB.count).toBe(2);
+  });
+
+  it('预导入模块占用的内存不计入用户可用的内存额度', async () => {
+    const r = await createRunner(1);
+    // 预热进程就绪时上报预导入实测占用，后续预热进程按实测值预留
+    expect((r as any).preloadDataMB).toBeGreaterThan(0);
+
+    // 连续两次分别落在按默认预留和按实测预留启动的预热进程上
+    for (let i = 0; i < 2; i++) {
+      const result = await r.execute({
+        code: `import numpy as np
+
+def main():
+    return float(np.ones(${env.SANDBOX_MAX_MEMORY_MB - 32} * 1024 * 1024 // 8).sum())`,
+        variables: {}
+      });
+      expect(result.success).toBe(true);
+    }
+  });
+
+  it('profile=true 时返回只含用户与库帧的折叠栈', async () => {
+    const r = await createRunner(1);
+
+    const ok = await r.execute({
+      code: `import json
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+def main():
+    fib(24)
+    return len(json.dumps(list(range(100000))))`,
+      variables: {},
+      profile: true
+    });
+    const plain = await r.execute({ code: `def main():\n    return 1`, variables: {} });
+
+    expect(ok.success).toBe(true);
+    expect(ok.profile?.samples).toBeGreaterThan(0);
+    expect(ok.profile?.truncated).toBe(false);
+    expect(ok.profile?.collapsed).toMatch(/^main \(<user>:6\);fib \(<user>:3\)/m);
+    expect(ok.profile?.collapsed).not.toMatch(/_call_main|_run_task|python-bootstrap/);
+    for (const line of ok.profile!.collapsed.split('\n')) {
+      expect(line).toMatch(/^\S.* \d+$/);
+    }
+    expect(plain.profile).toBeUndefined();
+  });
+
+  it('resultEncoder=native 时 numpy/pandas 结果按原生结构返回，NaN/NaT 为 null', async () => {
+    const r = await createRunner(1);
+    const code = `import numpy as np
+import pandas as pd
+import datetime
+import decimal
+
+def main():
+    df = pd.DataFrame({"a": [1, 2], "b": [0.5, np.nan], "t": pd.to_datetime(["2024-01-01", None])})
+    return {
+        "df": df,
+        "vc": pd.Series(["x", "y", "x"]).value_counts(),
+        "arr": np.array([[1.0, np.nan], [np.inf, 2.5]]),
+        "scalars": [np.int64(7), np.float64("nan"), np.bool_(True)],
+        "when": datetime.date(2024, 1, 2),
+        "dec": decimal.Decimal("1.10"),
+        "tags": {"only"},
+        "raw": b"hi"
+    }`;
+
+    const legacy = await r.execute({
+      code: `import pandas as pd
+def main():
+    return pd.DataFrame({"a": [1, 2]})`,
+      variables: {}
+    });
+    const records = await r.execute({ code, variables: {}, resultEncoder: 'native' });
+    const columns = await r.execute({
+      code,
+      variables: {},
+      resultEncoder: 'native',
+      dataFrameOrient: 'columns'
+    });
+
+    expect(typeof legacy.data?.codeReturn).toBe('string');
+    expect(records.success, JSON.stringify(records)).toBe(true);
+    expect(records.data?.codeReturn).toEqual({
+      df: [
+        { a: 1, b: 0.5, t: '2024-01-01T00:00:00.000' },
+        { a: 2, b: null, t: null }
+      ],
+      vc: { x: 2, y: 1 },
+      arr: [
+        [1, null],
+        [null, 2.5]
+      ],
+      scalars: [7, null, true],
+      when: '2024-01-02',
+      dec: '1.10',
+      tags: ['only'],
+      raw: 'aGk='
+    });
+    expect(columns.data?.codeReturn.df).toEqual({
+      a: [1, 2],
+      b: [0.5, null],
+      t: ['2024-01-01T00:00:00.000', null]
+    });
+  });
+
+  it('行协议与帧协议返回相同的大结果', async () => {
+    const payload = 'abc"中文\\n'.repeat(50_000);
+    const code = `def main(variables):
+    return {"payload": variables["payload"], "size": len(variables["payload"])}`;
+
+    for (const protocol of ['line', 'frame'] as const) {
+      const r = await createRunner(1, { protocol });
+      const result = await r.execute({ code, variables: { payload } });
+      expect(result.success, JSON.stringify(result).slice(0, 200)).toBe(true);
+      expect(result.data?.codeReturn).toEqual({ payload, size: payload.length });
+      await r.shutdown();
+    }
+  });
+
+  it('批量执行只执行一次模块顶层，逐项返回结果与错误', async () => {
+    const r = await createRunner(1);
+
+    const result = await r.executeBatch({
+      code: `print("module")
+calls = []
+LIMIT = 3
+
+def main(x):
+    calls.append(x)
+    print("item", x)
+    if x == 2:
+        raise ValueError("bad item")
+    if x == LIMIT:
+        return "z" * (2 * 1024 * 1024)
+    return {"x": x, "calls": len(calls)}`,
+      variablesList: [{ x: 1 }, { x: 2 }, { x: 3 }, { x: 4, LIMIT: 4 }]
+    });
+
+    expect(result.success, JSON.stringify(result).slice(0, 300)).toBe(true);
+    expect(result.data?.log).toBe('module');
+    const results = result.data!.results;
+    expect(results).toHaveLength(4);
+    expect(results[0]).toEqual({
+      success: true,
+      data: { codeReturn: { x: 1, calls: 1 }, log: 'item 1' }
+    });
+    expect(results[1]).toEqual({ success: false, message: 'bad item' });
+    expect(results[2].success).toBe(false);
+    expect(results[2].message).toMatch(/^Item output too large/);
+    // 模块顶层定义的同名变量不被单项 variables 覆盖，模块状态在项之间共享
+    expect(results[3].data?.codeReturn).toEqual({ x: 4, calls: 4 });
+
+    // 超时是整批预算：已完成的项照常返回，当前项与剩余项标记超时
+    const timed = await r.executeBatch({
+      code: `def main(n):
+    while n:
+        pass
+    return n`,
+      variablesList: [{ n: 0 }, { n: 1 }, { n: 0 }],
+      timeoutMs: 200
+    });
+    expect(timed.success).toBe(true);
+    expect(timed.data?.results.map((item) => item.success)).toEqual([true, false, false]);
+    expect(timed.data?.results[2].message).toBe('Script execution timed out');
+
+    const empty = await r.executeBatch({ code: 'def main():\n    return 1', variablesList: [] });
+    expect(empty).toEqual({ success: false, message: 'variablesList cannot be empty' });
+  });
+
+  it('inputFiles 写入任务临时目录，按格式延迟加载且用户代码不可改写', async () => {
+    const r = await createRunner(1);
+    const blob = Buffer.alloc(4 * 1024 * 1024, 7);
+
+    const result = await r.execute({
+      code: `import hashlib
+
+def main(blob, doc, table, name):
+    result = {
+        "size": len(blob),
+        "md5": hashlib.md5(blob.value).hexdigest(),
+        "head": list(blob[:2]),
+        "kind": type(blob.value).__name__,
+        "keys": sorted(doc),
+        "rows": list(table),
+        "name": name,
+    }
+    try:
+        open(table.path, "a").write("3,4")
+        result["writable"] = True
+    except Exception:
+        result["writable"] = False
+    return result`,
+      variables: { name: 'inline', doc: 'overridden' },
+      inputFiles: {
+        blob: { data: blob },
+        doc: { data: JSON.stringify({ b: 1, a: [1, 2] }), format: 'json' },
+        table: {
+          data: Buffer.from('x,y\n1,2\n').toString('base64'),
+          encoding: 'base64',
+          format: 'csv'
+        }
+      }
+    });
+
+    expect(result.success, result.message).toBe(true);
+    expect(result.data?.codeReturn).toEqual({
+      size: blob.length,
+      md5: createHash('md5').update(blob).digest('hex'),
+      head: [7, 7],
+      // 只暴露 bytes，不暴露 mmap 等文件映射对象
+      kind: 'bytes',
+      keys: ['a', 'b'],
+      rows: [{ x: '1', y: '2' }],
+      name: 'inline',
+      // 降权后的 sandbox 用户无权改写 runner 写入的只读文件
+      writable: shouldEnablePythonNativeIsolation() ? false : expect.any(Boolean)
+    });
+
+    const invalid = await r.execute({
+      code: 'def main():\n    return 1',
+      variables: {},
+      inputFiles: { '../escape': { data: 'x' } }
+    });
+    expect(invalid.success).toBe(false);
+    expect(invalid.message).toMatch(/^Failed to write input files: Invalid input file name/);
+  });
+
+  it('emit_file 登记的文件由 runner 直接读取为附件，不接受临时目录之外的路径', async () => {
+    const r = await createRunner(1);
+
+    const result = await r.execute({
+      code: `def main():
+    path = task_tmpdir + "/chart.png"
+    with open(path, "wb") as f:
+        f.write(bytes(range(256)) * 4)
+    emit_file(path)
+    emit_file(path, "application/x-test", name="copy.bin")
+    try:
+        emit_file("/etc/passwd")
+        outside = True
+    except PermissionError:
+        outside = False
+    return {"outside": outside}`,
+      variables: {}
+    });
+
+    expect(result.success, result.message).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ outside: false });
+    expect(result.files?.map(({ name, mime, size }) => ({ name, mime, size }))).toEqual([
+      { name: 'chart.png', mime: 'image/png', size: 1024 },
+      { name: 'copy.bin', mime: 'application/x-test', size: 1024 }
+    ]);
+    const expected = Buffer.from(Array.from({ length: 1024 }, (_, i) => i % 256));
+    expect(result.files?.[0].data.equals(expected)).toBe(true);
+  });
+
   it('每个任务使用独立临时目录，结束后由父进程清理', async () => {
     const r = await createRunner(1);
 
@@ -1,5 +1,6 @@
 import { afterAll, beforeAll, describe, expect, it } from 'vitest';
-import { statSync } from 'fs';
+import { existsSync, statSync } from 'fs';
+import { basename, join } from 'path';
 import { PythonIsolatedRunner } from '../../src/isolated/python-isolated-runner';
 import { shouldEnablePythonNativeIsolation } from '../../src/isolated/python-isolation-config';
 
@@ -326,6 +327,64 @@ def main():
     expect(result.data?.codeReturn.figure_axes).toBe(1);
   });
 
+  it('共享 matplotlib 字体缓存被放入任务目录且对用户代码只读', async () => {
+    const files: string[] = (runner as any).fontCacheFiles;
+    expect(files.length).toBeGreaterThan(0);
+    const name = basename(files[0]);
+
+    const idle = (runner as any).idleChildren.values().next().value;
+    const taskFile = join(idle.taskTmpDir.hostPath, 'matplotlib', name);
+    expect(existsSync(taskFile)).toBe(true);
+    // 每个任务一份副本，不与共享缓存共用 inode
+    expect(statSync(taskFile).ino).not.toBe(statSync(files[0]).ino);
+
+    const result = await runner.execute({
+      code: `def main(variables):
+    path = task_tmpdir + '/matplotlib/' + variables['name']
+    with open(path) as f:
+        readable = len(f.read()) > 0
+    try:
+        with open(path, 'w') as f:
+            f.write('{}')
+        writable = True
+    except Exception:
+        writable = False
+    return {'readable': readable, 'writable': writable}`,
+      variables: { name }
+    });
+
+    expect(result.success, JSON.stringify(result)).toBe(true);
+    expect(result.data?.codeReturn).toEqual({ readable: true, writable: false });
+  });
+
+  it('首次 plt.savefig 可在沙箱内完成字体初始化并输出 PNG', async () => {
+    const result = await runner.execute({
+      code: `import io
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+def main():
+    start = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(2, 1))
+    ax.plot([1, 2, 3], [1, 4, 9])
+    ax.set_title('first')
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return {
+        'png': buf.getvalue()[:4] == b'\\x89PNG',
+        'savefig_ms': (time.perf_counter() - start) * 1000
+    }`,
+      variables: {}
+    });
+
+    expect(result.success, JSON.stringify(result)).toBe(true);
+    expect(result.data?.codeReturn.png).toBe(true);
+    expect(typeof result.data?.codeReturn.savefig_ms).toBe('number');
+  });
+
   it('Linux native 隔离下 chroot /tmp 由 root 持有，仅 task 临时目录可写', async () => {
     if (!shouldEnablePythonNativeIsolation()) {
       return;
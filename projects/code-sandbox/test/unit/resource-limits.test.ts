@@ -592,6 +592,58 @@ def main():
     expect(recovery.data?.codeReturn.ok).toBe(true);
   }, 20000);
 
+  it('多个文件累计超过配额时，吞掉异常也无法继续写入', async () => {
+    pool = new PythonIsolatedRunner(1);
+    await pool.init();
+
+    const start = Date.now();
+    const result = await pool.execute({
+      code: `def main():
+    chunk = b'x' * (1024 * 1024)
+    written = 0
+    for i in range(${env.SANDBOX_MAX_TMP_MB * 2}):
+        try:
+            with open(task_tmpdir + f'/part-{i}.bin', 'wb') as f:
+                f.write(chunk)
+            written += 1
+        except Exception:
+            pass
+    delay(1000)
+    return {'written': written}`,
+      variables: {}
+    });
+
+    expect(result.success).toBe(false);
+    expect(result.message).toBe(
+      `Temporary file limit exceeded (size: ${env.SANDBOX_MAX_TMP_MB + 1}MB, limit: ${env.SANDBOX_MAX_TMP_MB}MB)`
+    );
+    // 超限在子进程内即时发现，不等待轮询
+    expect(Date.now() - start).toBeLessThan(1000);
+  }, 20000);
+
+  it('先打开多个文件再写入时，由 runner 轮询兜底结束任务', async () => {
+    pool = new PythonIsolatedRunner(1);
+    await pool.init();
+
+    const start = Date.now();
+    const result = await pool.execute({
+      code: `def main():
+    chunk = b'x' * (1024 * 1024)
+    files = [open(task_tmpdir + f'/held-{i}.bin', 'wb') for i in range(${env.SANDBOX_MAX_TMP_MB * 2})]
+    for f in files:
+        f.write(chunk)
+        f.flush()
+    while True:
+        pass`,
+      variables: {},
+      timeoutMs: 15000
+    });
+
+    expect(result.success).toBe(false);
+    expect(result.message).toMatch(/^Temporary file limit exceeded \(size: \d+MB/);
+    expect(Date.now() - start).toBeLessThan(5000);
+  }, 20000);
+
   it('写入 task_tmpdir 限制内文件正常', async () => {
     pool = new PythonIsolatedRunner(1);
     await pool.init();
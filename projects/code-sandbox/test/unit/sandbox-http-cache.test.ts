@@ -0,0 +1,125 @@
+/**
+ * SandboxHttpCache 单元测试
+ *
+ * 使用本地桩服务器验证：
+ * - 相同 URL + 请求头的 GET 命中缓存，不出网、不计入请求次数
+ * - 遵循响应 Cache-Control（no-store、max-age）与请求 Cache-Control: no-cache
+ * - 非 GET、非 200、超过单条大小上限的响应不缓存
+ * - 命中率统计
+ */
+import { afterAll, beforeAll, describe, expect, it, vi } from 'vitest';
+import http from 'http';
+import type { SandboxHttpRequestPayload } from '../../src/utils/sandbox-http';
+
+let runSandboxHttpRequest: typeof import('../../src/utils/sandbox-http').runSandboxHttpRequest;
+let SandboxHttpCache: typeof import('../../src/utils/sandbox-http').SandboxHttpCache;
+type SandboxHttpCache = import('../../src/utils/sandbox-http').SandboxHttpCache;
+
+describe('SandboxHttpCache', () => {
+  let server: http.Server;
+  let baseUrl = '';
+  let originCalls = 0;
+
+  const limits = {
+    maxRequests: 2,
+    timeoutMs: 5000,
+    maxResponseSize: 1024 * 1024,
+    maxRequestBodySize: 1024 * 1024
+  };
+
+  beforeAll(async () => {
+    // 桩服务器监听在回环地址，回环地址只在 development 下放行；
+    // ipCheck 在模块顶层读取 NODE_ENV，需要重新加载
+    vi.stubEnv('NODE_ENV', 'development');
+    vi.resetModules();
+    ({ runSandboxHttpRequest, SandboxHttpCache } = await import('../../src/utils/sandbox-http'));
+    server = http.createServer((req, res) => {
+      originCalls++;
+      const url = new URL(req.url!, 'http://localhost');
+      if (url.pathname === '/missing') res.statusCode = 404;
+      const cacheControl = url.searchParams.get('cc');
+      if (cacheControl) res.setHeader('cache-control', cacheControl);
+      res.setHeader('content-type', 'application/json');
+      const pad = 'x'.repeat(Number(url.searchParams.get('pad')) || 0);
+      res.end(JSON.stringify({ call: originCalls, pad }));
+    });
+    await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+    const address = server.address();
+    if (!address || typeof address === 'string') throw new Error('Failed to start test server');
+    baseUrl = `http://127.0.0.1:${address.port}`;
+  });
+
+  afterAll(async () => {
+    await new Promise<void>((resolve) => server.close(() => resolve()));
+    // vitest 以 isolate: false 运行，需恢复环境变量并丢弃按 development 加载的模块，避免影响后续文件
+    vi.unstubAllEnvs();
+    vi.resetModules();
+  });
+
+  const request = (cache: SandboxHttpCache, payload: SandboxHttpRequestPayload) =>
+    runSandboxHttpRequest({ payload, limits, state: { requestCount: 0 }, cache });
+
+  it('相同 URL 和请求头的 GET 命中缓存，不出网且不计入请求次数', async () => {
+    const cache = new SandboxHttpCache(8, 60000, 1024);
+    const state = { requestCount: 0 };
+    const payload = { url: `${baseUrl}/config`, headers: { 'X-Tenant': 'a' } };
+    const before = originCalls;
+
+    const first = await runSandboxHttpRequest({ payload, limits, state, cache });
+    for (let i = 0; i < 5; i++) {
+      const hit = await runSandboxHttpRequest({ payload, limits, state, cache });
+      expect(hit.data).toBe(first.data);
+    }
+    expect(originCalls - before).toBe(1);
+    expect(state.requestCount).toBe(1);
+
+    // 请求头不同视为不同请求
+    await runSandboxHttpRequest({
+      payload: { ...payload, headers: { 'x-tenant': 'b' } },
+      limits,
+      state,
+      cache
+    });
+    expect(originCalls - before).toBe(2);
+    expect(cache.stats).toMatchObject({ hits: 5, misses: 2, size: 2, hitRate: 5 / 7 });
+  });
+
+  it('遵循响应和请求的 Cache-Control', async () => {
+    const cache = new SandboxHttpCache(8, 60000, 1024);
+    const before = originCalls;
+
+    await request(cache, { url: `${baseUrl}/a?cc=no-store` });
+    await request(cache, { url: `${baseUrl}/a?cc=no-store` });
+    expect(originCalls - before).toBe(2);
+
+    await request(cache, { url: `${baseUrl}/b?cc=max-age=0` });
+    await request(cache, { url: `${baseUrl}/b?cc=max-age=0` });
+    expect(originCalls - before).toBe(4);
+
+    await request(cache, { url: `${baseUrl}/c?cc=max-age=1` });
+    await request(cache, {
+      url: `${baseUrl}/c?cc=max-age=1`,
+      headers: { 'Cache-Control': 'no-cache' }
+    });
+    expect(originCalls - before).toBe(6);
+    await request(cache, { url: `${baseUrl}/c?cc=max-age=1` });
+    expect(originCalls - before).toBe(6);
+    await new Promise((resolve) => setTimeout(resolve, 1100));
+    await request(cache, { url: `${baseUrl}/c?cc=max-age=1` });
+    expect(originCalls - before).toBe(7);
+  });
+
+  it('非 GET、非 200 和超过单条大小上限的响应不缓存，size 为 0 时关闭', async () => {
+    const cache = new SandboxHttpCache(8, 60000, 1024);
+    const before = originCalls;
+
+    for (let i = 0; i < 2; i++) {
+      await request(cache, { url: `${baseUrl}/post`, method: 'POST', body: { i } });
+      await request(cache, { url: `${baseUrl}/missing` });
+      await request(cache, { url: `${baseUrl}/large?pad=2048` });
+      await request(new SandboxHttpCache(0, 60000, 1024), { url: `${baseUrl}/disabled` });
+    }
+    expect(originCalls - before).toBe(8);
+    expect(cache.stats.size).toBe(0);
+  });
+});
@@ -0,0 +1,203 @@
+/**
+ * SandboxHttpConnectionPool 单元测试
+ *
+ * - 同一 origin 的请求复用 keep-alive 连接，keepAliveMs 为 0 时每个请求新建连接
+ * - DNS 解析结果在 TTL 内复用，dnsTtlMs 为 0 时每次重新解析
+ * - 命中 DNS 缓存时仍对缓存 IP 复检内网策略，缓存过期后重新解析并校验
+ */
+import { afterAll, afterEach, beforeAll, beforeEach, describe, expect, it, vi } from 'vitest';
+import http from 'http';
+
+// 用 vi.hoisted 让 mock 在 import 之前生效
+const { lookup, resolve4, resolve6 } = vi.hoisted(() => ({
+  lookup: vi.fn<(host: string, options: any) => Promise<{ address: string; family: number }[]>>(),
+  resolve4: vi.fn<(host: string) => Promise<string[]>>(),
+  resolve6: vi.fn<(host: string) => Promise<string[]>>()
+}));
+
+vi.mock('dns/promises', () => ({
+  default: { lookup, resolve4, resolve6 },
+  lookup,
+  resolve4,
+  resolve6
+}));
+
+type SandboxHttpModule = typeof import('../../src/utils/sandbox-http');
+
+const originalEnv = {
+  NODE_ENV: process.env.NODE_ENV,
+  CHECK_INTERNAL_IP: process.env.CHECK_INTERNAL_IP
+};
+
+const limits = {
+  maxRequests: 100,
+  timeoutMs: 5000,
+  maxResponseSize: 1024 * 1024,
+  maxRequestBodySize: 1024 * 1024
+};
+
+// ipCheck 在模块顶层读取 NODE_ENV，切换后需要重新加载
+async function loadSandboxHttp(nodeEnv: string): Promise<SandboxHttpModule> {
+  vi.stubEnv('NODE_ENV', nodeEnv);
+  vi.resetModules();
+  return import('../../src/utils/sandbox-http');
+}
+
+beforeEach(() => {
+  lookup.mockReset();
+  resolve4.mockReset();
+  resolve6.mockReset();
+  resolve4.mockRejectedValue(new Error('ENODATA'));
+  resolve6.mockRejectedValue(new Error('ENODATA'));
+});
+
+afterEach(() => {
+  vi.stubEnv('NODE_ENV', originalEnv.NODE_ENV);
+  vi.stubEnv('CHECK_INTERNAL_IP', originalEnv.CHECK_INTERNAL_IP);
+});
+
+// vitest 以 isolate: false 运行，需恢复环境变量并丢弃按测试环境加载的模块，避免影响后续文件
+afterAll(() => {
+  vi.unstubAllEnvs();
+  vi.resetModules();
+});
+
+describe('SandboxHttpConnectionPool 连接复用', () => {
+  let server: http.Server;
+  let port = 0;
+  let connections = 0;
+
+  beforeAll(async () => {
+    server = http.createServer((_req, res) => {
+      res.setHeader('content-type', 'application/json');
+      res.end(JSON.stringify({ ok: true }));
+    });
+    server.on('connection', () => connections++);
+    await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+    const address = server.address();
+    if (!address || typeof address === 'string') throw new Error('Failed to start test server');
+    port = address.port;
+  });
+
+  afterAll(async () => {
+    server.closeAllConnections();
+    await new Promise<void>((resolve) => server.close(() => resolve()));
+  });
+
+  // 桩服务器监听在回环地址，回环地址只在 development 下放行
+  async function runRequests(
+    options: ConstructorParameters<SandboxHttpModule['SandboxHttpConnectionPool']>[0],
+    count: number
+  ) {
+    const { runSandboxHttpRequest, SandboxHttpConnectionPool } =
+      await loadSandboxHttp('development');
+    lookup.mockResolvedValue([{ address: '127.0.0.1', family: 4 }]);
+    const pool = new SandboxHttpConnectionPool(options);
+    const before = connections;
+    for (let i = 0; i < count; i++) {
+      const res = await runSandboxHttpRequest({
+        payload: { url: `http://stub.test:${port}/api?i=${i}` },
+        limits,
+        state: { requestCount: 0 },
+        connections: pool
+      });
+      expect(res.status).toBe(200);
+    }
+    const stats = pool.stats;
+    pool.destroy();
+    return { opened: connections - before, stats };
+  }
+
+  it('同一 origin 的请求复用连接，DNS 在 TTL 内只解析一次', async () => {
+    const { opened, stats } = await runRequests(
+      { maxOrigins: 8, maxSocketsPerOrigin: 4, keepAliveMs: 5000, dnsTtlMs: 60000 },
+      5
+    );
+
+    expect(opened).toBe(1);
+    expect(lookup).toHaveBeenCalledTimes(1);
+    expect(stats).toMatchObject({
+      origins: 1,
+      newConnections: 1,
+      reusedConnections: 4,
+      dns: { hits: 4, misses: 1, size: 1 }
+    });
+  });
+
+  it('keepAliveMs 和 dnsTtlMs 为 0 时每个请求新建连接并重新解析', async () => {
+    const { opened, stats } = await runRequests(
+      { maxOrigins: 8, maxSocketsPerOrigin: 4, keepAliveMs: 0, dnsTtlMs: 0 },
+      3
+    );
+
+    expect(opened).toBe(3);
+    expect(lookup).toHaveBeenCalledTimes(3);
+    expect(stats).toMatchObject({ origins: 0, newConnections: 3, reusedConnections: 0 });
+    expect(stats.dns).toMatchObject({ hits: 0, misses: 3, size: 0 });
+  });
+});
+
+describe('SandboxHttpConnectionPool DNS 缓存', () => {
+  it('命中缓存时仍按当前策略复检 IP', async () => {
+    const { SandboxHttpConnectionPool } = await loadSandboxHttp('production');
+    vi.stubEnv('CHECK_INTERNAL_IP', 'false');
+    lookup.mockResolvedValue([{ address: '10.0.0.5', family: 4 }]);
+    const pool = new SandboxHttpConnectionPool({
+      maxOrigins: 8,
+      maxSocketsPerOrigin: 4,
+      keepAliveMs: 5000,
+      dnsTtlMs: 60000
+    });
+
+    expect(await pool.lookup('http://api.test/', 'api.test')).toEqual(['10.0.0.5']);
+    expect(await pool.lookup('http://api.test/', 'api.test')).toEqual(['10.0.0.5']);
+    expect(lookup).toHaveBeenCalledTimes(1);
+
+    vi.stubEnv('CHECK_INTERNAL_IP', 'true');
+    await expect(pool.lookup('http://api.test/', 'api.test')).rejects.toThrow(/private network/);
+    expect(lookup).toHaveBeenCalledTimes(1);
+  });
+
+  it('缓存过期后重新解析，解析到内网 IP 时拒绝', async () => {
+    const { SandboxHttpConnectionPool } = await loadSandboxHttp('production');
+    vi.stubEnv('CHECK_INTERNAL_IP', 'true');
+    lookup.mockResolvedValueOnce([{ address: '8.8.8.8', family: 4 }]);
+    lookup.mockResolvedValueOnce([{ address: '10.0.0.5', family: 4 }]);
+    const pool = new SandboxHttpConnectionPool({
+      maxOrigins: 8,
+      maxSocketsPerOrigin: 4,
+      keepAliveMs: 5000,
+      dnsTtlMs: 50
+    });
+
+    expect(await pool.lookup('http://api.test/', 'api.test')).toEqual(['8.8.8.8']);
+    expect(await pool.lookup('http://api.test/', 'api.test')).toEqual(['8.8.8.8']);
+    expect(lookup).toHaveBeenCalledTimes(1);
+
+    // 等待 TTL 过期，域名此时已被改指向内网地址（DNS rebinding）
+    await new Promise((resolve) => setTimeout(resolve, 80));
+    await expect(pool.lookup('http://api.test/', 'api.test')).rejects.toThrow(/private network/);
+    expect(lookup).toHaveBeenCalledTimes(2);
+    expect(pool.stats.dns).toMatchObject({ hits: 1, misses: 2 });
+  });
+
+  it('解析出内网 IP 时不写入缓存', async () => {
+    const { SandboxHttpConnectionPool } = await loadSandboxHttp('production');
+    vi.stubEnv('CHECK_INTERNAL_IP', 'true');
+    lookup.mockResolvedValue([
+      { address: '8.8.8.8', family: 4 },
+      { address: '169.254.169.254', family: 4 }
+    ]);
+    const pool = new SandboxHttpConnectionPool({
+      maxOrigins: 8,
+      maxSocketsPerOrigin: 4,
+      keepAliveMs: 5000,
+      dnsTtlMs: 60000
+    });
+
+    await expect(pool.lookup('http://api.test/', 'api.test')).rejects.toThrow(/private network/);
+    await expect(pool.lookup('http://api.test/', 'api.test')).rejects.toThrow(/private network/);
+    expect(lookup).toHaveBeenCalledTimes(2);
+    expect(pool.stats.dns.size).toBe(0);
+  });
+});